@@ -1,6 +1,9 @@
+import sys
+
 from graphs import random_vertices
 from maps import generate_map
 from app import App
+from service import SimulationService
 # from utils import input_data
 
 
@@ -37,5 +40,32 @@ def main():
     app.results()
 
 
+def serve(address: str = "127.0.0.1:8000"):
+    """Serves simulations over generated maps until interrupted
+
+    Args:
+        address (str): The "host:port" to listen on, or the path of a Unix
+            socket.
+    """
+    maps = {f"grid{shape}": generate_map(shape) for shape in (4, 7)}
+
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        address = (host, int(port))
+
+    service = SimulationService(maps, address)
+    print(f"serving {', '.join(maps)} on {service.address}")
+
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["serve"]:
+        serve(*sys.argv[2:3])
+    else:
+        main()
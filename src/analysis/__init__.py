@@ -0,0 +1,17 @@
+from analysis.sweep import Sweep, SweepRun, SweepResult
+from analysis.placement import PostPlacement, PlacementResult
+from analysis.routing import RouteBenchmark, RouteBenchmarkResult, RouteRun
+from analysis.ensemble import SpreadEnsemble, SpreadEnsembleResult
+
+__all__ = [
+    "Sweep",
+    "SweepRun",
+    "SweepResult",
+    "PostPlacement",
+    "PlacementResult",
+    "RouteBenchmark",
+    "RouteBenchmarkResult",
+    "RouteRun",
+    "SpreadEnsemble",
+    "SpreadEnsembleResult",
+]
@@ -0,0 +1,330 @@
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from graphs import Graph
+
+
+class SpreadEnsembleResult:
+    """Arrival times of the fire in every realisation of an ensemble."""
+
+    def __init__(self, vertices: List[str], arrival: np.ndarray):
+        """Initializes the results of an ensemble.
+
+        Args:
+            vertices (List[str]): The vertices, indexed by column.
+            arrival (np.ndarray): The step each vertex caught fire in each
+                realisation, one row per realisation, or -1 if it did not.
+        """
+        self._vertices = vertices
+        self._index = {vertex: i for i, vertex in enumerate(vertices)}
+        self._arrival = arrival
+
+    @property
+    def vertices(self) -> List[str]:
+        """Returns the vertices indexed by the columns of ``arrival``.
+
+        Returns:
+            List[str]: The sorted vertices. It must not be modified.
+        """
+        return self._vertices
+
+    @property
+    def arrival(self) -> np.ndarray:
+        """Returns the arrival times of the fire.
+
+        Returns:
+            np.ndarray: The step each vertex caught fire in each
+                realisation, of shape realisations × vertices, or -1 if it
+                did not. It must not be modified.
+        """
+        return self._arrival
+
+    @property
+    def realisations(self) -> int:
+        return len(self._arrival)
+
+    def burn_probability(self) -> Dict[str, float]:
+        """Returns the share of realisations in which each vertex burned.
+
+        Returns:
+            Dict[str, float]: The burn probability of each vertex.
+        """
+        burned = (self._arrival >= 0).mean(axis=0)
+
+        return dict(zip(self._vertices, burned.tolist()))
+
+    def mean_arrival(self) -> Dict[str, float]:
+        """Returns the mean arrival time of the fire at each vertex.
+
+        Only the realisations in which the vertex burned are counted.
+
+        Returns:
+            Dict[str, float]: The mean step the fire reached each vertex,
+                or ``math.inf`` if it never did.
+        """
+        burned = self._arrival >= 0
+        counts = burned.sum(axis=0)
+        totals = np.where(burned, self._arrival, 0).sum(axis=0)
+
+        return {
+            vertex: total / count if count else math.inf
+            for vertex, total, count in zip(
+                self._vertices, totals.tolist(), counts.tolist()
+            )
+        }
+
+    def arrival_distribution(self, vertex: str) -> np.ndarray:
+        """Returns the distribution of the arrival time at a vertex.
+
+        Args:
+            vertex (str): The vertex.
+
+        Raises:
+            ValueError: If the vertex is not in the map.
+
+        Returns:
+            np.ndarray: The share of realisations in which the fire reached
+                the vertex at each step, indexed by step. The shares add up
+                to its burn probability.
+        """
+        try:
+            column = self._arrival[:, self._index[vertex]]
+        except KeyError:
+            raise ValueError(
+                f"'{vertex}' is not a vertex in the graph"
+            ) from None
+
+        counts = np.bincount(column[column >= 0], minlength=1)
+
+        return counts / max(1, len(column))
+
+    def table(self, top: int = 10) -> str:
+        """Formats the vertices most likely to burn as a text table.
+
+        Args:
+            top (int): The number of vertices listed.
+
+        Returns:
+            str: One line per vertex, preceded by a header.
+        """
+        probability = self.burn_probability()
+        arrival = self.mean_arrival()
+        header = ["vertex", "burn probability", "mean arrival"]
+        rows = [
+            [
+                str(vertex),
+                f"{probability[vertex]:.3f}",
+                f"{arrival[vertex]:.2f}",
+            ]
+            for vertex in sorted(
+                self._vertices,
+                key=lambda vertex: (-probability[vertex], arrival[vertex]),
+            )[:top]
+        ]
+        widths = [
+            max(len(row[column]) for row in [header] + rows)
+            for column in range(len(header))
+        ]
+
+        lines = [
+            " | ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            for row in [header] + rows
+        ]
+        lines.insert(1, "-+-".join("-" * width for width in widths))
+        lines.append("")
+        lines.append(f"realisations: {self.realisations}")
+
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return (
+            f"SpreadEnsembleResult({self.realisations}, {len(self._vertices)})"
+        )
+
+
+class SpreadEnsemble:
+    """Runs many realisations of a stochastic fire spread at once.
+
+    A burning vertex ignites each neighbor with a probability that falls
+    with the weight of their edge, ``exp(-weight / spread)``, once per step
+    for ``burn_time`` steps after it caught fire. An infinite ``spread``
+    ignites every neighbor, which gives the layers of the deterministic
+    fire, one hop per step.
+
+    The realisations advance together as a realisations × vertices array
+    of arrival times, over the adjacency of the map flattened in CSR form.
+    Each step only draws one random number per edge leaving a burning
+    vertex, for all the realisations in a single call.
+
+    Example:
+        >>> ensemble = SpreadEnsemble(map, spread=2.0)
+        >>> result = ensemble.run("A1", realisations=5000, seed=7)
+        >>> print(result.table())
+
+    Attributes:
+        _vertices (List[str]): The vertices, sorted, indexed by position.
+        _offsets (np.ndarray): The first edge of each vertex, and the
+            number of edges last.
+        _targets (np.ndarray): The destination of each edge.
+        _probability (np.ndarray): The ignition probability of each edge.
+    """
+
+    def __init__(self, map: Graph, spread: float = 1.0, burn_time: int = 1):
+        """Flattens the map and the ignition probabilities of its edges.
+
+        Args:
+            map (Graph): The map.
+            spread (float): The weight at which an edge ignites with
+                probability ``1 / e``.
+            burn_time (int): The steps a vertex spreads the fire for.
+
+        Raises:
+            ValueError: If the spread or the burn time is not positive.
+        """
+        if spread <= 0:
+            raise ValueError(f"The spread must be positive but is '{spread}'.")
+
+        if burn_time <= 0:
+            raise ValueError(
+                f"The burn time must be positive but is '{burn_time}'."
+            )
+
+        self._vertices = sorted(map.vertices)
+        self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        self._burn_time = burn_time
+
+        edges_list = map.edges_list
+        neighborhoods = [edges_list.get(v, []) for v in self._vertices]
+        self._offsets = np.zeros(len(self._vertices) + 1, dtype=np.int64)
+        self._offsets[1:] = np.cumsum([len(edges) for edges in neighborhoods])
+        self._targets = np.fromiter(
+            (self._index[v] for edges in neighborhoods for v, _ in edges),
+            np.intp,
+            self._offsets[-1],
+        )
+        weights = np.fromiter(
+            (weight for edges in neighborhoods for _, weight in edges),
+            np.float64,
+            self._offsets[-1],
+        )
+        self._probability = np.exp(-weights / spread).astype(np.float32)
+
+    @property
+    def vertices(self) -> List[str]:
+        return self._vertices
+
+    def run(
+        self,
+        start: str,
+        realisations: int = 1000,
+        max_steps: int | None = None,
+        seed: int | None = None,
+    ) -> SpreadEnsembleResult:
+        """Spreads the fire from a vertex in many realisations.
+
+        Args:
+            start (str): The vertex where the fire starts, at step 0.
+            realisations (int): The number of realisations.
+            max_steps (int, optional): The last step simulated. Defaults to
+                running until no vertex burns in any realisation.
+            seed (int, optional): The seed of the random draws.
+
+        Raises:
+            ValueError: If the start is not in the map or the number of
+                realisations is not positive.
+
+        Returns:
+            SpreadEnsembleResult: The arrival times of every realisation.
+        """
+        if realisations <= 0:
+            raise ValueError(
+                f"The number of realisations must be positive but is '{realisations}'."
+            )
+
+        try:
+            origin = self._index[start]
+        except KeyError:
+            raise ValueError(
+                f"'{start}' is not a vertex in the graph"
+            ) from None
+
+        generator = np.random.default_rng(seed)
+        size = len(self._vertices)
+        # the cell of a vertex in a realisation is ``vertex * realisations
+        # + realisation`` in the flattened arrays, so the realisations of a
+        # vertex, which tend to burn together, are next to each other
+        arrival = np.full(size * realisations, -1, dtype=np.int32)
+        owner = np.empty(size * realisations, dtype=np.intp)
+        rows = np.arange(realisations, dtype=np.intp)
+        arrival[origin * realisations + rows] = 0
+        # the realisations and vertices that caught fire on each of the
+        # last steps, which still spread it
+        fronts: List[Tuple[np.ndarray, np.ndarray]] = [
+            (rows, np.full(realisations, origin, dtype=np.intp))
+        ]
+        step = 0
+
+        while max_steps is None or step < max_steps:
+            rows = np.concatenate([front[0] for front in fronts])
+            sources = np.concatenate([front[1] for front in fronts])
+
+            if len(rows) == 0:
+                break
+
+            step += 1
+            rows, edges = self._edges(rows, sources)
+            ignited = np.flatnonzero(
+                generator.random(len(edges), dtype=np.float32)
+                < self._probability[edges]
+            )
+            rows, targets = rows[ignited], self._targets[edges[ignited]]
+            cells = targets * realisations + rows
+            unburned = np.flatnonzero(arrival[cells] < 0)
+            rows, targets, cells = (
+                rows[unburned],
+                targets[unburned],
+                cells[unburned],
+            )
+
+            # the same vertex may be ignited by several neighbors, and only
+            # the last write of each cell is kept
+            order = np.arange(len(cells))
+            owner[cells] = order
+            kept = np.flatnonzero(owner[cells] == order)
+            arrival[cells[kept]] = step
+
+            fronts.append((rows[kept], targets[kept]))
+            fronts = fronts[-self._burn_time :]
+
+        return SpreadEnsembleResult(
+            self._vertices, arrival.reshape(size, realisations).T
+        )
+
+    def _edges(
+        self, rows: np.ndarray, sources: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Lists the edges leaving burning vertices, with their realisation.
+
+        Args:
+            rows (np.ndarray): The realisation of each burning vertex.
+            sources (np.ndarray): The burning vertices.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The realisation and the index of
+                each edge leaving one of the vertices.
+        """
+        first = self._offsets[sources]
+        degrees = self._offsets[sources + 1] - first
+        # each edge is its position among all the edges listed, shifted
+        # from the position of the first edge of its vertex to the CSR one
+        shift = np.repeat(first - (np.cumsum(degrees) - degrees), degrees)
+
+        return (
+            np.repeat(rows, degrees),
+            np.arange(len(shift)) + shift,
+        )
+
+    def __repr__(self):
+        return f"SpreadEnsemble({len(self._vertices)})"
@@ -0,0 +1,390 @@
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from app import App
+from graphs import Graph, PathCache, dijkstra_distances
+
+
+class PlacementResult(NamedTuple):
+    """Firefighter posts chosen by the optimiser.
+
+    Attributes:
+        posts (List[str]): The chosen posts.
+        cost (float): The expected response time of the posts, that is the
+            weighted mean distance from each ignition point to its nearest
+            post.
+        candidates (List[Tuple[List[str], float]]): The best placements
+            found, with their expected response time, best first.
+        validation (List[Tuple[List[str], float]]): The mean number of
+            updates until the simulation ends for each validated placement,
+            best first. Empty if no placement was validated.
+    """
+
+    posts: List[str]
+    cost: float
+    candidates: List[Tuple[List[str], float]]
+    validation: List[Tuple[List[str], float]]
+
+
+class PostPlacement:
+    """Chooses firefighter posts that minimise the expected response time.
+
+    The response time of an ignition point is its distance to the nearest
+    post. Distances are taken from a matrix with one row per ignition point
+    and one column per candidate post, computed with one Dijkstra from each
+    ignition point. Since maps built by ``Graph`` are symmetric, these are
+    also the distances from the posts to the ignition points.
+
+    Posts are chosen by a greedy k-median followed by local search swaps,
+    both evaluated over the whole matrix with NumPy. On large maps the
+    ignition points should be sampled, which keeps the matrix at
+    ``samples x vertices`` entries.
+
+    On interned maps the matrix is indexed by vertex id, while the posts and
+    ignition points are still given and returned by name.
+
+    Example:
+        >>> placement = PostPlacement(map, samples=256, seed=7)
+        >>> placement.optimise(3).posts
+        ['C4', 'K2', 'R9']
+    """
+
+    def __init__(
+        self,
+        map: Graph,
+        ignition_points: List[str] | None = None,
+        weights: List[float] | None = None,
+        candidates: List[str] | None = None,
+        samples: int | None = None,
+        seed: int | None = None,
+    ):
+        """Builds the distance matrix of a map.
+
+        Args:
+            map (Graph): The map where posts are placed.
+            ignition_points (List[str], optional): The possible ignition
+                points. Defaults to every vertex of the map.
+            weights (List[float], optional): The probability of each
+                ignition point. Defaults to a uniform distribution.
+            candidates (List[str], optional): The vertices where a post may
+                be placed. Defaults to every vertex of the map.
+            samples (int, optional): If specified, the number of ignition
+                points sampled, with their weights, to build the matrix.
+            seed (int, optional): The seed used to sample ignition points.
+
+        Raises:
+            ValueError: If the weights do not match the ignition points or
+                there are no candidates.
+        """
+        self._map = map
+        self._registry = map.registry
+        self._random = random.Random(seed)
+        ignition_points = [
+            self._intern(vertex)
+            for vertex in (
+                ignition_points
+                if ignition_points is not None
+                else map.vertices
+            )
+        ]
+
+        if weights is not None and len(weights) != len(ignition_points):
+            raise ValueError(
+                "The weights must have one value per ignition point."
+            )
+
+        if samples is not None and samples < len(ignition_points):
+            ignition_points = self._random.choices(
+                ignition_points, weights, k=samples
+            )
+            weights = None
+
+        self._ignition_points = ignition_points
+        self._candidates = [
+            self._intern(vertex)
+            for vertex in (
+                candidates if candidates is not None else map.vertices
+            )
+        ]
+
+        if len(self._candidates) == 0:
+            raise ValueError("There must be at least one candidate post.")
+
+        weights = np.asarray(
+            weights if weights is not None else [1.0] * len(ignition_points),
+            dtype=np.float64,
+        )
+        self._weights = weights / weights.sum()
+        self._distances = self._distance_matrix()
+        self._paths = PathCache(map)
+
+    @property
+    def ignition_points(self) -> List[str]:
+        return self._names(self._ignition_points)
+
+    @property
+    def candidates(self) -> List[str]:
+        return self._names(self._candidates)
+
+    @property
+    def distances(self) -> np.ndarray:
+        """Returns the distance matrix.
+
+        Returns:
+            np.ndarray: A ``ignition points x candidates`` matrix. Unreachable
+                pairs are set to a penalty larger than any distance.
+        """
+        return self._distances
+
+    def _distance_matrix(self) -> np.ndarray:
+        column = {vertex: index for index, vertex in enumerate(self._candidates)}
+        matrix = np.full(
+            (len(self._ignition_points), len(self._candidates)),
+            np.inf,
+            dtype=np.float32,
+        )
+        rows: Dict[str, int] = {}
+
+        for row, vertex in enumerate(self._ignition_points):
+            # sampled ignition points may repeat
+            if vertex in rows:
+                matrix[row] = matrix[rows[vertex]]
+                continue
+
+            rows[vertex] = row
+            distances = dijkstra_distances(self._map, vertex)
+            indexes = [column[v] for v in distances if v in column]
+            matrix[row, indexes] = [
+                distances[v] for v in distances if v in column
+            ]
+
+        finite = matrix[np.isfinite(matrix)]
+        penalty = 2 * (finite.max() if finite.size else 1) + 1
+        matrix[~np.isfinite(matrix)] = penalty
+
+        return matrix
+
+    def cost(self, posts: List[str]) -> float:
+        """Computes the expected response time of a placement.
+
+        Args:
+            posts (List[str]): The posts, which must be candidates.
+
+        Returns:
+            float: The weighted mean distance to the nearest post.
+        """
+        index = {vertex: i for i, vertex in enumerate(self._candidates)}
+
+        return self._cost([index[self._intern(post)] for post in posts])
+
+    def greedy(self, k: int) -> List[int]:
+        """Chooses posts one at a time, each minimising the cost so far.
+
+        Args:
+            k (int): The number of posts.
+
+        Returns:
+            List[int]: The columns of the chosen posts.
+        """
+        chosen: List[int] = []
+        nearest = np.full(
+            len(self._ignition_points), np.inf, dtype=self._distances.dtype
+        )
+
+        for _ in range(min(k, len(self._candidates))):
+            costs = self._weights @ np.minimum(
+                nearest[:, None], self._distances
+            )
+            costs[chosen] = np.inf
+            best = int(np.argmin(costs))
+            chosen.append(best)
+            nearest = np.minimum(nearest, self._distances[:, best])
+
+        return chosen
+
+    def local_search(
+        self, chosen: List[int], max_swaps: int = 100
+    ) -> Tuple[List[int], List[Tuple[List[int], float]]]:
+        """Improves a placement by swapping one post at a time.
+
+        Each iteration evaluates every swap between a chosen post and a
+        candidate at once and applies the best one, until no swap improves
+        the cost.
+
+        Args:
+            chosen (List[int]): The columns of the initial posts.
+            max_swaps (int): The maximum number of swaps applied.
+
+        Returns:
+            Tuple[List[int], List[Tuple[List[int], float]]]: The columns of
+                the improved posts and every placement visited with its cost.
+        """
+        chosen = list(chosen)
+        visited = [(list(chosen), self._cost(chosen))]
+
+        for _ in range(max_swaps):
+            columns = self._distances[:, chosen]
+            order = np.argsort(columns, axis=1)
+            rows = np.arange(len(columns))
+            first = columns[rows, order[:, 0]]
+            second = (
+                columns[rows, order[:, 1]]
+                if len(chosen) > 1
+                else np.full(len(columns), np.inf)
+            )
+
+            best_cost, best_swap = visited[-1][1], None
+
+            for position in range(len(chosen)):
+                # nearest post of each ignition point once this one is removed
+                remaining = np.where(order[:, 0] == position, second, first)
+                costs = self._weights @ np.minimum(
+                    remaining[:, None], self._distances
+                )
+                costs[chosen] = np.inf
+                candidate = int(np.argmin(costs))
+
+                if costs[candidate] < best_cost - 1e-9:
+                    best_cost, best_swap = float(costs[candidate]), (
+                        position,
+                        candidate,
+                    )
+
+            if best_swap is None:
+                break
+
+            chosen[best_swap[0]] = best_swap[1]
+            visited.append((list(chosen), best_cost))
+
+        return chosen, visited
+
+    def optimise(
+        self,
+        k: int,
+        max_swaps: int = 100,
+        validate: int = 0,
+        validation_samples: int = 5,
+        **simulation,
+    ) -> PlacementResult:
+        """Chooses k posts minimising the expected response time.
+
+        Args:
+            k (int): The number of posts.
+            max_swaps (int): The maximum number of local search swaps.
+            validate (int): The number of best placements validated by full
+                simulations. Defaults to no validation.
+            validation_samples (int): The number of ignition points simulated
+                for each validated placement.
+            **simulation: The arguments of ``validate``.
+
+        Raises:
+            ValueError: If k is not positive.
+
+        Returns:
+            PlacementResult: The best placement found.
+        """
+        if k <= 0:
+            raise ValueError(f"k must be greater than zero but is '{k}'.")
+
+        chosen, visited = self.local_search(self.greedy(k), max_swaps)
+
+        candidates = []
+        seen = set()
+
+        for columns, cost in sorted(visited, key=lambda item: item[1]):
+            posts = self._names(
+                [self._candidates[column] for column in columns]
+            )
+
+            if frozenset(posts) not in seen:
+                seen.add(frozenset(posts))
+                candidates.append((posts, cost))
+
+        validation = []
+
+        if validate > 0:
+            ignitions = self._random.sample(
+                self._ignition_points,
+                min(validation_samples, len(self._ignition_points)),
+            )
+            validation = [
+                (posts, self.validate(posts, ignitions, **simulation))
+                for posts, _ in candidates[:validate]
+            ]
+            validation.sort(key=lambda item: item[1])
+
+        return PlacementResult(
+            candidates[0][0], candidates[0][1], candidates, validation
+        )
+
+    def validate(
+        self,
+        posts: List[str],
+        ignition_points: List[str],
+        water_sources_position: List[str] | None = None,
+        water_needed_extinguish_fire: Dict[str, float] | None = None,
+        fire_truck_water_volume: float = 150,
+        max_iterations: int = 150,
+        mode: str = App.TICK,
+    ) -> float:
+        """Measures a placement by simulating fires from ignition points.
+
+        Args:
+            posts (List[str]): The posts to validate.
+            ignition_points (List[str]): The vertices where fires start.
+            water_sources_position (List[str], optional): The water sources.
+                Defaults to none besides the posts.
+            water_needed_extinguish_fire (Dict[str, float], optional): The
+                water needed in each vertex. Defaults to 15 L per vertex.
+            fire_truck_water_volume (float): The tank capacity of the trucks.
+            max_iterations (int): The maximum number of updates of each run.
+            mode (str): The time advance mode of each run.
+
+        Returns:
+            float: The mean number of updates until the simulation ends over
+                the ignition points.
+        """
+        if water_needed_extinguish_fire is None:
+            water_needed_extinguish_fire = {
+                vertex: 15 for vertex in self._map.vertices
+            }
+
+        iterations = []
+
+        for ignition in ignition_points:
+            app = App(
+                self._map,
+                ignition,
+                posts,
+                water_sources_position or [],
+                water_needed_extinguish_fire,
+                fire_truck_water_volume,
+                verbose=0,
+                paths=self._paths,
+            )
+            app.run(max_iterations, mode)
+            iterations.append(app.summary()["iterations"])
+
+        return sum(iterations) / len(iterations)
+
+    def _intern(self, vertex: str) -> int | str:
+        """Returns the id of a vertex given by name on an interned map."""
+        if self._registry is None:
+            return vertex
+
+        return self._registry.intern(vertex)
+
+    def _names(self, vertices: List[str]) -> List[str]:
+        """Returns the names of vertices of the map, which are ids on
+        interned maps."""
+        if self._registry is None:
+            return list(vertices)
+
+        return [self._registry.resolve(vertex) for vertex in vertices]
+
+    def _cost(self, chosen: List[int]) -> float:
+        nearest = self._distances[:, chosen].min(axis=1)
+
+        return float(self._weights @ nearest)
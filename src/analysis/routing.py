@@ -0,0 +1,182 @@
+import math
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from graphs import Graph, a_star
+
+# a point to point search, returning the distance, the path and the number
+# of vertices it settled
+Search = Callable[[str, str], Tuple[float, List[str], int]]
+
+
+class RouteRun(NamedTuple):
+    """Results of one search over every query of a benchmark.
+
+    Attributes:
+        search (str): The name of the search.
+        settled (float): The mean number of vertices settled per query.
+        reduction (float): The mean settled vertices of the baseline
+            divided by the ones of this search.
+        elapsed (float): The mean time of a query, in seconds.
+    """
+
+    search: str
+    settled: float
+    reduction: float
+    elapsed: float
+
+
+class RouteBenchmarkResult:
+    """Results of every search of a route benchmark."""
+
+    def __init__(self, runs: List[RouteRun], queries: int):
+        """Initializes the results of a benchmark.
+
+        Args:
+            runs (List[RouteRun]): The results of each search, the baseline
+                first.
+            queries (int): The number of queries run by each search.
+        """
+        self._runs = runs
+        self._queries = queries
+
+    @property
+    def runs(self) -> List[RouteRun]:
+        return self._runs
+
+    def table(self) -> str:
+        """Formats the results of every search as a text table.
+
+        Returns:
+            str: One line per search, preceded by a header.
+        """
+        header = ["search", "settled", "reduction", "ms"]
+        rows = [
+            [
+                run.search,
+                f"{run.settled:.1f}",
+                f"{run.reduction:.2f}x",
+                f"{run.elapsed * 1000:.3f}",
+            ]
+            for run in self._runs
+        ]
+        widths = [
+            max(len(row[column]) for row in [header] + rows)
+            for column in range(len(header))
+        ]
+
+        lines = [
+            " | ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            for row in [header] + rows
+        ]
+        lines.insert(1, "-+-".join("-" * width for width in widths))
+        lines.append("")
+        lines.append(f"queries: {self._queries}")
+
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"RouteBenchmarkResult({len(self._runs)}, {self._queries})"
+
+
+class RouteBenchmark:
+    """Compares the vertices settled by point to point searches.
+
+    Every search answers the same random queries, and its mean number of
+    settled vertices is compared with the one of plain Dijkstra, that is A*
+    without a heuristic, stopped at the destination.
+
+    Example:
+        >>> landmarks = LandmarkIndex(map, 8)
+        >>> benchmark = RouteBenchmark(map, queries=200, seed=7)
+        >>> result = benchmark.run({
+        ...     "alt": lambda origin, destination: a_star(
+        ...         map, origin, destination, landmarks.heuristic(destination)
+        ...     ),
+        ... })
+        >>> print(result.table())
+    """
+
+    def __init__(
+        self, map: Graph, queries: int = 100, seed: int | None = None
+    ):
+        """Draws the queries of a benchmark.
+
+        Args:
+            map (Graph): The map searched.
+            queries (int): The number of origin and destination pairs.
+            seed (int, optional): The seed of the queries.
+        """
+        vertices = sorted(map.vertices)
+        generator = random.Random(seed)
+
+        self._map = map
+        self._queries = [
+            (generator.choice(vertices), generator.choice(vertices))
+            for _ in range(queries)
+        ]
+
+    @property
+    def queries(self) -> List[Tuple[str, str]]:
+        """Returns the queries of the benchmark.
+
+        Returns:
+            List[Tuple[str, str]]: The origin and destination of each query.
+        """
+        return self._queries
+
+    def run(self, searches: Dict[str, Search]) -> RouteBenchmarkResult:
+        """Runs plain Dijkstra and every search over the queries.
+
+        Args:
+            searches (Dict[str, Search]): The searches compared, by name.
+
+        Raises:
+            RuntimeError: If a search finds a different distance than plain
+                Dijkstra.
+
+        Returns:
+            RouteBenchmarkResult: The results of plain Dijkstra, first, and
+                of each search.
+        """
+        searches = {
+            "dijkstra": lambda origin, destination: a_star(
+                self._map, origin, destination
+            ),
+            **searches,
+        }
+        expected: List[float] = []
+        runs: List[RouteRun] = []
+
+        for name, search in searches.items():
+            settled = 0
+            start = time.perf_counter()
+
+            for query, (origin, destination) in enumerate(self._queries):
+                distance, _, count = search(origin, destination)
+                settled += count
+
+                if len(expected) < len(self._queries):
+                    expected.append(distance)
+
+                elif not math.isclose(distance, expected[query]):
+                    raise RuntimeError(
+                        f"The search '{name}' found {distance} from '{origin}' to '{destination}' instead of {expected[query]}."
+                    )
+
+            elapsed = time.perf_counter() - start
+            mean = settled / max(1, len(self._queries))
+            runs.append(
+                RouteRun(
+                    name,
+                    mean,
+                    runs[0].settled / mean if runs and mean else 1.0,
+                    elapsed / max(1, len(self._queries)),
+                )
+            )
+
+        return RouteBenchmarkResult(runs, len(self._queries))
+
+    def __repr__(self):
+        return f"RouteBenchmark({len(self._queries)})"
@@ -0,0 +1,380 @@
+import time
+from itertools import product
+from typing import Dict, Iterable, List, NamedTuple
+
+from app import App
+from graphs import Graph, PathCache
+
+
+class SweepRun(NamedTuple):
+    """Results of one configuration of a sweep.
+
+    A run that failed has no results, only the error it raised.
+
+    Attributes:
+        parameters (Dict[str, object]): The swept parameters of the run.
+        time (int | None): The simulation time, in units of time.
+        water (float | None): The water spent, in liters.
+        iterations (int | None): The number of updates run.
+        put_out (bool | None): Whether the fire was put out.
+        elapsed (float): The wall time of the run, in seconds.
+        error (str | None): The error raised by the run, if it failed.
+    """
+
+    parameters: Dict[str, object]
+    time: int | None
+    water: float | None
+    iterations: int | None
+    put_out: bool | None
+    elapsed: float
+    error: str | None = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+class SweepResult:
+    """Results of every configuration of a sweep and their timings."""
+
+    def __init__(
+        self,
+        runs: List[SweepRun],
+        setup_time: float,
+        cold_time: float | None = None,
+    ):
+        """Initializes the results of a sweep.
+
+        Args:
+            runs (List[SweepRun]): The results of each configuration.
+            setup_time (float): The time spent precomputing the map
+                structures shared by the runs, in seconds.
+            cold_time (float, optional): The time of the first configuration
+                run without any shared structure, in seconds.
+        """
+        self._runs = runs
+        self._setup_time = setup_time
+        self._cold_time = cold_time
+
+    @property
+    def runs(self) -> List[SweepRun]:
+        return self._runs
+
+    @property
+    def failed(self) -> List[SweepRun]:
+        """Returns the runs of the configurations that raised an error.
+
+        Returns:
+            List[SweepRun]: The failed runs, in order.
+        """
+        return [run for run in self._runs if run.failed]
+
+    @property
+    def setup_time(self) -> float:
+        return self._setup_time
+
+    @property
+    def total_time(self) -> float:
+        """Returns the time of the sweep, including the precomputation.
+
+        Returns:
+            float: The time in seconds.
+        """
+        return self._setup_time + sum(run.elapsed for run in self._runs)
+
+    @property
+    def speedup(self) -> float | None:
+        """Estimates the speedup of sharing the map structures.
+
+        The cost of a sweep without sharing is estimated as the number of
+        runs times the time of a cold run of the first configuration.
+
+        Returns:
+            float | None: The amortised speedup, or None if no cold run was
+                measured.
+        """
+        if self._cold_time is None or self.total_time == 0:
+            return None
+
+        return self._cold_time * len(self._runs) / self.total_time
+
+    def table(self) -> str:
+        """Formats the results of every configuration as a text table.
+
+        Returns:
+            str: One line per configuration, preceded by a header and
+                followed by the timings of the sweep.
+        """
+        names = list(self._runs[0].parameters) if self._runs else []
+        header = names + ["time", "water", "iterations", "put out", "secs"]
+        failed = self.failed
+
+        if failed:
+            header.append("error")
+
+        rows = [
+            [_format(run.parameters[name]) for name in names]
+            + (
+                ["-"] * 4
+                if run.failed
+                else [
+                    str(run.time),
+                    str(run.water),
+                    str(run.iterations),
+                    "yes" if run.put_out else "no",
+                ]
+            )
+            + [f"{run.elapsed:.3f}"]
+            + ([run.error or ""] if failed else [])
+            for run in self._runs
+        ]
+        widths = [
+            max(len(row[column]) for row in [header] + rows)
+            for column in range(len(header))
+        ]
+
+        lines = [
+            " | ".join(cell.ljust(width) for cell, width in zip(row, widths))
+            for row in [header] + rows
+        ]
+        lines.insert(1, "-+-".join("-" * width for width in widths))
+        lines.append("")
+        lines.append(f"runs: {len(self._runs)}")
+
+        if failed:
+            lines.append(f"failed runs: {len(failed)}")
+
+        lines.append(f"setup time: {self._setup_time:.3f} s")
+        lines.append(f"total time: {self.total_time:.3f} s")
+
+        if self.speedup is not None:
+            lines.append(f"cold run time: {self._cold_time:.3f} s")
+            lines.append(f"amortised speedup: {self.speedup:.2f}x")
+
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"SweepResult({len(self._runs)}, {self.total_time:.3f})"
+
+
+def _format(value: object) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+
+    return str(value)
+
+
+class Sweep:
+    """Runs a grid of simulations over the same map and ignition point.
+
+    The fire layers and the shortest path trees of the map are computed once
+    and shared by every run through a ``PathCache``, including the trees
+    used to find the nearest water source when a truck refuels. Vertices are
+    given by name, also on interned maps, whose cache is keyed by id.
+
+    Example:
+        >>> sweep = Sweep(map, "A1", water_per_vertex)
+        >>> result = sweep.run({
+        ...     "firefighters_position": [["B2", "C3", "D4"]],
+        ...     "trucks": [1, 2, 3],
+        ...     "fire_truck_water_volume": [50, 150],
+        ... })
+        >>> print(result.table())
+    """
+
+    PARAMETERS = (
+        "firefighters_position",
+        "trucks",
+        "water_sources_position",
+        "fire_truck_water_volume",
+    )
+
+    def __init__(
+        self,
+        map: Graph,
+        fire_start_vertex: str,
+        water_needed_extinguish_fire: Dict[str, float],
+        water_sources_position: List[str] | None = None,
+        fire_truck_water_volume: float = 150,
+        max_iterations: int = 150,
+        mode: str = App.TICK,
+    ):
+        """Initializes a sweep over a map.
+
+        Args:
+            map (Graph): The map shared by every run.
+            fire_start_vertex (str): The vertex where the fire starts.
+            water_needed_extinguish_fire (Dict[str, float]): The water needed
+                to put out the fire in each vertex.
+            water_sources_position (List[str], optional): The water sources
+                used when they are not swept.
+            fire_truck_water_volume (float): The tank capacity used when it
+                is not swept.
+            max_iterations (int): The maximum number of updates of each run.
+            mode (str): The time advance mode of each run.
+        """
+        self._map = map
+        self._fire_start_vertex = fire_start_vertex
+        self._water_per_vertex = water_needed_extinguish_fire
+        self._defaults = {
+            "water_sources_position": list(water_sources_position or []),
+            "fire_truck_water_volume": fire_truck_water_volume,
+        }
+        self._max_iterations = max_iterations
+        self._mode = mode
+        self._paths = PathCache(map)
+
+    @property
+    def paths(self) -> PathCache:
+        """Returns the search trees shared by the runs.
+
+        Returns:
+            PathCache: The shared cache.
+        """
+        return self._paths
+
+    def configurations(
+        self, grid: Dict[str, List[object]]
+    ) -> List[Dict[str, object]]:
+        """Expands a grid of parameters into every configuration.
+
+        Args:
+            grid (Dict[str, List[object]]): The values of each swept
+                parameter. ``firefighters_position`` is required, while
+                ``trucks`` limits each post layout to its first posts.
+
+        Raises:
+            ValueError: If a parameter is unknown or the posts are missing.
+
+        Returns:
+            List[Dict[str, object]]: The cartesian product of the values.
+        """
+        for name in grid:
+            if name not in Sweep.PARAMETERS:
+                raise ValueError(f"'{name}' is not a sweep parameter.")
+
+        if "firefighters_position" not in grid:
+            raise ValueError("The firefighters_position must be swept.")
+
+        names = list(grid)
+
+        return [
+            dict(zip(names, values))
+            for values in product(*(grid[name] for name in names))
+        ]
+
+    def precompute(self, vertices: Iterable[str]) -> float:
+        """Computes the map structures needed by the runs ahead of time.
+
+        Args:
+            vertices (Iterable[str]): The vertices whose shortest path trees
+                are computed, besides the fire layers from the ignition point.
+
+        Returns:
+            float: The time spent, in seconds.
+        """
+        registry = self._map.registry
+        intern = registry.intern if registry is not None else lambda v: v
+        start = time.perf_counter()
+        self._paths.layers(intern(self._fire_start_vertex))
+
+        for vertex in vertices:
+            self._paths.tree(intern(vertex))
+
+        return time.perf_counter() - start
+
+    def run(
+        self, grid: Dict[str, List[object]], compare: bool = True
+    ) -> SweepResult:
+        """Runs every configuration of the grid.
+
+        A configuration whose simulation raises an error, such as a
+        ``RecursionError`` on a large map, is recorded as a failed run with
+        the error, and the sweep goes on with the next one.
+
+        Args:
+            grid (Dict[str, List[object]]): The values of each swept
+                parameter, as in ``configurations``.
+            compare (bool): If true, the first configuration is also run
+                without shared structures to estimate the speedup.
+
+        Returns:
+            SweepResult: The results of every configuration.
+        """
+        configurations = self.configurations(grid)
+        cold_time = None
+
+        if compare and configurations:
+            cold = self._run(configurations[0], PathCache(self._map))
+            # a failed run says nothing of the cost of a cold run
+            cold_time = None if cold.failed else cold.elapsed
+
+        posts = set()
+
+        for configuration in configurations:
+            firefighters, water_sources, _ = self._arguments(configuration)
+            posts.update(firefighters + water_sources)
+
+        setup_time = self.precompute(posts)
+        runs = [
+            self._run(configuration, self._paths)
+            for configuration in configurations
+        ]
+
+        return SweepResult(runs, setup_time, cold_time)
+
+    def _arguments(self, configuration: Dict[str, object]):
+        posts = list(configuration["firefighters_position"])
+
+        if "trucks" in configuration:
+            posts = posts[: configuration["trucks"]]
+
+        water_sources = configuration.get(
+            "water_sources_position", self._defaults["water_sources_position"]
+        )
+        volume = configuration.get(
+            "fire_truck_water_volume",
+            self._defaults["fire_truck_water_volume"],
+        )
+
+        return posts, list(water_sources), volume
+
+    def _run(
+        self, configuration: Dict[str, object], paths: PathCache
+    ) -> SweepRun:
+        posts, water_sources, volume = self._arguments(configuration)
+        start = time.perf_counter()
+
+        try:
+            app = App(
+                self._map,
+                self._fire_start_vertex,
+                posts,
+                water_sources,
+                self._water_per_vertex,
+                volume,
+                verbose=0,
+                paths=paths,
+            )
+            app.run(self._max_iterations, self._mode)
+        except Exception as exception:
+            return SweepRun(
+                configuration,
+                None,
+                None,
+                None,
+                None,
+                time.perf_counter() - start,
+                f"{type(exception).__name__}: {exception}",
+            )
+
+        summary = app.summary()
+
+        return SweepRun(
+            configuration,
+            summary["time"],
+            summary["water"],
+            summary["iterations"],
+            summary["put_out"],
+            time.perf_counter() - start,
+        )
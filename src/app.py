@@ -1,12 +1,60 @@
-from typing import Dict, List
+import asyncio
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Self,
+)
 
-from events import EventPool
-from graphs import Graph
+from events import Event, EventPool, EventScheduler, EventStream
+from graphs import Graph, PathCache
 from fire import FireFighter
-from logs import Logger, Timer, Path, WaterCount
+from logs import (
+    Logger,
+    Timer,
+    Path,
+    WaterCount,
+    StepDelta,
+    DeltaRecorder,
+    MemoryReport,
+    History,
+)
+
+
+class Snapshot(NamedTuple):
+    """Compact, picklable state of a simulation at a given iteration.
+
+    The map is not part of the snapshot, so every branch restored from it
+    shares the same map, whether in the same process or in a worker that
+    already holds the map.
+
+    Attributes:
+        fire_start_vertex (str): The vertex where the fire started.
+        water_sources_position (Tuple[str, ...]): The water sources.
+        water_needed_extinguish_fire (Dict[str, float]): The water needed
+            to put out the fire in each vertex.
+        fire_truck_water_volume (float): The tank capacity of the trucks.
+        iteration (int): The number of updates run before the snapshot.
+        firefighter (Tuple): The state of the firefighter and its trucks.
+        logs (Tuple): The state of the logger, timer, path and water counter.
+    """
+
+    fire_start_vertex: str
+    water_sources_position: Tuple[str, ...]
+    water_needed_extinguish_fire: Dict[str, float]
+    fire_truck_water_volume: float
+    iteration: int
+    firefighter: Tuple
+    logs: Tuple
 
 
 class App:
+    TICK = "tick"  # Advances the simulation one update at a time.
+    EVENT = "event"  # Jumps straight to the next scheduled event.
+
     def __init__(
         self,
         map: Graph,
@@ -16,14 +64,32 @@ class App:
         water_needed_extinguish_fire: Dict[str, float],
         fire_truck_water_volume: float = 150,
         verbose: int = 1,
+        paths: PathCache | None = None,
+        fire_layers: Dict[float, List[str]] | None = None,
+        memory: MemoryReport | None = None,
+        history: History | None = None,
     ):
         self._map = map
-        self._fire_start_vertex = fire_start_vertex
-        self._firefighters_position = firefighters_position
-        self._water_sources_position = water_sources_position
-        self._water_per_vertex = water_needed_extinguish_fire
+        self._registry = map.registry
+        intern = self._intern
+        self._fire_start_vertex = intern(fire_start_vertex)
+        self._firefighters_position = [
+            intern(vertex) for vertex in firefighters_position
+        ]
+        self._water_sources_position = [
+            intern(vertex) for vertex in water_sources_position
+        ]
+        self._water_per_vertex = (
+            {
+                intern(vertex): water
+                for vertex, water in water_needed_extinguish_fire.items()
+            }
+            if self._registry is not None
+            else water_needed_extinguish_fire
+        )
         self._fire_truck_volume = fire_truck_water_volume
         self._event_pool = EventPool()
+        self._scheduler = EventScheduler()
         self._firefighters = FireFighter(
             self.map,
             self._fire_start_vertex,
@@ -32,15 +98,27 @@ class App:
             self._water_per_vertex,
             self._water_sources_position,
             self._event_pool,
+            paths,
+            fire_layers,
         )
         self._verbose = verbose
+        self._iteration = 0
+        self._started = False
         self._already_runned = False
+        # verbose == 0 disables the log
         # verbose == 1 enables file log
         # verbose == 2 enables file log and prints
-        self._logger = Logger("simulation.txt", self._verbose == 2)
+        self._logger = Logger(
+            "simulation.txt" if self._verbose else None,
+            self._verbose == 2,
+            self._registry,
+        )
         self._timer = Timer()
         self._path = Path()
-        self._water_counter = WaterCount(water_needed_extinguish_fire)
+        self._water_counter = WaterCount(self._water_per_vertex)
+        self._memory = memory
+        self._history = history
+        self._history_recorder: DeltaRecorder | None = None
 
     @property
     def map(self) -> Graph:
@@ -50,30 +128,409 @@ class App:
             Graph: the app map"""
         return self._map
 
+    def _intern(self, vertex: str) -> int | str:
+        """Returns the id of a vertex given by name on an interned map."""
+        if self._registry is None:
+            return vertex
+
+        return self._registry.intern(vertex)
+
+    def _resolve(self, event: Event) -> Event:
+        """Returns an event naming its target on an interned map."""
+        if self._registry is None:
+            return event
+
+        resolve = self._registry.resolve
+
+        return Event(
+            event.type,
+            tuple(map(resolve, event.target))
+            if event.type == Event.ON_TRAVEL
+            else resolve(event.target),
+            event.sender_id,
+            event.receiver_id,
+        )
+
+    @property
+    def on_fire_vertices(self) -> List[str]:
+        """Returns the vertices on fire.
+
+        Returns:
+            List[str]: The vertices on fire, as given to the map. It must
+                not be modified."""
+        return self._firefighters.on_fire_vertices
+
+    @property
+    def ended(self) -> bool:
+        """Tells whether the simulation is over.
+
+        Returns:
+            bool: True if no vertex is on fire, or no truck can reach one.
+        """
+        return self._firefighters.end()
+
+    def threatened(self, future: bool = False) -> bool:
+        """Tells whether a truck can reach a vertex on fire.
+
+        Args:
+            future (bool): If true, the vertices the fire layers will still
+                reach count as on fire, as in ``FireFighter.threatened``.
+
+        Returns:
+            bool: True if a truck can reach a vertex on fire.
+        """
+        return self._firefighters.threatened(future)
+
+    @property
+    def iteration(self) -> int:
+        """Returns the number of updates run so far.
+
+        Returns:
+            int: the number of updates"""
+        return self._iteration
+
     def start(self):
+        self.listen_logs()
+        self._logger.handle(self._event_pool.event)
+
+        if self._history is not None:
+            self._history_recorder = DeltaRecorder(
+                self._water_per_vertex, self._registry
+            )
+            self._event_pool.listen(self._history_recorder)
+
+        self._firefighters.start()
+        self._started = True
+
+        if self._history is not None:
+            # the start is in the first keyframe
+            self._history_recorder.take(self._iteration)
+            self._keyframe_history(self._iteration)
+
+        if self._memory is not None:
+            self._memory.start()
+            self._sample_memory(self._iteration)
+
+    def listen_logs(self):
         self._event_pool.listen(self._logger)
         self._event_pool.listen(self._timer)
         self._event_pool.listen(self._path)
         self._event_pool.listen(self._water_counter)
 
-        self._logger.handle(self._event_pool.event)
-
-        self._firefighters.start()
-
     def update(self):
         """update state function"""
         self._firefighters.update()
 
-    def run(self, max_iterations=150):
-        """main loop"""
-        self.start()
-        counter = max_iterations
+    def advance(self, iterations: int, mode: str = TICK) -> int:
+        """Runs the simulation for a number of updates without finishing it.
+
+        The simulation is started on the first call and can be advanced
+        again, snapshotted or finished with ``run`` afterwards.
+
+        Args:
+            iterations (int): The maximum number of updates to run.
+            mode (str): ``App.TICK`` runs every update, while ``App.EVENT``
+                skips the updates in which trucks are only travelling and
+                no fire layer ignites. Both modes produce the same results.
+
+        Raises:
+            ValueError: If the mode is unknown.
+
+        Returns:
+            int: The number of updates run, which is less than the given
+                number if the simulation ended.
+        """
+        if mode not in (App.TICK, App.EVENT):
+            raise ValueError(f"'{mode}' is not a valid time advance mode.")
+
+        if not self._started:
+            self.start()
+
+        counter = iterations
+
+        if mode == App.EVENT:
+            self._scheduler = EventScheduler()
+            self._firefighters.schedule_fire(self._scheduler)
+
+        while not self.ended and counter:
+            if mode == App.EVENT:
+                idle = self._firefighters.idle_ticks(self._scheduler, counter)
+
+                if idle > 0:
+                    self._skip(idle, self._iteration + iterations - counter)
+                    counter -= idle
+                    self._sample_memory(self._iteration + iterations - counter)
+                    continue
 
-        while not self._firefighters.end() and counter:
             self.update()
             counter -= 1
+            self._record_history(self._iteration + iterations - counter)
+            self._sample_memory(self._iteration + iterations - counter)
+
+        self._iteration += iterations - counter
+
+        return iterations - counter
+
+    def run(self, max_iterations=150, mode: str = TICK):
+        """main loop
+
+        Args:
+            max_iterations (int): The maximum number of updates, counting
+                the ones already run by ``advance`` or before a snapshot.
+            mode (str): The time advance mode, as in ``advance``.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        self.advance(max(0, max_iterations - self._iteration), mode)
+        self.log_end(max_iterations - self._iteration)
+
+    def iter_steps(self, max_iterations: int = 150) -> Iterator[StepDelta]:
+        """Runs the simulation one update at a time, yielding its changes.
+
+        If the simulation was not started yet, the first delta holds the
+        changes of the start, with iteration 0. Only the changes of the
+        current update are kept, so the caller can stop early, sample or
+        forward the deltas without buffering the whole run. Like ``run``,
+        the simulation is finished once every delta has been consumed.
+
+        Example:
+            >>> for delta in app.iter_steps():
+            ...     if len(delta.ignited) > 10:
+            ...         break
+
+        Args:
+            max_iterations (int): The maximum number of updates, as in
+                ``run``.
+
+        Yields:
+            StepDelta: The changes of each update, in order.
+        """
+        recorder = DeltaRecorder(self._water_per_vertex, self._registry)
+        self._event_pool.listen(recorder)
+
+        try:
+            if not self._started:
+                self.start()
+                yield recorder.take(self._iteration)
+
+            while self._iteration < max_iterations:
+                if self.advance(1) == 0:
+                    break
+
+                yield recorder.take(self._iteration)
+
+            self.log_end(max_iterations - self._iteration)
+        finally:
+            self._event_pool.unlisten(recorder)
+
+    async def stream(
+        self,
+        max_iterations: int = 150,
+        maxsize: int = 256,
+        policy: str = EventStream.BLOCK,
+        deltas: bool = False,
+    ) -> AsyncIterator[Event | StepDelta]:
+        """Runs the simulation while yielding its events asynchronously.
+
+        The simulation runs one update at a time as a task of the running
+        event loop, and its events go through a bounded queue read by the
+        caller. Like ``run``, the simulation is finished when the stream
+        ends, so ``results`` and ``summary`` can be used afterwards.
+        Leaving the loop early cancels the simulation where it stands.
+
+        Example:
+            >>> async for event in app.stream(policy=EventStream.COALESCE):
+            ...     await dashboard.send(event)
+
+        Args:
+            max_iterations (int): The maximum number of updates, as in
+                ``run``.
+            maxsize (int): The maximum number of events waiting for the
+                consumer.
+            policy (str): What to do when the consumer lags behind, as in
+                ``EventStream``. Only ``EventStream.BLOCK`` makes the
+                simulation wait for the consumer, and
+                ``EventStream.COALESCE`` when only ignitions are pending.
+                Coalesced deltas are merged, so no change is lost.
+            deltas (bool): If true, the changes of each update are yielded,
+                as in ``iter_steps``, instead of the events.
+
+        Raises:
+            ValueError: If the size or the policy is invalid.
+
+        Yields:
+            Event | StepDelta: The events or the deltas of the simulation,
+                in order.
+        """
+        if deltas:
+            stream = EventStream(
+                maxsize, policy, key=lambda _: "delta", merge=StepDelta.merge
+            )
+            steps = self.iter_steps(max_iterations)
+        else:
+            stream = EventStream(maxsize, policy)
+            self._event_pool.listen(stream)
+            steps = self._steps(max_iterations)
+
+        producer = asyncio.create_task(self._produce(stream, steps))
+
+        try:
+            async for item in stream:
+                yield item if deltas else self._resolve(item)
+        finally:
+            producer.cancel()
+
+            if not deltas:
+                self._event_pool.unlisten(stream)
+
+    def _steps(self, max_iterations: int) -> Iterator[None]:
+        if not self._started:
+            self.start()
+            yield
+
+        while self._iteration < max_iterations:
+            if self.advance(1) == 0:
+                break
+
+            yield
 
-        self.log_end(counter)
+        self.log_end(max_iterations - self._iteration)
+
+    async def _produce(self, stream: EventStream, steps: Iterator):
+        error = None
+
+        try:
+            for step in steps:
+                if step is not None:
+                    stream.publish(step)
+
+                await stream.flush()
+                # lets the consumers run between updates
+                await asyncio.sleep(0)
+        except Exception as exception:
+            error = exception
+        finally:
+            # also removes the listener of the deltas when cancelled
+            steps.close()
+
+        await stream.close(error)
+
+    def snapshot(self) -> Snapshot:
+        """Captures the state of the simulation to branch from it later.
+
+        Raises:
+            RuntimeError: If the simulation has not been started yet.
+
+        Returns:
+            Snapshot: The state of the simulation.
+        """
+        if not self._started:
+            raise RuntimeError(
+                "You must start the simulation before taking a snapshot."
+            )
+
+        return Snapshot(
+            self._fire_start_vertex,
+            tuple(self._water_sources_position),
+            self._water_per_vertex,
+            self._fire_truck_volume,
+            self._iteration,
+            self._firefighters.snapshot(),
+            (
+                self._logger.snapshot(),
+                self._timer.snapshot(),
+                self._path.snapshot(),
+                self._water_counter.snapshot(),
+            ),
+        )
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        map: Graph,
+        snapshot: Snapshot,
+        verbose: int = 1,
+        paths: PathCache | None = None,
+    ) -> Self:
+        """Creates a simulation that resumes from a snapshot.
+
+        The returned app can be changed before resuming, for example with
+        ``add_truck``, to branch an alternative from the snapshot.
+
+        Args:
+            map (Graph): The map of the simulation that was snapshotted.
+            snapshot (Snapshot): The state to resume from.
+            verbose (int): The verbosity of the new simulation.
+            paths (PathCache, optional): The search trees of the map shared
+                with other simulations.
+
+        Returns:
+            App: A started simulation in the snapshotted state.
+        """
+        positions = snapshot.firefighter[0]
+        app = cls(
+            map,
+            snapshot.fire_start_vertex,
+            list(positions),
+            list(snapshot.water_sources_position),
+            snapshot.water_needed_extinguish_fire,
+            snapshot.fire_truck_water_volume,
+            verbose,
+            paths,
+        )
+
+        counter, timer, path, water = snapshot.logs
+        app._logger.restore(counter)
+        app._timer.restore(timer)
+        app._path.restore(path)
+        app._water_counter.restore(water)
+
+        app.listen_logs()
+        app._firefighters.restore(snapshot.firefighter)
+        app._iteration = snapshot.iteration
+        app._started = True
+
+        return app
+
+    def block_vertices(self, vertices: List[str]):
+        """Makes vertices of the map impassable during the simulation.
+
+        The trucks reroute around the blocked vertices. The map is changed
+        in place, so it must not be shared with other running simulations.
+
+        Args:
+            vertices (List[str]): The vertices to block.
+
+        Raises:
+            RuntimeError: If the simulation has not been started yet.
+        """
+        if not self._started:
+            raise RuntimeError(
+                "You must start the simulation before blocking vertices."
+            )
+
+        self._firefighters.block_vertices(
+            [self._intern(vertex) for vertex in vertices]
+        )
+        self._keyframe_history(self._iteration)
+
+    def add_truck(self, position: str):
+        """Adds a truck at a new firefighter post to a started simulation.
+
+        Args:
+            position (str): The post where the truck starts.
+
+        Raises:
+            RuntimeError: If the simulation has not been started yet.
+        """
+        if not self._started:
+            raise RuntimeError(
+                "You must start the simulation before adding a truck."
+            )
+
+        self._firefighters.add_truck(self._intern(position))
+        self._keyframe_history(self._iteration)
 
     def log_end(self, counter):
         if counter == 0:
@@ -108,6 +565,147 @@ class App:
         self._logger.log("--------------------------------------------")
         self.log_result()
 
+        if self._memory is not None:
+            self._sample_memory(self._iteration, True)
+            self._memory.stop()
+            self._memory.save()
+
+    def summary(self) -> Dict[str, object]:
+        """Returns the results after execution without logging them.
+
+        Raises:
+            RuntimeError: If the execution has not been run yet.
+
+        Returns:
+            Dict[str, object]: The simulation time, the water spent, the
+                number of updates run and whether the fire was put out.
+        """
+        if not self._already_runned:
+            raise RuntimeError(
+                "You must run the process before retrieving results."
+            )
+
+        return {
+            "time": self._timer.time,
+            "water": self._water_counter.count,
+            "iterations": self._iteration,
+            "put_out": len(self._firefighters.not_burned_vertices) == 0,
+        }
+
+    @property
+    def paths(self) -> Dict[str, List[str]]:
+        """Returns the vertices visited by each truck.
+
+        Returns:
+            Dict[str, List[str]]: The vertex names visited by each truck, by
+                the id of the truck as a string.
+        """
+        name = self._logger.name
+
+        return {
+            key: [name(vertex) for vertex in self._path.vertices(key)]
+            for key in self._path.trucks
+        }
+
+    def _skip(self, ticks: int, iteration: int):
+        """Skips idle updates at once, splitting their changes into one
+        delta per update if they are recorded.
+
+        Args:
+            ticks (int): The number of updates to skip.
+            iteration (int): The number of updates run before them.
+        """
+        if self._history is None:
+            self._firefighters.skip(ticks)
+            return
+
+        name = self._logger.name
+        trucks = {
+            truck.id: name(truck.location)
+            for truck in self._firefighters.fire_trucks
+        }
+        self._firefighters.skip(ticks)
+
+        for delta in self._history_recorder.take_ticks(iteration, ticks):
+            # keyframes hold the trucks where that update left them
+            trucks.update(delta.moves)
+            self._history.record(delta)
+
+            if self._history.due(delta.iteration):
+                self._keyframe_history(delta.iteration, trucks)
+
+    def _record_history(self, iteration: int):
+        """Records the changes of the last update in the history, if any,
+        and a keyframe when one is due.
+
+        Args:
+            iteration (int): The number of updates run.
+        """
+        if self._history is None:
+            return
+
+        self._history.record(self._history_recorder.take(iteration))
+
+        if self._history.due(iteration):
+            self._keyframe_history(iteration)
+
+    def _keyframe_history(
+        self, iteration: int, trucks: Dict[int, str] | None = None
+    ):
+        """Records the whole state in the history, if any.
+
+        Args:
+            iteration (int): The number of updates run.
+            trucks (Dict[int, str], optional): The vertex name of each truck.
+                Defaults to where the trucks are now.
+        """
+        if self._history is None:
+            return
+
+        name = self._logger.name
+
+        if trucks is None:
+            trucks = {
+                truck.id: name(truck.location)
+                for truck in self._firefighters.fire_trucks
+            }
+
+        self._history.keyframe(
+            iteration,
+            [name(vertex) for vertex in self._firefighters.on_fire_vertices],
+            trucks,
+            self._water_counter.count,
+        )
+
+    def _sample_memory(self, iteration: int, force: bool = False):
+        """Samples the memory report, if any, when a sample is due.
+
+        Args:
+            iteration (int): The number of updates run.
+            force (bool): If true, the sample is taken even if not due.
+        """
+        if self._memory is None:
+            return
+
+        if force or self._memory.due(iteration):
+            firefighters = self._firefighters
+            self._memory.sample(
+                iteration,
+                {
+                    "map": self._map,
+                    "search": firefighters.paths,
+                    "fleet": firefighters.fleet,
+                    "fire": firefighters,
+                    "events": (self._event_pool, self._scheduler),
+                    "logs": (
+                        self._logger,
+                        self._timer,
+                        self._path,
+                        self._water_counter,
+                    ),
+                },
+            )
+
     def log_result(self):
         if len(self._firefighters.not_burned_vertices) == 0:
             self._logger.log("result: The fire was put out")
@@ -115,12 +713,13 @@ class App:
             self._logger.log("result: Could not put out the fire")
 
     def log_paths(self):
-        for key, value in self._path.paths.items():
+        for key in self._path.trucks:
             self._logger.log(
                 f"\tfire truck {key}: [",
             )
+            last = self._path.length(key) - 1
 
-            for i, char in enumerate(value):
-                self._logger.log(f"\t\t'{char}'", end="")
-                self._logger.log("," if i < len(value) - 1 else "\n\t],")
+            for i, char in enumerate(self._path.vertices(key)):
+                self._logger.log(f"\t\t'{self._logger.name(char)}'", end="")
+                self._logger.log("," if i < last else "\n\t],")
         self._logger.log("]")
@@ -1,7 +1,11 @@
 from events.event import EventPool, EventListener, Event
+from events.scheduler import EventScheduler
+from events.stream import EventStream
 
 __all__ = [
     "EventPool",
     "EventListener",
     "Event",
+    "EventScheduler",
+    "EventStream",
 ]
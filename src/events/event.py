@@ -16,6 +16,9 @@ class Event:
     ON_WAIT = "onwait"  # Event when a truck must wait for another.
     ON_SET = "onset"  # Event when a manager sets a target for a truck.
     ON_MOVE = "onmove"  # Event when a fire truck move to a vertex.
+    # Event when a fire truck moves along several vertices at once, given
+    # in order as the target.
+    ON_TRAVEL = "ontravel"
 
     def __init__(
         self,
@@ -210,6 +213,15 @@ class EventPool(ABC):
         """
         return self._state
 
+    @event.setter
+    def event(self, event: Event):
+        """Replaces the current event state without notifying listeners.
+
+        Args:
+            event (Event): The new current event.
+        """
+        self._state = event
+
     @property
     def listeners(self) -> List[EventListener]:
         """Returns all registered event listeners.
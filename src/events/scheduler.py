@@ -0,0 +1,147 @@
+import heapq
+from itertools import count
+from typing import Dict, Hashable, List, Tuple
+
+from events.event import Event
+
+
+class EventScheduler:
+    """Priority queue of timestamped events used to advance the clock.
+
+    Events are ordered by their timestamp and, for the same timestamp, by
+    insertion order. An event may be scheduled with a key; scheduling a new
+    event with the same key supersedes the previous one, which is then
+    discarded lazily when it reaches the top of the queue.
+
+    Attributes:
+        _queue (List[Tuple[int, int, Hashable, Event]]): The heap of
+            scheduled events as ``(time, sequence, key, event)`` tuples.
+        _latest (Dict[Hashable, int]): The sequence number of the most
+            recent event scheduled for each key.
+        _clock (int): The current time of the scheduler.
+    """
+
+    def __init__(self, clock: int = 0):
+        """Initializes an empty scheduler.
+
+        Args:
+            clock (int): The initial time of the scheduler. Defaults to 0.
+        """
+        self._queue: List[Tuple[int, int, Hashable, Event]] = []
+        self._latest: Dict[Hashable, int] = {}
+        self._sequence = count()
+        self._clock = clock
+
+    @property
+    def clock(self) -> int:
+        """Returns the current time of the scheduler.
+
+        Returns:
+            int: The current time.
+        """
+        return self._clock
+
+    def schedule(
+        self, time: int, event: Event, key: Hashable | None = None
+    ) -> None:
+        """Schedules an event to happen at the given time.
+
+        Args:
+            time (int): The time at which the event happens.
+            event (Event): The event to schedule.
+            key (Hashable, optional): If specified, the event replaces any
+                event previously scheduled with the same key.
+
+        Raises:
+            ValueError: If the time is before the current clock.
+        """
+        if time < self._clock:
+            raise ValueError(
+                f"can not schedule an event at {time} before the clock {self._clock}."
+            )
+
+        sequence = next(self._sequence)
+
+        if key is not None:
+            self._latest[key] = sequence
+
+        heapq.heappush(self._queue, (time, sequence, key, event))
+
+    def cancel(self, key: Hashable) -> None:
+        """Cancels the event scheduled with the given key, if any.
+
+        Args:
+            key (Hashable): The key of the event to cancel.
+        """
+        self._latest.pop(key, None)
+
+    def next_time(self) -> int | None:
+        """Returns the time of the earliest pending event.
+
+        Returns:
+            int | None: The time of the next event or None if there is no
+                pending event.
+        """
+        self._discard_stale()
+
+        if self._queue:
+            return self._queue[0][0]
+
+        return None
+
+    def advance(self, time: int) -> List[Event]:
+        """Moves the clock to the given time and pops the events due by then.
+
+        Args:
+            time (int): The new time of the scheduler.
+
+        Raises:
+            ValueError: If the time is before the current clock.
+
+        Returns:
+            List[Event]: The events scheduled up to the given time, in order.
+        """
+        if time < self._clock:
+            raise ValueError(
+                f"can not move the clock back from {self._clock} to {time}."
+            )
+
+        due = []
+        self._clock = time
+        self._discard_stale()
+
+        while self._queue and self._queue[0][0] <= time:
+            _, sequence, key, event = heapq.heappop(self._queue)
+
+            if key is not None:
+                self._latest.pop(key, None)
+
+            due.append(event)
+            self._discard_stale()
+
+        return due
+
+    def clear(self) -> None:
+        """Removes all pending events without moving the clock."""
+        self._queue.clear()
+        self._latest.clear()
+
+    def _discard_stale(self) -> None:
+        """Drops superseded or cancelled events from the top of the queue."""
+        while self._queue:
+            _, sequence, key, _ = self._queue[0]
+
+            if key is None or self._latest.get(key) == sequence:
+                return
+
+            heapq.heappop(self._queue)
+
+    def __len__(self) -> int:
+        return sum(
+            1
+            for _, sequence, key, _ in self._queue
+            if key is None or self._latest.get(key) == sequence
+        )
+
+    def __repr__(self):
+        return f"EventScheduler({self._clock}, {len(self._queue)})"
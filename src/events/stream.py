@@ -0,0 +1,245 @@
+import asyncio
+from typing import Callable, Dict, Hashable, List
+
+from events.event import Event, EventListener
+
+
+def event_key(event: Event) -> Hashable:
+    """Returns the key under which pending events are coalesced.
+
+    Events of the same type sent by the same truck replace each other, so a
+    lagging consumer only sees the latest move, target or refuel of each
+    truck, while every vertex catching fire is kept, see ``event_kept``.
+    """
+    if event.type == Event.ON_GET_FIRE:
+        return (event.type, event.target)
+
+    return (event.type, event.sender_id)
+
+
+def event_kept(item: object) -> bool:
+    """Tells whether a pending item must never be discarded.
+
+    Vertices catching fire are kept, while the other events can be
+    discarded to make room, since a newer one of the same truck replaces
+    them anyway.
+    """
+    return isinstance(item, Event) and item.type == Event.ON_GET_FIRE
+
+
+class EventStream(EventListener):
+    """Bounded asynchronous queue of the events of a simulation.
+
+    The stream listens to the event pool like the loggers do, but only
+    buffers the events while the simulation updates. ``flush`` moves them
+    into a bounded queue between updates, where a consumer reads them at
+    its own pace. When the queue is full, the policy decides whether the
+    simulation waits for the consumer or events are discarded, so a slow
+    consumer never stalls the simulation unless it asks to.
+
+    Under ``COALESCE``, an item whose key is pending is merged into it. A
+    new key makes room by discarding the oldest pending item that is not
+    kept, and waits for the consumer like ``BLOCK`` if every pending item
+    is kept, so no vertex catching fire is ever discarded.
+
+    Attributes:
+        _pending (Dict[Hashable, object]): The pending item of each key, in
+            the order they are read.
+        _buffer (List[object]): The items received since the last flush.
+        _dropped (int): The number of items discarded or coalesced.
+    """
+
+    BLOCK = "block"  # The simulation waits until the consumer makes room.
+    DROP_OLDEST = "drop_oldest"  # The oldest pending item is discarded.
+    COALESCE = "coalesce"  # Pending items with the same key are merged.
+
+    _END = object()
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        policy: str = BLOCK,
+        key: Callable[[object], Hashable] = event_key,
+        merge: Callable[[object, object], object] | None = None,
+        kept: Callable[[object], bool] = event_kept,
+    ):
+        """Initializes an empty stream.
+
+        Args:
+            maxsize (int): The maximum number of pending items.
+            policy (str): What to do when the queue is full, either
+                ``EventStream.BLOCK``, ``EventStream.DROP_OLDEST`` or
+                ``EventStream.COALESCE``.
+            key (Callable[[object], Hashable]): The key of each item used
+                by the ``EventStream.COALESCE`` policy.
+            merge (Callable[[object, object], object], optional): Combines
+                a pending item with a newer one of the same key. Defaults to
+                keeping the newer one.
+            kept (Callable[[object], bool]): Tells the items never
+                discarded by the ``EventStream.COALESCE`` policy to make
+                room for a new key.
+
+        Raises:
+            ValueError: If the size is not positive or the policy unknown.
+        """
+        if maxsize <= 0:
+            raise ValueError(
+                f"maxsize must be greater than zero but is '{maxsize}'."
+            )
+
+        if policy not in (
+            EventStream.BLOCK,
+            EventStream.DROP_OLDEST,
+            EventStream.COALESCE,
+        ):
+            raise ValueError(f"'{policy}' is not a backpressure policy.")
+
+        self._maxsize = maxsize
+        self._pending: Dict[Hashable, object] = {}
+        # set when an item is added, and when one is read
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._buffer: List[object] = []
+        self._policy = policy
+        self._key = key
+        self._merge = merge
+        self._kept = kept
+        self._sequence = 0
+        self._dropped = 0
+        self._error: BaseException | None = None
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def dropped(self) -> int:
+        """Returns how many items the consumer will never see.
+
+        Returns:
+            int: The number of items discarded or merged into a newer one.
+        """
+        return self._dropped
+
+    def handle(self, event: Event):
+        """Buffers an event until the next flush.
+
+        Args:
+            event (Event): The event to buffer.
+        """
+        self._buffer.append(event)
+
+    def publish(self, item: object):
+        """Buffers any item, such as a step delta, until the next flush.
+
+        Args:
+            item (object): The item to buffer.
+        """
+        self._buffer.append(item)
+
+    async def flush(self) -> None:
+        """Moves the buffered items into the queue, applying the policy.
+
+        Only the ``EventStream.BLOCK`` policy waits for the consumer, and
+        the ``EventStream.COALESCE`` one if every pending item is kept.
+        """
+        buffer, self._buffer = self._buffer, []
+
+        for item in buffer:
+            await self._put(item)
+
+    async def close(self, error: BaseException | None = None) -> None:
+        """Flushes the buffer and marks the end of the stream.
+
+        Args:
+            error (BaseException, optional): If specified, the error that
+                stopped the producer, raised to the consumer once it has
+                read the pending items.
+        """
+        self._error = error
+        await self.flush()
+        await self._put(EventStream._END, key=EventStream._END)
+
+    async def get(self) -> object:
+        """Waits for the next item.
+
+        Raises:
+            StopAsyncIteration: If the stream was closed.
+
+        Returns:
+            object: The oldest pending item.
+        """
+        while not self._pending:
+            self._readable.clear()
+            await self._readable.wait()
+
+        key = next(iter(self._pending))
+        item = self._pending.pop(key)
+        self._writable.set()
+
+        if item is EventStream._END:
+            if self._error is not None:
+                raise self._error
+
+            raise StopAsyncIteration
+
+        return item
+
+    async def _put(self, item: object, key: Hashable | None = None):
+        if key is None:
+            if self._policy == EventStream.COALESCE:
+                key = self._key(item)
+            else:
+                # every item is its own key
+                key = self._sequence
+                self._sequence += 1
+
+        if key in self._pending:
+            if self._merge is not None:
+                item = self._merge(self._pending[key], item)
+
+            self._pending[key] = item
+            self._dropped += 1
+            return
+
+        if len(self._pending) >= self._maxsize:
+            victim = self._victim() if key is not EventStream._END else None
+
+            if victim is None:
+                await self._wait_for_room()
+            else:
+                del self._pending[victim]
+                self._dropped += 1
+
+        self._pending[key] = item
+        self._readable.set()
+
+    def _victim(self) -> Hashable | None:
+        """Returns the key of the pending item discarded to make room, or
+        None if the policy waits for the consumer instead."""
+        if self._policy == EventStream.DROP_OLDEST:
+            return next(iter(self._pending))
+
+        if self._policy == EventStream.COALESCE:
+            for key, item in self._pending.items():
+                if item is not EventStream._END and not self._kept(item):
+                    return key
+
+        return None
+
+    async def _wait_for_room(self):
+        while len(self._pending) >= self._maxsize:
+            self._writable.clear()
+            await self._writable.wait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> object:
+        return await self.get()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __repr__(self):
+        return f"EventStream({self._policy}, {len(self._pending)}/{self._maxsize})"
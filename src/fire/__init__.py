@@ -1,9 +1,11 @@
 from fire.allocator import Allocator
 from fire.firetruck import FireTruck
+from fire.fleet import Fleet
 from fire.firefighter import FireFighter
 
 __all__ = [
     "FireTruck",
+    "Fleet",
     "FireFighter",
     "Allocator"
 ]
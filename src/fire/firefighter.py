@@ -1,8 +1,9 @@
-from typing import Dict, List, Set
+import math
+from typing import Dict, List, Set, Tuple
 
-from fire import FireTruck, Allocator
-from graphs import Graph, breadth_first_search
-from events import Event, EventPool
+from fire import FireTruck, Fleet, Allocator
+from graphs import Graph, PathCache
+from events import Event, EventPool, EventScheduler
 
 
 class FireFighter(Allocator):
@@ -15,19 +16,39 @@ class FireFighter(Allocator):
         water_per_vertex: Dict[str, float],
         water_sources: List[str],
         event_pool: EventPool,
+        paths: PathCache | None = None,
+        fire_layers: Dict[float, List[str]] | None = None,
     ):
         self._map = map
+        self._paths = paths if paths is not None else PathCache(map)
         self._water_per_vertex = water_per_vertex
-        self._on_fire_vertices = [start_fire_vertex]
+        self._on_fire_vertices = (
+            [start_fire_vertex] if start_fire_vertex is not None else []
+        )
         self._burned_vertices = set()
+        self._blocked_vertices = set()
         self._event_pool = event_pool
         self._allocataded: List[str] = []
-        self._fire_path = breadth_first_search(self._map, start_fire_vertex)
+        # a partitioned simulation spreads the layers as they are read
+        self._fire_layers = (
+            fire_layers
+            if fire_layers is not None
+            else self._paths.layers(start_fire_vertex)
+        )
         self._fire_distance = 0
         self._positions = positions
         self._start_fire_vertex = start_fire_vertex
         self._tank_water_capacity = tank_water_capacity
         self._water_sources = water_sources
+        self._fleet = Fleet(
+            map,
+            tank_water_capacity,
+            water_per_vertex,
+            water_sources,
+            positions,
+            self,
+            self._paths,
+        )
 
     @property
     def burned_vertices(self) -> List[str]:
@@ -48,24 +69,26 @@ class FireFighter(Allocator):
 
     @property
     def fire_trucks(self) -> List[FireTruck]:
-        return [
-            listener
-            for listener in self._event_pool.listeners
-            if isinstance(listener, FireTruck)
-        ]
+        return self._fleet.trucks
+
+    @property
+    def fleet(self) -> Fleet:
+        return self._fleet
+
+    @property
+    def paths(self) -> PathCache:
+        return self._paths
 
     @property
     def event(self):
         return self._event_pool.event
 
-    def fire_distances(self):
-        dist = []
-        
-        for _, path in self._fire_path.items():
-            if path["distance"] not in dist:
-                dist.append(path["distance"]) 
+    def fire_distances(self) -> List[float]:
+        return list(self._fire_layers)
 
-        return dist
+    @property
+    def clock(self) -> int:
+        return self._fire_distance
 
     def notify(self, event: Event):
         self._event_pool.notify(event)
@@ -78,14 +101,16 @@ class FireFighter(Allocator):
         self._fire_distance += 1
         new_fire = []
 
-        if self._fire_distance in self.fire_distances():
-            for vertex, path in self._fire_path.items():
-                if (
-                    path["distance"] == self._fire_distance
-                    and vertex in self.not_burned_vertices
-                ):
-                    self._on_fire_vertices.insert(-1, vertex)
-                    new_fire.insert(-1, vertex)
+        for vertex in self._fire_layers.get(self._fire_distance, []):
+            if vertex in self._blocked_vertices:
+                continue
+
+            if (
+                vertex not in self._on_fire_vertices
+                or vertex not in self._burned_vertices
+            ):
+                self._on_fire_vertices.insert(-1, vertex)
+                new_fire.insert(-1, vertex)
 
         return new_fire
 
@@ -98,15 +123,69 @@ class FireFighter(Allocator):
             return
 
     def move_truck(self, index_truck: int, vertex: str):
-        truck = self.fire_trucks[index_truck]
+        truck = self._fleet[index_truck]
         truck.schedule_move_to(vertex)
 
     def refuel_truck(self, index_truck: int):
-        truck = self.fire_trucks[index_truck]
+        truck = self._fleet[index_truck]
         truck.schedule_refuel()
 
-    def next(self):
+    def reachable(self, index_truck: int, vertex: str) -> bool:
+        """Tells whether a truck can drive to a vertex.
+
+        Args:
+            index_truck (int): The id of the truck.
+            vertex (str): The vertex.
+
+        Returns:
+            bool: True if the vertex is in the component of the truck.
+        """
+        return self._paths.components.connected(
+            self._fleet[index_truck].location, vertex
+        )
+
+    def threatened(self, future: bool = False) -> bool:
+        """Tells whether a truck can reach a vertex on fire.
+
+        The fire spreads within the component it started in, so once no
+        truck can reach it, nothing but the fire changes any more. The
+        vertices the layers will still set on fire can be counted too.
+
+        Args:
+            future (bool): If true, the vertices of the layers still to
+                spread count as on fire.
+
+        Returns:
+            bool: True if a vertex on fire is in the component of a truck.
+        """
+        components = self._paths.components
+        guarded = {
+            components.component(truck.location) for truck in self.fire_trucks
+        }
+
+        if any(
+            components.component(vertex) in guarded
+            for vertex in self._on_fire_vertices
+        ):
+            return True
+
+        if not future:
+            return False
+
+        return any(
+            components.component(vertex) in guarded
+            for distance, layer in self._fire_layers.items()
+            if self._fire_distance < distance < math.inf
+            for vertex in layer
+            if vertex not in self._blocked_vertices
+        )
+
+    def next(self, index_truck: int | None = None):
         for i in self.on_fire_vertices:
+            # the fires a truck cannot reach are left to the others
+            if index_truck is not None and not self.reachable(index_truck, i):
+                continue
+
             if i not in self._allocataded:
                 self._allocataded.append(i)
                 return i
@@ -115,26 +194,140 @@ class FireFighter(Allocator):
 
         return None
 
+    def block_vertices(self, vertices: List[str]):
+        """Makes vertices impassable, for example firebreaks or roads blocked
+        by a burned-out area.
+
+        The vertices are removed from the map, the cached routes are repaired
+        around them and every truck plans a new path. A blocked vertex on
+        fire is considered burned out, and the fire no longer spreads to it,
+        although it still spreads through it along the original layers.
+
+        Args:
+            vertices (List[str]): The vertices to block.
+
+        Raises:
+            ValueError: If a truck is on one of the vertices.
+        """
+        vertices = [v for v in vertices if v in self._map.vertices]
+
+        for truck in self.fire_trucks:
+            if truck.location in vertices:
+                raise ValueError(
+                    f"can not block '{truck.location}' with the fire truck '{truck.id}' on it."
+                )
+
+        # the requested routes are planned on the map they were asked on
+        self._fleet.plan()
+        self._paths.remove_vertices(vertices)
+        self._blocked_vertices.update(vertices)
+
+        for vertex in vertices:
+            if vertex in self._on_fire_vertices:
+                self._on_fire_vertices.remove(vertex)
+                self._burned_vertices.add(vertex)
+
+            if vertex in self._allocataded:
+                self._allocataded.remove(vertex)
+
+        for truck in self.fire_trucks:
+            truck.reroute()
+
+    def create_truck(
+        self, position: str, state: Tuple | None = None
+    ) -> FireTruck:
+        # the fleet listens once, in place of its first truck
+        if len(self._fleet) == 0:
+            self._event_pool.listen(self._fleet)
+
+        return self._fleet.add(position, state)
+
+    def add_truck(self, position: str) -> FireTruck:
+        """Adds a new truck and firefighter post to a running simulation.
+
+        The truck starts without a target, so it asks for one on its first
+        update.
+
+        Args:
+            position (str): The post where the truck starts.
+
+        Raises:
+            ValueError: If the position is not a vertex of the map.
+
+        Returns:
+            FireTruck: The new truck.
+        """
+        if position not in self._map.vertices:
+            raise ValueError(f"'{position}' is not a vertex in the graph")
+
+        self._fleet.add_post(position)
+
+        return self.create_truck(position)
+
+    def snapshot(self) -> Tuple:
+        """Captures the mutable state of the firefighter and its trucks.
+
+        The fire path is derived from the map and the start vertex, so it is
+        not captured.
+
+        Returns:
+            Tuple: The posts, vertices on fire, burned, blocked and
+                allocated vertices, fire distance, last event and the truck
+                states.
+        """
+        return (
+            tuple(self._positions),
+            tuple(self._on_fire_vertices),
+            frozenset(self._burned_vertices),
+            frozenset(self._blocked_vertices),
+            tuple(self._allocataded),
+            self._fire_distance,
+            self.event,
+            self._fleet.snapshot(),
+        )
+
+    def restore(self, state: Tuple):
+        """Restores a state captured by ``snapshot`` instead of starting.
+
+        Args:
+            state (Tuple): The state returned by ``snapshot``.
+        """
+        (
+            positions,
+            on_fire,
+            burned,
+            blocked,
+            allocated,
+            self._fire_distance,
+            event,
+            trucks,
+        ) = state
+        self._fleet.posts = positions
+        self._on_fire_vertices = list(on_fire)
+        self._burned_vertices = set(burned)
+        self._blocked_vertices = set(blocked)
+        self._allocataded = list(allocated)
+        self._event_pool.event = event
+
+        for truck_state in trucks:
+            self.create_truck(truck_state[0], truck_state)
+
     def start(self):
-        for index, position in enumerate(self._positions):
-            truck = FireTruck(
-                self._map,
-                index,
-                position,
-                self._tank_water_capacity,
-                self._water_per_vertex,
-                self._water_sources,
-                self._positions,
-                self,
-            )
-
-            self._event_pool.listen(truck)
+        for position in list(self._positions):
+            self.create_truck(position)
+
+        # the fire starts in another region of the map
+        if self._start_fire_vertex is None:
+            return
 
         next = self.next()
 
         self.notify(Event.on_get_fire(self._start_fire_vertex))
 
         for truck in self.fire_trucks:
+            if not self.reachable(truck.id, next):
+                continue
+
             self.move_truck(truck.id, next)
             self.notify(Event.on_set(next, None, truck.id))
 
@@ -148,9 +341,12 @@ class FireFighter(Allocator):
             event = Event.on_get_fire(i)
             self.notify(event)
 
+        # plans the routes requested since the last update at once
+        self._fleet.plan()
+
         # updates truck states to apply the new changes
-        for truck in self.fire_trucks:
-            truck.update()
+        for index in range(len(self._fleet)):
+            self._fleet.update(index)
 
             if self.event.type != Event.ON_GET_FIRE:
                 self.handle_events()
@@ -165,9 +361,9 @@ class FireFighter(Allocator):
 
             # truck is already to put out fire
             if event.type == Event.ON_ALREADY:
-                next_vertex = self.next()
+                next_vertex = self.next(event.sender_id)
 
-                if next_vertex:
+                if next_vertex is not None:
                     self.move_truck(event.sender_id, next_vertex)
                     self.notify(
                         Event(Event.ON_SET, next_vertex, None, event.sender_id)
@@ -177,18 +373,97 @@ class FireFighter(Allocator):
             if event.type == Event.ON_PUT_OUT:
                 self.put_out_fire(event.target)
 
-                next = self.next()
+                next = self.next(event.sender_id)
 
-                if next:
+                if next is not None:
                     self.move_truck(event.sender_id, next)
                     self.notify(
                         Event(Event.ON_SET, next, None, event.sender_id)
                     )
 
+    def schedule_fire(self, scheduler: EventScheduler):
+        """Schedules an ignition event for every upcoming fire layer.
+
+        The scheduler clock follows the fire distance, since every update
+        spreads the fire by one layer.
+
+        Args:
+            scheduler (EventScheduler): The scheduler to fill.
+        """
+        scheduler.advance(self.clock)
+
+        for distance in self.fire_distances():
+            if not math.isinf(distance) and distance > self.clock:
+                scheduler.schedule(distance, Event.on_get_fire())
+
+    def schedule_trucks(self, scheduler: EventScheduler):
+        """Schedules the next stop of every truck.
+
+        Each truck keeps a single pending stop, replaced on every call.
+
+        Args:
+            scheduler (EventScheduler): The scheduler to fill.
+        """
+        scheduler.advance(self.clock)
+
+        for truck in self.fire_trucks:
+            steps = truck.quiet_steps()
+
+            if math.isinf(steps):
+                scheduler.cancel(truck.id)
+            else:
+                scheduler.schedule(
+                    self.clock + steps + 1, truck.stop_event(steps), truck.id
+                )
+
+    def idle_ticks(self, scheduler: EventScheduler, limit: int) -> int:
+        """Counts the next updates in which nothing but truck moves happen.
+
+        Args:
+            scheduler (EventScheduler): The scheduler of the simulation.
+            limit (int): The maximum number of updates to count.
+
+        Returns:
+            int: The number of updates that can be skipped with ``skip``.
+        """
+        # the last event is handled again on the next update
+        if self.event.type in (
+            Event.ON_REFUEL,
+            Event.ON_ALREADY,
+            Event.ON_PUT_OUT,
+        ):
+            return 0
+
+        self.schedule_trucks(scheduler)
+        next_time = scheduler.next_time()
+
+        if next_time is None:
+            return limit
+
+        return max(0, min(limit, next_time - self.clock - 1))
+
+    def skip(self, ticks: int):
+        """Advances idle updates, moving the trucks along their paths.
+
+        The updates are skipped in one step, each truck jumping to where it
+        is after the last one.
+
+        Args:
+            ticks (int): The number of updates to skip, as returned by
+                ``idle_ticks``.
+        """
+        if ticks > 0:
+            self._fire_distance += ticks
+            self._fleet.travel(ticks)
+
     def end(self) -> bool:
         all_vertices_was_burned = len(self.not_burned_vertices) == 0
         no_vertices_on_fire = len(self._on_fire_vertices) == 0
-        return all_vertices_was_burned or no_vertices_on_fire
+        return (
+            all_vertices_was_burned
+            or no_vertices_on_fire
+            or not self.threatened()
+        )
 
     def __repr__(self):
         return "FireFighter()"
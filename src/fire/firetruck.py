@@ -1,208 +1,144 @@
-import math
-from fire import Allocator
-from graphs import Graph, dijkstra
-from typing import Dict, List
-from events import EventListener, Event
-
-
-class FireTruck(EventListener):
-    def __init__(
-        self,
-        map: Graph,
-        truck_index: int,
-        start_position: str,
-        tank_water_capacity: float,
-        water_per_vertex: Dict[str, float],
-        water_positions: List[str],
-        firefighter_posts: List[str],
-        event_manager: Allocator,
-    ):
+from typing import TYPE_CHECKING, Collection, List, Tuple
+from events import Event
+
+if TYPE_CHECKING:
+    from fire.fleet import Fleet
+
+
+class FireTruck:
+    """A fire truck of a fleet.
+
+    The state of the truck is stored in the arrays of its fleet, and the
+    truck is a view over its row, so it holds no state of its own. Each
+    method calls the method of the fleet of the same name with the id of
+    the truck.
+    """
+
+    __slots__ = ("_fleet", "_id")
+
+    def __init__(self, fleet: "Fleet", truck_index: int):
+        """Wraps a row of a fleet. Use ``Fleet.add`` instead.
+
+        Args:
+            fleet (Fleet): The fleet of the truck.
+            truck_index (int): The id of the truck, its row in the fleet.
+        """
+        self._fleet = fleet
         self._id = truck_index
-        self._map = map
-        self._position = start_position
-        self._tank_level = tank_water_capacity
-        self._water_capacity = tank_water_capacity
-        self._water_per_vertex = water_per_vertex
-        self._water_positions = water_positions
-        self._firefighter_posts = firefighter_posts
-        self._event_manager = event_manager
-        self._targets_stack = []
-        self._steps_queue = []
-        self._on_fire_vertices = []
-        self._waiting = False
-
-        if tank_water_capacity <= 0:
-            raise ValueError(
-                f"water_capacity needs be greather than zero but is '{tank_water_capacity}'."
-            )
-
-        for _, water in water_per_vertex.items():
-            if water <= 0:
-                raise ValueError(
-                    f"water_capacity needs be greather than zero but is '{tank_water_capacity}'."
-                )
 
     @property
     def location(self) -> str:
-        return self._position
+        return self._fleet.position(self._id)
 
     @location.setter
     def location(self, location: str):
-        if location not in self._map.vertices:
-            raise ValueError(f"'{location}' is not a vertex in the graph")
-
-        self._position = location
+        self._fleet.place(self._id, location)
 
     @property
-    def next_steps(self) -> str:
-        return self._steps_queue
+    def next_steps(self) -> List[str]:
+        return self._fleet.steps(self._id)
 
     @property
     def target(self) -> str | None:
-        if len(self._targets_stack) > 0:
-            return self._targets_stack[0]
-
-        return None
+        return self._fleet.target(self._id)
 
     @property
     def id(self) -> int:
         return self._id
 
+    @property
+    def tank_level(self) -> float:
+        return self._fleet.tank_level(self._id)
+
     @property
     def water_sources(self) -> List[str]:
-        self.update_paths()
-        return [
-            i for i in list(self._water_positions + self._firefighter_posts)
-        ]
+        return self._fleet.water_positions + self._fleet.posts
 
     def add_target(self, target: str):
-        if target not in self._map.vertices:
-            raise ValueError(
-                f"{target} is unreachable from {self.location} in {self._map}"
-            )
-
-        self._targets_stack.insert(0, target)
+        self._fleet.add_target(self._id, target)
 
     def remove_target(self):
-        self._targets_stack.pop(0)
-        self.update_step_queue()
+        self._fleet.remove_target(self._id)
 
     def update_step_queue(self):
-        target = self.target
-        self.update_paths()
-
-        if target:
-            path = self._paths[target]["path"]
-            self._steps_queue = path
-
-    def nearest(self, vertices: List[str]) -> str | None:
-        less_distance: float = math.inf
-        nearest_vertex = None
-
-        self.update_paths()
+        self._fleet.update_step_queue(self._id)
 
-        for vertex, path in self._paths.items():
-            if vertex in vertices:
-                if less_distance > path["distance"]:
-                    less_distance = path["distance"]
-                    nearest_vertex = vertex
-
-        return nearest_vertex
+    def nearest(self, vertices: Collection[str]) -> str | None:
+        return self._fleet.nearest(self._id, vertices)
 
     def notify(self, event_type: str):
-        e = Event(event_type, self.location, self._id)
-        self._event_manager.notify_and_update(e)
+        self._fleet.notify(self._id, event_type)
 
     def schedule_move_to(self, destination: str):
-        self.add_target(destination)
-        self.update_step_queue()
+        self._fleet.schedule_move_to(self._id, destination)
 
     def schedule_refuel(self):
-        vertex = self.nearest(self.water_sources)
-        
-        if self.location == vertex:
-            self.refuel()
-
-        else:
-            self.schedule_move_to(vertex)
+        self._fleet.schedule_refuel(self._id)
 
     def refuel(self):
-        if (
-            self.location in self.water_sources
-            and self._tank_level < self._water_capacity
-        ):
-            self._tank_level = self._water_capacity
-            self.notify(Event.ON_ALREADY)
+        self._fleet.refuel(self._id)
 
     def put_out_fire(self):
-        vertex = self.location
-        water_needed = self._water_per_vertex.get(vertex)
+        self._fleet.put_out_fire(self._id)
 
-        if water_needed is None:
-            raise ValueError(
-                "Not found water needed to put out fire in water_per_vertex dict"
-            )
+    def reroute(self):
+        """Drops the targets removed from the map and plans a new path.
 
-        if (
-            vertex in self._on_fire_vertices
-            and self._tank_level > water_needed
-        ):
-            self._tank_level -= water_needed
-            self.notify(Event.ON_PUT_OUT)
+        Must be called after the map changes through the path cache.
+        """
+        self._fleet.reroute(self._id)
 
-            if self._tank_level < water_needed:
-                self.notify(Event.ON_REFUEL)
+    def quiet_steps(self) -> float:
+        """Counts the next updates in which the truck only moves.
 
-        else:
-            self.notify(Event.ON_REFUEL)
+        Returns:
+            float: The number of quiet updates, as in ``Fleet.quiet_steps``.
+        """
+        return self._fleet.quiet_steps(self._id)
 
-    def update_paths(self):
-        self._paths = dijkstra(self._map, self._position)
+    def stop_event(self, steps: int) -> Event:
+        """Describes what happens when the truck stops after quiet steps.
 
-    def already(self):
-        e = Event(Event.ON_ALREADY, self.location, self._id)
-        self._event_manager.notify(e)
+        Args:
+            steps (int): The number of quiet steps before the stop.
 
-    def handle(self, event: Event):
-        if event.type == Event.ON_GET_FIRE:
-            self._on_fire_vertices.append(event.target)
+        Returns:
+            Event: The event of the stop, as in ``Fleet.stop_event``.
+        """
+        return self._fleet.stop_event(self._id, steps)
 
-        if event.type == Event.ON_PUT_OUT:
-            try:
-                self._on_fire_vertices.remove(event.target)
-            except ValueError:
-                pass
+    def travel(self):
+        """Moves one step without checking the vertex reached.
 
-        if event.type == Event.ON_WAIT:
-            self._waiting = True
+        Must only be used for steps counted by ``quiet_steps``.
+        """
+        self._fleet.step(self._id)
 
-        if event.type == Event.ON_CONTINUE:
-            self._waiting = False
+    def already(self):
+        self._fleet.already(self._id)
 
     def update(self):
-        if not self._waiting:
-            if len(self._steps_queue) > 0:
-                self.location = self._steps_queue.pop(0)
-                self._event_manager.notify(Event(Event.ON_MOVE, self.location, self._id))
-
-                if self.location == self.target:
-                    if self.target in self._on_fire_vertices:
-                        self.put_out_fire()
+        self._fleet.update(self._id)
 
-                    if self.target in self.water_sources:
-                        self.refuel()
+    def snapshot(self, on_fire: Tuple[str, ...] | None = None) -> Tuple:
+        """Captures the mutable state of the truck.
 
-                    self.remove_target()
+        Args:
+            on_fire (Tuple[str, ...], optional): The vertices on fire known
+                by the truck, if already collected by the fleet.
 
-                else:
-                    if self.location in self._on_fire_vertices:
-                        self.put_out_fire()
+        Returns:
+            Tuple: The state of the truck, as in ``Fleet.state``.
+        """
+        return self._fleet.state(self._id, on_fire)
 
-                    if self.location in self.water_sources:
-                        self.refuel()
+    def restore(self, state: Tuple):
+        """Restores a state captured by ``snapshot``.
 
-            if len(self._targets_stack) == 0:
-                self.already()
+        Args:
+            state (Tuple): The state returned by ``snapshot``.
+        """
+        self._fleet.restore(self._id, state)
 
     def __repr__(self):
-        return f"FireTruck({self.id}, {self._tank_level}, {self.target})"
+        return f"FireTruck({self.id}, {self.tank_level}, {self.target})"
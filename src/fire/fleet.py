@@ -0,0 +1,783 @@
+from typing import Collection, Dict, Iterator, List, Set, Tuple
+
+import math
+
+import numpy as np
+
+from events import Event, EventListener
+from fire.allocator import Allocator
+from fire.firetruck import FireTruck
+from graphs import Graph, PathCache
+
+
+class Fleet(EventListener):
+    """Holds the state of every fire truck of a simulation in parallel arrays.
+
+    Row ``i`` of each array is the state of the truck with id ``i``, and
+    ``FireTruck`` objects are views over their row, whose methods call the
+    methods of the fleet taking the id of the truck. Positions, target stacks
+    and routes are lists, while tank levels, route cursors and waiting flags
+    are NumPy arrays, so the whole fleet is updated in batched passes.
+
+    The fleet listens to the event pool once for all its trucks. Trucks
+    added at the same time share a single view of the vertices on fire,
+    kept as a count per vertex, instead of one list per truck. A truck
+    added later only knows the fires that started after it joined, as when
+    every truck listened on its own.
+
+    Routes are planned in batches. A truck given a new target only requests
+    its route, and the requests are planned together once per update, or as
+    soon as a requested route is needed, with the trees of their distinct
+    origins computed at once by ``PathCache.prefetch``. The routes are the
+    same as if they were planned one by one. When the cache has a
+    ``ContractionHierarchy`` or a ``LandmarkIndex``, or searches from both
+    ends, each route is queried on its own instead.
+
+    Attributes:
+        _positions (List[str]): The vertex each truck is at.
+        _tank_levels (np.ndarray): The water in the tank of each truck.
+        _targets (List[List[str]]): The target stack of each truck, with
+            the current target first.
+        _routes (List[List[str]]): The path each truck follows.
+        _cursors (np.ndarray): The index in its route of the next step of
+            each truck.
+        _waiting (np.ndarray): Whether each truck is waiting.
+        _views (List[Dict[str, int]]): The vertices on fire, shared by the
+            trucks added at the same time.
+        _view_of (List[int]): The index of the view of each truck.
+        _requests (Dict[int, Tuple[str, str]]): The origin and target of
+            the routes requested by each truck and not planned yet.
+    """
+
+    def __init__(
+        self,
+        map: Graph,
+        tank_water_capacity: float,
+        water_per_vertex: Dict[str, float],
+        water_positions: List[str],
+        firefighter_posts: List[str],
+        event_manager: Allocator,
+        paths: PathCache | None = None,
+    ):
+        """Initializes an empty fleet.
+
+        Args:
+            map (Graph): The map the trucks drive on.
+            tank_water_capacity (float): The tank capacity of every truck.
+            water_per_vertex (Dict[str, float]): The water needed to put out
+                the fire in each vertex.
+            water_positions (List[str]): The water sources.
+            firefighter_posts (List[str]): The firefighter posts, where the
+                trucks can refuel too.
+            event_manager (Allocator): Receives the events of the trucks.
+            paths (PathCache, optional): The search trees of the map.
+
+        Raises:
+            ValueError: If the capacity or the water of a vertex is not
+                positive.
+        """
+        if tank_water_capacity <= 0:
+            raise ValueError(
+                f"water_capacity needs be greather than zero but is '{tank_water_capacity}'."
+            )
+
+        for water in water_per_vertex.values():
+            if water <= 0:
+                raise ValueError(
+                    f"water_capacity needs be greather than zero but is '{tank_water_capacity}'."
+                )
+
+        self._map = map
+        self._water_capacity = tank_water_capacity
+        self._water_per_vertex = water_per_vertex
+        self._water_positions = water_positions
+        self._posts = firefighter_posts
+        self._refuel_points = set(water_positions) | set(firefighter_posts)
+        self._event_manager = event_manager
+        self._paths = paths if paths is not None else PathCache(map)
+
+        self._trucks: List[FireTruck] = []
+        self._positions: List[str] = []
+        self._tank_levels = np.empty(0, dtype=np.float64)
+        self._targets: List[List[str]] = []
+        self._routes: List[List[str]] = []
+        self._cursors = np.empty(0, dtype=np.int64)
+        self._waiting = np.empty(0, dtype=np.bool_)
+        self._views: List[Dict[str, int]] = []
+        self._view_of: List[int] = []
+        # views no event has changed yet, by their vertices on fire
+        self._fresh: Dict[Tuple[str, ...], int] = {}
+        self._requests: Dict[int, Tuple[str, str]] = {}
+
+    @property
+    def trucks(self) -> List[FireTruck]:
+        """Returns the trucks, indexed by id.
+
+        Returns:
+            List[FireTruck]: The trucks. It must not be modified.
+        """
+        return self._trucks
+
+    @property
+    def posts(self) -> List[str]:
+        """Returns the firefighter posts.
+
+        Returns:
+            List[str]: The posts. Use ``add_post`` to add one.
+        """
+        return self._posts
+
+    @posts.setter
+    def posts(self, posts: List[str]):
+        """Replaces the firefighter posts in place.
+
+        Args:
+            posts (List[str]): The new posts.
+        """
+        self._posts[:] = posts
+        self._refuel_points = set(self._water_positions) | set(posts)
+
+    @property
+    def water_positions(self) -> List[str]:
+        """Returns the water sources, without the posts.
+
+        Returns:
+            List[str]: The water sources. It must not be modified.
+        """
+        return self._water_positions
+
+    @property
+    def water_sources(self) -> Set[str]:
+        """Returns the vertices where the trucks refuel.
+
+        Returns:
+            Set[str]: The water sources and the posts. It must not be
+                modified.
+        """
+        return self._refuel_points
+
+    def add_post(self, position: str):
+        """Adds a firefighter post, where the trucks can refuel.
+
+        Args:
+            position (str): The new post.
+        """
+        self._posts.append(position)
+        self._refuel_points.add(position)
+
+    def add(self, position: str, state: Tuple | None = None) -> FireTruck:
+        """Adds a truck, with the next id.
+
+        Args:
+            position (str): The vertex where the truck starts.
+            state (Tuple, optional): The state of the truck returned by
+                ``state``, to restore it.
+
+        Returns:
+            FireTruck: The new truck.
+        """
+        index = len(self._trucks)
+
+        if index == len(self._cursors):
+            self._grow(max(16, 2 * index))
+
+        on_fire = tuple(state[4]) if state is not None else ()
+        view = self._fresh.get(on_fire)
+
+        if view is None:
+            view = len(self._views)
+            counts: Dict[str, int] = {}
+
+            for vertex in on_fire:
+                counts[vertex] = counts.get(vertex, 0) + 1
+
+            self._views.append(counts)
+            self._fresh[on_fire] = view
+
+        self._positions.append(position)
+        self._tank_levels[index] = self._water_capacity
+        self._targets.append([])
+        self._routes.append([])
+        self._cursors[index] = 0
+        self._waiting[index] = False
+        self._view_of.append(view)
+
+        truck = FireTruck(self, index)
+        self._trucks.append(truck)
+
+        if state is not None:
+            self.restore(index, state)
+
+        return truck
+
+    def request(self, index: int, target: str):
+        """Requests a route from the position of a truck to a target.
+
+        The route replaces the current one when it is planned, and until
+        then it replaces any route requested before by the truck.
+
+        Args:
+            index (int): The id of the truck.
+            target (str): The last vertex of the route.
+        """
+        self._requests[index] = (self._positions[index], target)
+
+    def cancel(self, index: int):
+        """Drops the route requested by a truck, if any.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        self._requests.pop(index, None)
+
+    def plan(self) -> int:
+        """Plans every requested route.
+
+        Returns:
+            int: The number of routes planned.
+        """
+        if not self._requests:
+            return 0
+
+        requests, self._requests = self._requests, {}
+        routes = self._paths.routes(requests.values())
+
+        for index, route in zip(requests, routes):
+            self._routes[index] = route
+            self._cursors[index] = 0
+
+        return len(requests)
+
+    def position(self, index: int) -> str:
+        """Returns the vertex a truck is at.
+
+        Args:
+            index (int): The id of the truck.
+
+        Returns:
+            str: The position of the truck.
+        """
+        return self._positions[index]
+
+    def place(self, index: int, location: str):
+        """Moves a truck to a vertex, without following its route.
+
+        Args:
+            index (int): The id of the truck.
+            location (str): The new position of the truck.
+
+        Raises:
+            ValueError: If the location is not a vertex of the map.
+        """
+        if location not in self._map.vertices:
+            raise ValueError(f"'{location}' is not a vertex in the graph")
+
+        self._positions[index] = location
+
+    def tank_level(self, index: int) -> float:
+        """Returns the water in the tank of a truck.
+
+        Args:
+            index (int): The id of the truck.
+
+        Returns:
+            float: The tank level, in liters.
+        """
+        return float(self._tank_levels[index])
+
+    def target(self, index: int) -> str | None:
+        """Returns the current target of a truck.
+
+        Args:
+            index (int): The id of the truck.
+
+        Returns:
+            str | None: The first target of the stack, or None if it is
+                empty.
+        """
+        targets = self._targets[index]
+
+        return targets[0] if targets else None
+
+    def steps(self, index: int) -> List[str]:
+        """Returns the steps a truck has left on its route.
+
+        Args:
+            index (int): The id of the truck.
+
+        Returns:
+            List[str]: The next vertices of the route, planned first if it
+                was requested.
+        """
+        self._planned(index)
+
+        return self._routes[index][self._cursors[index] :]
+
+    def add_target(self, index: int, target: str):
+        """Pushes a target on the stack of a truck.
+
+        Args:
+            index (int): The id of the truck.
+            target (str): The new current target.
+
+        Raises:
+            ValueError: If the target is unreachable from the truck.
+        """
+        location = self._positions[index]
+
+        if not self._paths.components.connected(location, target):
+            raise ValueError(
+                f"{target} is unreachable from {location} in {self._map}"
+            )
+
+        self._targets[index].insert(0, target)
+
+    def remove_target(self, index: int):
+        """Pops the current target of a truck and requests the next route.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        self._targets[index].pop(0)
+        self.update_step_queue(index)
+
+    def update_step_queue(self, index: int):
+        """Requests the route of a truck to its current target, if any.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        targets = self._targets[index]
+
+        if targets:
+            self.request(index, targets[0])
+
+    def nearest(self, index: int, vertices: Collection[str]) -> str | None:
+        """Returns the closest of several vertices to a truck.
+
+        Args:
+            index (int): The id of the truck.
+            vertices (Collection[str]): The candidates.
+
+        Returns:
+            str | None: The closest reachable candidate, or None if none is
+                reachable.
+        """
+        return self._paths.nearest(self._positions[index], vertices)
+
+    def schedule_move_to(self, index: int, destination: str):
+        """Sends a truck to a destination, before its other targets.
+
+        Args:
+            index (int): The id of the truck.
+            destination (str): The new current target.
+        """
+        self.add_target(index, destination)
+        self.update_step_queue(index)
+
+    def schedule_refuel(self, index: int):
+        """Sends a truck to the nearest water source, or refuels it there.
+
+        A truck that reaches no water source waits for a new target.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        vertex = self.nearest(index, self._refuel_points)
+
+        if vertex is None:
+            return
+
+        if self._positions[index] == vertex:
+            self.refuel(index)
+
+        else:
+            self.schedule_move_to(index, vertex)
+
+    def refuel(self, index: int):
+        """Fills the tank of a truck at a water source.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        if (
+            self._positions[index] in self._refuel_points
+            and self._tank_levels[index] < self._water_capacity
+        ):
+            self._tank_levels[index] = self._water_capacity
+            self.notify(index, Event.ON_ALREADY)
+
+    def put_out_fire(self, index: int):
+        """Puts out the fire at the position of a truck.
+
+        The truck is sent to refuel when its tank can not put out the fire
+        there, or could not anymore once it has.
+
+        Args:
+            index (int): The id of the truck.
+
+        Raises:
+            ValueError: If the water needed at the position is unknown.
+        """
+        vertex = self._positions[index]
+        water_needed = self._water_per_vertex.get(vertex)
+
+        if water_needed is None:
+            raise ValueError(
+                "Not found water needed to put out fire in water_per_vertex dict"
+            )
+
+        if (
+            vertex in self._views[self._view_of[index]]
+            and self._tank_levels[index] > water_needed
+        ):
+            self._tank_levels[index] -= water_needed
+            self.notify(index, Event.ON_PUT_OUT)
+
+            if self._tank_levels[index] < water_needed:
+                self.notify(index, Event.ON_REFUEL)
+
+        else:
+            self.notify(index, Event.ON_REFUEL)
+
+    def reroute(self, index: int):
+        """Drops the targets removed from the map and plans a new path.
+
+        Must be called after the map changes through the path cache.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        self._targets[index] = [
+            target
+            for target in self._targets[index]
+            if target in self._map.vertices
+        ]
+        self.cancel(index)
+        self._routes[index] = []
+        self._cursors[index] = 0
+        self.update_step_queue(index)
+
+    def quiet_steps(self, index: int) -> float:
+        """Counts the next updates in which a truck only moves.
+
+        A quiet update pops one step from the queue and notifies the move,
+        without reaching the target, a vertex on fire or a water source.
+
+        Args:
+            index (int): The id of the truck.
+
+        Returns:
+            float: The number of quiet updates before the truck does
+                anything else, or ``math.inf`` if it never will.
+        """
+        if self._waiting[index]:
+            return math.inf
+
+        targets = self._targets[index]
+
+        if len(targets) == 0:
+            return 0
+
+        on_fire = self._views[self._view_of[index]]
+
+        for step, vertex in enumerate(self.steps(index)):
+            if (
+                vertex == targets[0]
+                or vertex in on_fire
+                or vertex in self._refuel_points
+            ):
+                return step
+
+        return math.inf
+
+    def stop_event(self, index: int, steps: int) -> Event:
+        """Describes what happens when a truck stops after quiet steps.
+
+        Args:
+            index (int): The id of the truck.
+            steps (int): The number of quiet steps before the stop, as
+                returned by ``quiet_steps``.
+
+        Returns:
+            Event: An ``ON_REFUEL`` event if the truck stops at a water
+                source, an ``ON_ALREADY`` event if it has no target or an
+                ``ON_MOVE`` event for its arrival otherwise.
+        """
+        if len(self._targets[index]) == 0:
+            return Event.on_already(self._positions[index], index)
+
+        vertex = self.steps(index)[steps]
+
+        if vertex in self._refuel_points:
+            return Event.on_refuel(vertex, index)
+
+        return Event(Event.ON_MOVE, vertex, index)
+
+    def step(self, index: int):
+        """Moves a truck one step without checking the vertex reached.
+
+        Must only be used for steps counted by ``quiet_steps``.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        if not self._waiting[index] and self._has_steps(index):
+            self._move(index)
+
+    def notify(self, index: int, event_type: str):
+        """Notifies an event of a truck at its position and updates.
+
+        Args:
+            index (int): The id of the truck.
+            event_type (str): The type of the event.
+        """
+        e = Event(event_type, self._positions[index], index)
+        self._event_manager.notify_and_update(e)
+
+    def already(self, index: int):
+        """Notifies that a truck has nothing left to do.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        e = Event(Event.ON_ALREADY, self._positions[index], index)
+        self._event_manager.notify(e)
+
+    def handle(self, event: Event):
+        """Updates the state shared by the trucks.
+
+        Args:
+            event (Event): The event to handle.
+        """
+        if event.type == Event.ON_GET_FIRE:
+            self._fresh.clear()
+
+            for view in self._views:
+                view[event.target] = view.get(event.target, 0) + 1
+
+        elif event.type == Event.ON_PUT_OUT:
+            self._fresh.clear()
+
+            for view in self._views:
+                count = view.get(event.target)
+
+                if count == 1:
+                    del view[event.target]
+                elif count:
+                    view[event.target] = count - 1
+
+        elif event.type == Event.ON_WAIT:
+            self._waiting[: len(self._trucks)] = True
+
+        elif event.type == Event.ON_CONTINUE:
+            self._waiting[: len(self._trucks)] = False
+
+    def update(self, index: int):
+        """Moves a truck one step and acts on the vertex it reaches.
+
+        The truck puts out the fire of the vertex and refuels at a water
+        source, and once it reaches its target, it heads to the next one.
+        A truck without targets notifies that it has nothing to do. A truck
+        that only moves along its route, without reaching its target, a
+        vertex on fire or a water source, is moved directly.
+
+        Args:
+            index (int): The id of the truck.
+        """
+        if index in self._requests:
+            self.plan()
+
+        route = self._routes[index]
+        cursor = int(self._cursors[index])
+
+        if cursor < len(route) and not self._waiting[index]:
+            vertex = route[cursor]
+            targets = self._targets[index]
+
+            if (
+                targets
+                and vertex != targets[0]
+                and vertex not in self._views[self._view_of[index]]
+                and vertex not in self._refuel_points
+            ):
+                self._cursors[index] = cursor + 1
+                self._positions[index] = vertex
+                self._event_manager.notify(Event(Event.ON_MOVE, vertex, index))
+                return
+
+        if self._waiting[index]:
+            return
+
+        if self._has_steps(index):
+            self._move(index)
+            on_fire = self._views[self._view_of[index]]
+
+            # putting out the fire updates the simulation, which may give
+            # the truck a new target or move it, so both are read again
+            if self._positions[index] == self.target(index):
+                if self.target(index) in on_fire:
+                    self.put_out_fire(index)
+
+                if self.target(index) in self._refuel_points:
+                    self.refuel(index)
+
+                self.remove_target(index)
+
+            else:
+                if self._positions[index] in on_fire:
+                    self.put_out_fire(index)
+
+                if self._positions[index] in self._refuel_points:
+                    self.refuel(index)
+
+        if len(self._targets[index]) == 0:
+            self.already(index)
+
+    def travel(self, ticks: int = 1):
+        """Moves every truck along its route for a number of steps.
+
+        Each step is the one ``step`` would take, and a truck
+        stops at the end of its route. The cursors jump over every step at
+        once, and each truck that moves sends a single event: ``ON_MOVE``
+        for a single step, or ``ON_TRAVEL`` with the vertices it went
+        through otherwise.
+
+        Must only be used for steps counted by ``quiet_steps``.
+
+        Args:
+            ticks (int): The number of steps.
+        """
+        self.plan()
+        size = len(self._trucks)
+        lengths = np.fromiter(map(len, self._routes), np.int64, size)
+        cursors = self._cursors[:size]
+        moving = np.flatnonzero(~self._waiting[:size] & (cursors < lengths))
+        starts = cursors[moving]
+        steps = np.minimum(lengths[moving] - starts, ticks)
+        notify = self._event_manager.notify
+
+        for index, start, count in zip(
+            moving.tolist(), starts.tolist(), steps.tolist()
+        ):
+            route = self._routes[index]
+
+            if ticks == 1:
+                self._positions[index] = route[start]
+                notify(Event(Event.ON_MOVE, route[start], index))
+            else:
+                vertices = tuple(route[start : start + count])
+                self._positions[index] = vertices[-1]
+                notify(Event(Event.ON_TRAVEL, vertices, index))
+
+        self._cursors[moving] += steps
+
+    def snapshot(self) -> Tuple:
+        """Captures the state of every truck.
+
+        The trucks that share a view also share its tuple of vertices on
+        fire.
+
+        Returns:
+            Tuple: The state of each truck, as returned by ``state``.
+        """
+        self.plan()
+        on_fire = [
+            tuple(
+                vertex for vertex, count in view.items() for _ in range(count)
+            )
+            for view in self._views
+        ]
+
+        return tuple(
+            self.state(index, on_fire[self._view_of[index]])
+            for index in range(len(self._trucks))
+        )
+
+    def state(
+        self, index: int, on_fire: Tuple[str, ...] | None = None
+    ) -> Tuple:
+        """Captures the mutable state of a truck.
+
+        Args:
+            index (int): The id of the truck.
+            on_fire (Tuple[str, ...], optional): The vertices on fire known
+                by the truck, if already collected by ``snapshot``.
+
+        Returns:
+            Tuple: The position, tank level, targets, steps, known vertices
+                on fire and waiting flag of the truck.
+        """
+        if on_fire is None:
+            on_fire = tuple(
+                vertex
+                for vertex, count in self._views[self._view_of[index]].items()
+                for _ in range(count)
+            )
+
+        return (
+            self._positions[index],
+            self.tank_level(index),
+            tuple(self._targets[index]),
+            tuple(self.steps(index)),
+            on_fire,
+            bool(self._waiting[index]),
+        )
+
+    def restore(self, index: int, state: Tuple):
+        """Restores the state of a truck captured by ``state``.
+
+        The vertices on fire are restored by ``add``, which shares them with
+        the trucks that know the same ones.
+
+        Args:
+            index (int): The id of the truck.
+            state (Tuple): The state returned by ``state``.
+        """
+        position, tank_level, targets, steps, _, waiting = state
+        self._positions[index] = position
+        self._tank_levels[index] = tank_level
+        self._targets[index] = list(targets)
+        self._routes[index] = list(steps)
+        self._cursors[index] = 0
+        self._waiting[index] = waiting
+
+    def _planned(self, index: int):
+        if index in self._requests:
+            self.plan()
+
+    def _has_steps(self, index: int) -> bool:
+        self._planned(index)
+
+        return self._cursors[index] < len(self._routes[index])
+
+    def _move(self, index: int):
+        """Moves a truck to the next step of its route and notifies it."""
+        self._planned(index)
+        cursor = int(self._cursors[index])
+        self._cursors[index] = cursor + 1
+        vertex = self._routes[index][cursor]
+        self.place(index, vertex)
+        self._event_manager.notify(Event(Event.ON_MOVE, vertex, index))
+
+    def _grow(self, capacity: int):
+        """Enlarges the NumPy arrays to hold the given number of trucks."""
+        size = len(self._trucks)
+
+        for name in ("_tank_levels", "_cursors", "_waiting"):
+            array = getattr(self, name)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:size] = array[:size]
+            setattr(self, name, grown)
+
+    def __getitem__(self, index: int) -> FireTruck:
+        return self._trucks[index]
+
+    def __iter__(self) -> Iterator[FireTruck]:
+        return iter(self._trucks)
+
+    def __len__(self) -> int:
+        return len(self._trucks)
+
+    def __repr__(self):
+        return f"Fleet({len(self._trucks)})"
@@ -1,13 +1,46 @@
 
+from graphs.registry import VertexRegistry
 from graphs.graph import SimpleGraph, Graph
-from graphs.search import dijkstra, breadth_first_search
-from graphs.functions import random_vertices, predecessors_to_list
+from graphs.search import (
+    dijkstra,
+    dijkstra_tree,
+    dijkstra_distances,
+    breadth_first_search,
+    breadth_first_tree,
+    a_star,
+    bidirectional_dijkstra,
+)
+from graphs.functions import (
+    random_vertices,
+    predecessors_to_list,
+    predecessors_to_path,
+)
+from graphs.dynamic import DynamicShortestPaths
+from graphs.hierarchy import ContractionHierarchy
+from graphs.landmarks import LandmarkIndex
+from graphs.components import ComponentIndex
+from graphs.cache import PathCache
+from graphs.shared import SharedGraph, SharedGraphHandle
 
 __all__ = [
+    'VertexRegistry',
     'SimpleGraph',
     'Graph',
     'dijkstra',
+    'dijkstra_tree',
+    'dijkstra_distances',
     'breadth_first_search',
+    'breadth_first_tree',
+    'a_star',
+    'bidirectional_dijkstra',
     'random_vertices',
     'predecessors_to_list',
+    'predecessors_to_path',
+    'DynamicShortestPaths',
+    'ContractionHierarchy',
+    'LandmarkIndex',
+    'ComponentIndex',
+    'PathCache',
+    'SharedGraph',
+    'SharedGraphHandle',
 ]
@@ -0,0 +1,485 @@
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Collection, Dict, Iterable, List, Tuple
+
+from graphs.graph import SimpleGraph
+from graphs.components import ComponentIndex
+from graphs.dynamic import DynamicShortestPaths
+from graphs.functions import predecessors_to_path
+from graphs.hierarchy import ContractionHierarchy
+from graphs.landmarks import LandmarkIndex
+from graphs.search import (
+    bidirectional_dijkstra,
+    breadth_first_tree,
+    dijkstra_tree,
+)
+from graphs.shared import SharedGraph
+
+
+def _search(
+    graph: SimpleGraph, origin: str
+) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """Computes a tree in a worker of the executor."""
+    return dijkstra_tree(graph, origin)
+
+
+class PathCache:
+    """Memoises the search trees computed over a map.
+
+    The trees depend only on the map and their origin, so a single cache can
+    be shared by every truck of a simulation and by every simulation run over
+    the same map. Vertices and edges must be removed through the cache, which
+    repairs the cached shortest path trees in place; any other change to the
+    map requires clearing the cache.
+
+    Trees requested together through ``prefetch`` are computed in parallel
+    when the cache has an executor. Thread pools search the map itself,
+    while process pools search a copy published once in shared memory. The
+    trees are the same as if they were computed one by one.
+
+    With a ``ContractionHierarchy`` of the map, ``distance``, ``path`` and
+    ``nearest`` are answered by the hierarchy without computing any tree.
+    Paths of equal length may then be chosen differently. The hierarchy is
+    dropped as soon as the map changes through the cache. Without one, a
+    ``LandmarkIndex`` answers them with A* instead, and it is kept when
+    vertices or edges are removed, since its bounds remain valid. Without
+    either, a ``bidirectional`` cache answers ``distance`` and ``path`` with
+    ``bidirectional_dijkstra`` instead of computing the tree of the origin,
+    unless it is already cached.
+
+    Attributes:
+        _graph (SimpleGraph): The map the trees are computed over.
+        _trees (Dict[str, DynamicShortestPaths]): The shortest path tree of
+            each origin already computed.
+        _layers (Dict[str, Dict[float, List[str]]]): The vertices grouped
+            by number of hops from each origin already computed.
+        _components (ComponentIndex | None): The components of the map,
+            for the version of the map it was built on.
+    """
+
+    def __init__(
+        self,
+        graph: SimpleGraph,
+        executor: Executor | None = None,
+        hierarchy: ContractionHierarchy | None = None,
+        landmarks: LandmarkIndex | None = None,
+        bidirectional: bool = False,
+    ):
+        """Initializes an empty cache over a map.
+
+        Args:
+            graph (SimpleGraph): The map the trees are computed over.
+            executor (Executor, optional): The pool computing the trees of
+                ``prefetch``. Ties between paths of equal length are broken
+                by the hash of the vertices, so worker processes must hash
+                them like this one, as when they are forked or
+                ``PYTHONHASHSEED`` is set, unless the map is interned;
+                otherwise the trees are computed here instead.
+            hierarchy (ContractionHierarchy, optional): The hierarchy of the
+                map, answering the point to point queries.
+            landmarks (LandmarkIndex, optional): The landmarks of the map,
+                guiding the point to point queries without a hierarchy.
+            bidirectional (bool): If true, the point to point queries
+                without a hierarchy or landmarks search from both ends
+                instead of computing a whole tree.
+
+        Raises:
+            ValueError: If the hierarchy or the landmarks have different
+                vertices than the map.
+        """
+        for index in (hierarchy, landmarks):
+            if index is not None and set(index.vertices) != graph.vertices:
+                raise ValueError(
+                    f"The {type(index).__name__} was built over a different map, build it again."
+                )
+
+        self._graph = graph
+        self._executor = executor
+        self._hierarchy = hierarchy
+        self._landmarks = landmarks
+        self._bidirectional = bidirectional
+        self._shared: SharedGraph | None = None
+        self._same_hashes: bool | None = None
+        self._trees: Dict[str, DynamicShortestPaths] = {}
+        self._layers: Dict[str, Dict[float, List[str]]] = {}
+        self._components: ComponentIndex | None = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def graph(self) -> SimpleGraph:
+        """Returns the map the trees are computed over.
+
+        Returns:
+            SimpleGraph: The map.
+        """
+        return self._graph
+
+    @property
+    def hierarchy(self) -> ContractionHierarchy | None:
+        """Returns the hierarchy answering the point to point queries.
+
+        Returns:
+            ContractionHierarchy | None: The hierarchy, or None if there is
+                none or the map changed since it was built.
+        """
+        return self._hierarchy
+
+    @property
+    def landmarks(self) -> LandmarkIndex | None:
+        """Returns the landmarks guiding the point to point queries.
+
+        Returns:
+            LandmarkIndex | None: The landmarks, or None if there are none
+                or the map was cleared.
+        """
+        return self._landmarks
+
+    @property
+    def components(self) -> ComponentIndex:
+        """Returns the connected components of the map.
+
+        The index is built on the first request and again on the first
+        request after each change to the map, so reachability checks are
+        constant time between changes.
+
+        Returns:
+            ComponentIndex: The components of the current map.
+        """
+        if self._components is None or not self._components.matches(
+            self._graph
+        ):
+            self._components = ComponentIndex(self._graph)
+
+        return self._components
+
+    @property
+    def hits(self) -> int:
+        """Returns how many lookups were answered from the cache.
+
+        Returns:
+            int: The number of cache hits.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Returns how many lookups required a new search.
+
+        Returns:
+            int: The number of cache misses.
+        """
+        return self._misses
+
+    def tree(self, origin: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """Returns the shortest path tree from an origin.
+
+        Args:
+            origin (str): The origin of the tree.
+
+        Returns:
+            Tuple[Dict[str, float], Dict[str, str]]: The shortest distance to
+                each vertex and the predecessor of each vertex, as returned
+                by ``dijkstra_tree``. They must not be modified, and they are
+                updated in place when the map changes through the cache.
+        """
+        tree = self._trees.get(origin)
+
+        if tree is None:
+            self._misses += 1
+            tree = DynamicShortestPaths(self._graph, origin)
+            self._trees[origin] = tree
+        else:
+            self._hits += 1
+
+        return tree.distances, tree.predecessors
+
+    def prefetch(self, origins: Iterable[str]) -> int:
+        """Computes the trees of several origins at once.
+
+        Origins already cached or repeated are searched once, in parallel
+        if the cache has an executor. The trees are then cached in the order
+        of their origins.
+
+        Args:
+            origins (Iterable[str]): The origins of the trees.
+
+        Returns:
+            int: The number of trees computed.
+        """
+        missing = [
+            origin
+            for origin in dict.fromkeys(origins)
+            if origin not in self._trees
+        ]
+
+        if (
+            self._executor is None
+            or len(missing) < 2
+            or not self._hashes_match(missing[0])
+        ):
+            for origin in missing:
+                self.tree(origin)
+
+            return len(missing)
+
+        chunksize = math.ceil(len(missing) / (os.cpu_count() or 1))
+        results = self._executor.map(
+            _search,
+            repeat(self._search_graph()),
+            missing,
+            chunksize=chunksize,
+        )
+
+        for origin, (distances, predecessors) in zip(missing, results):
+            self._misses += 1
+            self._trees[origin] = DynamicShortestPaths(
+                self._graph, origin, distances, predecessors
+            )
+
+        return len(missing)
+
+    def distance(self, origin: str, destination: str) -> float:
+        """Returns the shortest distance between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Returns:
+            float: The distance, or ``math.inf`` if it is unreachable.
+        """
+        if self._hierarchy is not None:
+            return self._hierarchy.distance(origin, destination)
+
+        if self._landmarks is not None:
+            return self._landmarks.distance(origin, destination)
+
+        if self._bidirectional and origin not in self._trees:
+            return bidirectional_dijkstra(self._graph, origin, destination)[0]
+
+        return self.tree(origin)[0][destination]
+
+    def path(self, origin: str, destination: str) -> List[str]:
+        """Returns the shortest path between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Returns:
+            List[str]: The vertices from the origin to the destination. As
+                in ``predecessors_to_path``, an unreachable destination is
+                its own path.
+        """
+        if self._hierarchy is not None:
+            return self._hierarchy.path(origin, destination) or [destination]
+
+        if self._landmarks is not None:
+            return self._landmarks.path(origin, destination) or [destination]
+
+        if self._bidirectional and origin not in self._trees:
+            _, path, _ = bidirectional_dijkstra(
+                self._graph, origin, destination
+            )
+
+            return path or [destination]
+
+        return predecessors_to_path(self.tree(origin)[1], destination)
+
+    def routes(self, requests: Iterable[Tuple[str, str]]) -> List[List[str]]:
+        """Returns the shortest paths between several pairs of vertices.
+
+        Without a hierarchy, landmarks or bidirectional searches, the trees
+        of the distinct origins are computed at once by ``prefetch``.
+
+        Args:
+            requests (Iterable[Tuple[str, str]]): The origin and destination
+                of each path.
+
+        Returns:
+            List[List[str]]: The path of each request, as in ``path``.
+        """
+        requests = list(requests)
+
+        if (
+            self._hierarchy is None
+            and self._landmarks is None
+            and not self._bidirectional
+        ):
+            self.prefetch(origin for origin, _ in requests)
+
+        return [
+            self.path(origin, destination) for origin, destination in requests
+        ]
+
+    def nearest(self, origin: str, vertices: Collection[str]) -> str | None:
+        """Returns the closest of several vertices to an origin.
+
+        Args:
+            origin (str): The origin vertex.
+            vertices (Collection[str]): The candidates.
+
+        Returns:
+            str | None: The closest reachable candidate, or None if none is
+                reachable.
+        """
+        if self._hierarchy is not None:
+            return self._hierarchy.nearest(origin, vertices)[0]
+
+        if self._landmarks is not None:
+            return self._landmarks.nearest(origin, vertices)[0]
+
+        less_distance: float = math.inf
+        nearest_vertex = None
+
+        for vertex, distance in self.tree(origin)[0].items():
+            if vertex in vertices and less_distance > distance:
+                less_distance = distance
+                nearest_vertex = vertex
+
+        return nearest_vertex
+
+    def layers(self, origin: str) -> Dict[float, List[str]]:
+        """Returns the vertices grouped by number of hops from an origin.
+
+        Args:
+            origin (str): The origin of the breadth-first search.
+
+        Returns:
+            Dict[float, List[str]]: The vertices at each number of hops, in
+                the order they are listed by ``breadth_first_search``. They
+                must not be modified.
+        """
+        layers = self._layers.get(origin)
+
+        if layers is None:
+            self._misses += 1
+            distances, _ = breadth_first_tree(self._graph, origin)
+            layers = {}
+
+            for vertex, distance in distances.items():
+                layers.setdefault(distance, []).append(vertex)
+
+            self._layers[origin] = layers
+        else:
+            self._hits += 1
+
+        return layers
+
+    def remove_vertices(self, vertices: Iterable[str]) -> None:
+        """Removes vertices from the map and repairs the cached trees.
+
+        The trees whose origin was removed are dropped.
+
+        Args:
+            vertices (Iterable[str]): The vertices to remove.
+        """
+        removed = [v for v in vertices if v in self._graph.vertices]
+
+        self._graph.remove_vertices(removed)
+        self._release_shared()
+        self._hierarchy = None
+
+        for vertex in removed:
+            self._trees.pop(vertex, None)
+
+        self._repair([], removed)
+
+    def remove_edges(self, edges: Iterable[Tuple[str, str]]) -> None:
+        """Removes edges from the map and repairs the cached trees.
+
+        Args:
+            edges (Iterable[Tuple[str, str]]): The edges to remove, as
+                ``(origin, destination)`` pairs. The reverse edges are kept.
+        """
+        edges = list(edges)
+
+        for origin, destination in edges:
+            self._graph.remove_edge(origin, destination)
+
+        self._release_shared()
+        self._hierarchy = None
+
+        self._repair(edges, [])
+
+    def increase_weights(self, edges: Iterable[Tuple[str, str, float]]) -> None:
+        """Increases edge weights in the map and repairs the cached trees.
+
+        Args:
+            edges (Iterable[Tuple[str, str, float]]): The edges to change, as
+                ``(origin, destination, weight)`` tuples. The reverse edges
+                are kept.
+
+        Raises:
+            ValueError: If an edge does not exist or its weight decreases,
+                since that can shorten paths outside the repaired subtrees.
+        """
+        edges = list(edges)
+
+        for origin, destination, distance in edges:
+            current = self._graph.edges(origin, destination)
+
+            if not current or distance < min(w for _, w in current):
+                raise ValueError(
+                    f"The weight of ({origin}, {destination}) can only increase, clear the cache instead."
+                )
+
+        for origin, destination, distance in edges:
+            self._graph.set_weight(origin, destination, distance)
+
+        self._release_shared()
+        self._hierarchy = None
+
+        self._repair([(origin, dest) for origin, dest, _ in edges], [])
+
+    def _repair(self, edges: List[Tuple[str, str]], vertices: List[str]):
+        for tree in self._trees.values():
+            tree.repair(edges, vertices)
+
+        # hop layers are recomputed on the next request
+        self._layers.clear()
+
+    def clear(self) -> None:
+        """Drops every cached tree, the hierarchy and the landmarks, for
+        example after the map changes."""
+        self._trees.clear()
+        self._layers.clear()
+        self._components = None
+        self._release_shared()
+        self._hierarchy = None
+        self._landmarks = None
+
+    def _hashes_match(self, vertex: str) -> bool:
+        """Returns whether the workers hash vertices like this process."""
+        if self._same_hashes is None:
+            worker_hash = self._executor.submit(hash, vertex).result()
+            self._same_hashes = worker_hash == hash(vertex)
+
+        return self._same_hashes
+
+    def _search_graph(self) -> SimpleGraph:
+        """Returns the map given to the workers of the executor."""
+        if self._shared is not None:
+            return self._shared
+
+        if not isinstance(self._executor, ProcessPoolExecutor):
+            # threads share the map
+            return self._graph
+
+        self._shared = SharedGraph.publish(self._graph)
+
+        return self._shared
+
+    def _release_shared(self):
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __len__(self) -> int:
+        return len(self._trees) + len(self._layers)
+
+    def __repr__(self):
+        return f"PathCache({len(self._trees)}, {len(self._layers)})"
@@ -0,0 +1,146 @@
+from typing import Dict, List
+
+from graphs.graph import SimpleGraph
+
+
+class ComponentIndex:
+    """Connected components of a map, for constant time reachability checks.
+
+    The components are found once with a union-find over every edge, with
+    path halving and union by size, and each vertex is then labelled with
+    its component. Edges join their ends whatever their direction, so two
+    vertices of the same component reach each other on maps whose edges go
+    both ways, as the ones built by ``Graph`` do.
+
+    The index is valid for the version of the map it was built on, and
+    ``PathCache.components`` builds a new one whenever the map changes.
+
+    Example:
+        >>> components = ComponentIndex(map)
+        >>> components.connected("A1", "D4")
+        True
+
+    Attributes:
+        _component (Dict[str, int]): The component of each vertex, numbered
+            in the order of their smallest vertex.
+        _sizes (List[int]): The number of vertices of each component.
+    """
+
+    def __init__(self, graph: SimpleGraph):
+        """Finds the components of a map.
+
+        Args:
+            graph (SimpleGraph): The map.
+        """
+        self._version = graph.version
+        vertices = sorted(graph.vertices)
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        parent = list(range(len(vertices)))
+        size = [1] * len(vertices)
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+
+            return i
+
+        for origin, neighborhood in graph.edges_list.items():
+            u = find(index[origin])
+
+            for destination, _ in neighborhood:
+                w = find(index[destination])
+
+                if u == w:
+                    continue
+
+                if size[u] < size[w]:
+                    u, w = w, u
+
+                parent[w] = u
+                size[u] += size[w]
+
+        labels: Dict[int, int] = {}
+        self._component: Dict[str, int] = {}
+        self._sizes: List[int] = []
+
+        for i, vertex in enumerate(vertices):
+            root = find(i)
+
+            if root not in labels:
+                labels[root] = len(labels)
+                self._sizes.append(size[root])
+
+            self._component[vertex] = labels[root]
+
+    @property
+    def version(self) -> int:
+        """Returns the version of the map the index was built on.
+
+        Returns:
+            int: The ``version`` of the map.
+        """
+        return self._version
+
+    @property
+    def sizes(self) -> List[int]:
+        """Returns the number of vertices of each component.
+
+        Returns:
+            List[int]: The sizes, by component. It must not be modified.
+        """
+        return self._sizes
+
+    def matches(self, graph: SimpleGraph) -> bool:
+        """Tells whether the index is valid for the current state of a map.
+
+        Args:
+            graph (SimpleGraph): The map the index was built on.
+
+        Returns:
+            bool: True if the map did not change since.
+        """
+        return graph.version == self._version
+
+    def component(self, vertex: str) -> int:
+        """Returns the component of a vertex.
+
+        Args:
+            vertex (str): The vertex.
+
+        Raises:
+            ValueError: If the vertex is not in the map.
+
+        Returns:
+            int: The index of its component.
+        """
+        try:
+            return self._component[vertex]
+        except KeyError:
+            raise ValueError(
+                f"'{vertex}' is not a vertex in the graph"
+            ) from None
+
+    def connected(self, origin: str, destination: str) -> bool:
+        """Tells whether two vertices are in the same component.
+
+        Args:
+            origin (str): The first vertex.
+            destination (str): The second vertex.
+
+        Returns:
+            bool: True if they are connected, False if not or if one of
+                them is not in the map.
+        """
+        component = self._component.get(origin)
+
+        return (
+            component is not None
+            and self._component.get(destination) == component
+        )
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __repr__(self):
+        return f"ComponentIndex({len(self._component)}, {len(self._sizes)})"
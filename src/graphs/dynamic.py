@@ -0,0 +1,209 @@
+import heapq
+import math
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from graphs.graph import SimpleGraph
+from graphs.functions import predecessors_to_path
+from graphs.search import dijkstra_tree
+
+
+class DynamicShortestPaths:
+    """Shortest path tree from an origin that survives changes in the map.
+
+    When edges or vertices are removed, or edge weights increase, only the
+    vertices whose path went through the change can get farther from the
+    origin. They form the subtrees hanging below the changed edges, so the
+    tree is repaired by running Dijkstra over those subtrees only, seeded
+    from the unaffected vertices around them.
+
+    The map must be changed before calling ``repair``. Weight decreases and
+    new edges are not supported, since they can shorten paths anywhere.
+
+    Attributes:
+        _graph (SimpleGraph): The map the tree is computed over.
+        _origin (str): The origin of the tree.
+        _distances (Dict[str, float]): The shortest distance to each vertex.
+        _predecessors (Dict[str, str]): The predecessor of each vertex.
+        _children (Dict[str, Set[str]] | None): The successors of each
+            vertex in the tree, built on the first repair.
+    """
+
+    def __init__(
+        self,
+        graph: SimpleGraph,
+        origin: str,
+        distances: Dict[str, float] | None = None,
+        predecessors: Dict[str, str] | None = None,
+    ):
+        """Initializes the tree, computing it if it is not given.
+
+        Args:
+            graph (SimpleGraph): The map the tree is computed over.
+            origin (str): The origin of the tree.
+            distances (Dict[str, float], optional): The distances of an
+                already computed tree, which is then repaired in place.
+            predecessors (Dict[str, str], optional): The predecessors of an
+                already computed tree.
+        """
+        if distances is None or predecessors is None:
+            distances, predecessors = dijkstra_tree(graph, origin)
+
+        self._graph = graph
+        self._origin = origin
+        self._distances = distances
+        self._predecessors = predecessors
+        self._children: Dict[str, Set[str]] | None = None
+
+    @property
+    def origin(self) -> str:
+        return self._origin
+
+    @property
+    def distances(self) -> Dict[str, float]:
+        return self._distances
+
+    @property
+    def predecessors(self) -> Dict[str, str]:
+        return self._predecessors
+
+    def path(self, destination: str) -> List[str]:
+        """Returns the shortest path from the origin to a vertex.
+
+        Args:
+            destination (str): The last vertex of the path.
+
+        Returns:
+            List[str]: The vertices from the origin to the destination.
+        """
+        return predecessors_to_path(self._predecessors, destination)
+
+    def repair(
+        self,
+        edges: Iterable[Tuple[str, str]] = (),
+        vertices: Iterable[str] = (),
+    ) -> Set[str]:
+        """Updates the tree after edges or vertices changed in the map.
+
+        Args:
+            edges (Iterable[Tuple[str, str]]): The edges, as ``(origin,
+                destination)`` pairs, that were removed or got heavier.
+            vertices (Iterable[str]): The vertices that were removed.
+
+        Raises:
+            ValueError: If the origin of the tree was removed.
+
+        Returns:
+            Set[str]: The vertices whose path was recomputed.
+        """
+        removed = set(vertices)
+
+        if self._origin in removed:
+            raise ValueError(
+                f"The origin '{self._origin}' of the tree was removed."
+            )
+
+        children = self._children_index()
+        roots = [
+            destination
+            for origin, destination in edges
+            if self._predecessors.get(destination) == origin
+        ]
+
+        for vertex in removed:
+            roots.extend(children.get(vertex, ()))
+
+        affected = self._subtrees(roots, removed)
+
+        for vertex in removed:
+            self._detach(vertex)
+            self._distances.pop(vertex, None)
+            self._predecessors.pop(vertex, None)
+            children.pop(vertex, None)
+
+        for vertex in affected:
+            self._detach(vertex)
+            self._distances[vertex] = math.inf
+
+        self._settle(affected)
+
+        for vertex in affected:
+            predecessor = self._predecessors[vertex]
+
+            if predecessor is not None:
+                children.setdefault(predecessor, set()).add(vertex)
+
+        return affected
+
+    def _children_index(self) -> Dict[str, Set[str]]:
+        if self._children is None:
+            self._children = {}
+
+            for vertex, predecessor in self._predecessors.items():
+                if predecessor is not None:
+                    self._children.setdefault(predecessor, set()).add(vertex)
+
+        return self._children
+
+    def _subtrees(self, roots: List[str], removed: Set[str]) -> Set[str]:
+        affected: Set[str] = set()
+        stack = list(roots)
+
+        while stack:
+            vertex = stack.pop()
+
+            if vertex in affected or vertex in removed:
+                continue
+
+            affected.add(vertex)
+            stack.extend(self._children.get(vertex, ()))
+
+        return affected
+
+    def _detach(self, vertex: str):
+        predecessor = self._predecessors.get(vertex)
+
+        if predecessor is not None:
+            self._children.get(predecessor, set()).discard(vertex)
+
+        self._predecessors[vertex] = None
+
+    def _in_edges(self, vertex: str) -> Iterator[Tuple[str, float]]:
+        for neighbor in self._graph.in_neighborhood(vertex):
+            for _, weight in self._graph.edges(neighbor, vertex):
+                yield neighbor, weight
+
+    def _settle(self, affected: Set[str]):
+        distances = self._distances
+        predecessors = self._predecessors
+        frontier_queue: List[Tuple[float, str]] = []
+
+        for vertex in affected:
+            for neighbor, weight in self._in_edges(vertex):
+                if neighbor in affected or neighbor not in distances:
+                    continue
+
+                distance = distances[neighbor] + weight
+
+                if distance < distances[vertex]:
+                    distances[vertex] = distance
+                    predecessors[vertex] = neighbor
+
+            if not math.isinf(distances[vertex]):
+                heapq.heappush(frontier_queue, (distances[vertex], vertex))
+
+        edges_list = self._graph.edges_list
+
+        while frontier_queue:
+            distance, vertex = heapq.heappop(frontier_queue)
+
+            if distance > distances[vertex]:
+                continue
+
+            for neighbor, weight in edges_list.get(vertex, ()):
+                if neighbor in affected and distance + weight < distances[neighbor]:
+                    distances[neighbor] = distance + weight
+                    predecessors[neighbor] = vertex
+                    heapq.heappush(frontier_queue, (distances[neighbor], neighbor))
+
+    def __repr__(self):
+        return f"DynamicShortestPaths({self._origin}, {len(self._distances)})"
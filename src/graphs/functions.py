@@ -38,6 +38,30 @@ def predecessors_to_list(
     return paths
 
 
+def predecessors_to_path(
+    predecessors: Dict[str, str], vertex: str
+) -> List[str]:
+    """Rebuilds the path from the origin of a tree to the given vertex.
+
+    Args:
+        predecessors (Dict[str, str]): A dictionary mapping each vertex to its predecessor.
+        vertex (str): The last vertex of the path.
+
+    Returns:
+        List[str]: The sequence of vertices from the origin to the vertex.
+    """
+    path = [vertex]
+    predecessor = predecessors.get(vertex)
+
+    while predecessor is not None:
+        path.append(predecessor)
+        predecessor = predecessors.get(predecessor)
+
+    path.reverse()
+
+    return path
+
+
 def random_vertices(graph: Graph, num_vertices: int = 1) -> List[str]:
     """Selects and returns a list of random vertices from the graph.
 
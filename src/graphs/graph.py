@@ -1,6 +1,10 @@
 import abc
+import gc
+from collections import defaultdict
 from itertools import groupby
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from graphs.registry import VertexRegistry
 
 
 class SimpleGraph(abc.ABC):
@@ -41,6 +45,18 @@ class SimpleGraph(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def in_neighborhood(self, vertex: str) -> Set[str]:
+        """Gets the vertices with an edge to a given vertex.
+
+        Args:
+            vertex (str): The vertex whose in-neighbors are to be retrieved.
+
+        Returns:
+            Set[str]: The vertices with an edge to the vertex.
+        """
+        pass
+
     @abc.abstractmethod
     def edges(
         self, origin: str, dest: str | None = None
@@ -72,11 +88,12 @@ class SimpleGraph(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def add_vertex(self, vertices: List[str] | str) -> None:
+    def add_vertex(self, vertices: List[str] | str | int) -> None:
         """Adds one or more vertices to the graph.
 
         Args:
-            vertices (List[str] | str): A single vertex or a list of vertices.
+            vertices (List[str] | str | int): A single vertex, a name or an
+                id, or a list of vertices.
         """
         pass
 
@@ -100,6 +117,57 @@ class SimpleGraph(abc.ABC):
         """
         pass
 
+    def remove_vertices(self, vertices: Iterable[str]) -> None:
+        """Removes several vertices and all associated edges from the graph.
+
+        Args:
+            vertices (Iterable[str]): The vertices to be removed.
+        """
+        for vertex in list(vertices):
+            self.remove_vertex(vertex)
+
+    @abc.abstractmethod
+    def remove_edge(self, origin: str, destination: str) -> None:
+        """Removes every edge from the origin to the destination vertex.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+        """
+        pass
+
+    @abc.abstractmethod
+    def set_weight(
+        self, origin: str, destination: str, distance: float
+    ) -> None:
+        """Replaces the edges from the origin to the destination vertex.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+            distance (float): The new weight of the edge.
+        """
+        pass
+
+    @property
+    def version(self) -> int:
+        """Returns a number that changes whenever the graph changes.
+
+        Returns:
+            int: The version of the graph.
+        """
+        return 0
+
+    @property
+    def registry(self) -> VertexRegistry | None:
+        """Returns the names of the vertices if they are interned.
+
+        Returns:
+            VertexRegistry | None: The registry mapping the vertex ids to
+                their names, or None if the vertices are their names.
+        """
+        return None
+
 
 class Graph(SimpleGraph):
     """Represents a graph using an adjacency list.
@@ -109,8 +177,18 @@ class Graph(SimpleGraph):
         __edge_list (Dict[str, List[Tuple[str, float]]]):
             Dictionary mapping each vertex to a list of tuples containing
             neighboring vertices and edge weights.
+        __in_edges (Dict[str, Set[str]]): Dictionary mapping each vertex to
+            the set of vertices with an edge to it, so that removing a vertex
+            only touches its incident edges.
+        __registry (VertexRegistry | None): The names of the vertices, if
+            they are interned to ids.
     """
 
+    MIN = "min"  # Keeps the lightest of the parallel edges.
+    FIRST = "first"  # Keeps the first parallel edge given.
+    ERROR = "error"  # Raises an error on parallel edges.
+    KEEP = "keep"  # Keeps every parallel edge, as the constructor does.
+
     def __init__(self, edge_list: List[Tuple[str, str, float]] = []):
         """Initializes a graph with a list of edges.
 
@@ -121,6 +199,9 @@ class Graph(SimpleGraph):
         """
         self.__vertices: Set[str] = set()
         self.__edge_list: Dict[str, List[Tuple[str, float]]] = {}
+        self.__in_edges: Dict[str, Set[str]] = {}
+        self.__registry: VertexRegistry | None = None
+        self.__version = 0
 
         for edge in edge_list:
             self.add_edge(edge[0], edge[1], edge[2])
@@ -129,6 +210,155 @@ class Graph(SimpleGraph):
             if edge[0] != edge[1]:
                 self.add_edge(edge[1], edge[0], edge[2])
 
+    @classmethod
+    def from_edges(
+        cls,
+        edges: Iterable[Tuple[str, str, float]] | None = None,
+        origins: Sequence[str] | None = None,
+        destinations: Sequence[str] | None = None,
+        weights: Sequence[float] | None = None,
+        directed: bool = False,
+        duplicates: str = MIN,
+    ) -> "Graph":
+        """Builds a graph from many edges at once.
+
+        The edges are given either as ``(origin, destination, weight)``
+        tuples or as columns, such as NumPy arrays, and the adjacency is
+        built in a single pass. Unlike the constructor, parallel edges are
+        merged, so each pair of vertices has at most one edge per direction,
+        unless they are kept with ``Graph.KEEP``, which builds the same graph
+        as the constructor. The neighbors of each vertex keep the order the
+        edges were given.
+
+        Args:
+            edges (Iterable[Tuple[str, str, float]], optional): The edges as
+                tuples.
+            origins (Sequence[str], optional): The origin of each edge, used
+                instead of ``edges``.
+            destinations (Sequence[str], optional): The destination of each
+                edge.
+            weights (Sequence[float], optional): The weight of each edge.
+                Defaults to 1 for every edge.
+            directed (bool): If false, each edge is also added in the reverse
+                direction, as done by the constructor.
+            duplicates (str): What to do with parallel edges, either
+                ``Graph.MIN``, ``Graph.FIRST``, ``Graph.ERROR`` or
+                ``Graph.KEEP``.
+
+        Raises:
+            ValueError: If both or neither edges and columns are given, the
+                columns have different lengths, the policy is unknown or
+                there are parallel edges with the ``Graph.ERROR`` policy.
+
+        Returns:
+            Graph: The new graph.
+        """
+        if duplicates not in (Graph.MIN, Graph.FIRST, Graph.ERROR, Graph.KEEP):
+            raise ValueError(f"'{duplicates}' is not a duplicate policy.")
+
+        if (edges is None) == (origins is None or destinations is None):
+            raise ValueError(
+                "Either the edges or the origins and destinations must be given."
+            )
+
+        if edges is None:
+            origins = _to_list(origins)
+            destinations = _to_list(destinations)
+            weights = (
+                _to_list(weights)
+                if weights is not None
+                else [1] * len(origins)
+            )
+
+            if not len(origins) == len(destinations) == len(weights):
+                raise ValueError("The edge columns must have the same length.")
+
+            edges = zip(origins, destinations, weights)
+
+        # the collector would scan the many new containers several times
+        collecting = gc.isenabled()
+        gc.disable()
+
+        try:
+            graph = cls()
+
+            if duplicates == Graph.KEEP:
+                (
+                    graph.__vertices,
+                    graph.__edge_list,
+                    graph.__in_edges,
+                ) = _keep_edges(edges, directed)
+
+                graph.__version += 1
+
+                return graph
+
+            adjacency = _merge_edges(edges, directed, duplicates)
+            graph.__edge_list = {
+                origin: list(neighborhood.items())
+                for origin, neighborhood in adjacency.items()
+            }
+            graph.__vertices = set(adjacency)
+
+            if directed:
+                in_edges = graph.__in_edges = {v: set() for v in adjacency}
+
+                for origin, neighborhood in adjacency.items():
+                    for destination in neighborhood:
+                        in_edges[destination].add(origin)
+            else:
+                graph.__in_edges = {
+                    vertex: set(neighborhood)
+                    for vertex, neighborhood in adjacency.items()
+                }
+        finally:
+            if collecting:
+                gc.enable()
+
+        graph.__version += 1
+
+        return graph
+
+    def interned(self) -> "Graph":
+        """Returns a copy of the graph whose vertices are dense int ids.
+
+        The ids are assigned by a ``VertexRegistry`` kept by the copy, which
+        is used to read the names back when the results are shown. Edges
+        keep their order, including parallel edges.
+
+        Returns:
+            Graph: The interned copy.
+        """
+        registry = VertexRegistry(self.__vertices)
+        ids = registry.id
+        graph = Graph()
+        graph.__registry = registry
+        graph.__vertices = {ids(vertex) for vertex in self.__vertices}
+        graph.__edge_list = {
+            ids(origin): [
+                (ids(destination), distance)
+                for destination, distance in neighborhood
+            ]
+            for origin, neighborhood in self.__edge_list.items()
+        }
+        graph.__in_edges = {
+            ids(vertex): {ids(origin) for origin in origins}
+            for vertex, origins in self.__in_edges.items()
+        }
+        graph.__version += 1
+
+        return graph
+
+    @property
+    def registry(self) -> VertexRegistry | None:
+        """Returns the names of the vertices if they are interned.
+
+        Returns:
+            VertexRegistry | None: The registry mapping the vertex ids to
+                their names, or None if the vertices are their names.
+        """
+        return self.__registry
+
     @property
     def vertices(self) -> Set[str]:
         """Returns the set of graph vertices.
@@ -147,6 +377,15 @@ class Graph(SimpleGraph):
         """
         return self.__edge_list
 
+    @property
+    def version(self) -> int:
+        """Returns a number that changes whenever the graph changes.
+
+        Returns:
+            int: The version of the graph.
+        """
+        return self.__version
+
     def neighborhood(self, vertex: str) -> List[str]:
         """Gets the neighboring vertices of a given vertex.
 
@@ -158,6 +397,17 @@ class Graph(SimpleGraph):
         """
         return {n[0] for n in self.__edge_list[vertex]}
 
+    def in_neighborhood(self, vertex: str) -> Set[str]:
+        """Gets the vertices with an edge to a given vertex.
+
+        Args:
+            vertex (str): The vertex whose in-neighbors are to be retrieved.
+
+        Returns:
+            Set[str]: The vertices with an edge to the vertex.
+        """
+        return set(self.__in_edges.get(vertex, ()))
+
     def edges(
         self, origin: str, dest: str | None = None
     ) -> List[Tuple[str, float]]:
@@ -193,17 +443,34 @@ class Graph(SimpleGraph):
         """
         return self.edges(origin, dest)[0][1]
 
-    def add_vertex(self, vertices: List[str] | str) -> None:
+    def add_vertex(self, vertices: List[str] | str | int) -> None:
         """Adds one or more vertices to the graph.
 
+        The vertices of an interned graph must be ids of its registry, since
+        new names can not be given ids without changing the others.
+
         Args:
-            vertices (List[str] | str): A single vertex or a list of vertices.
+            vertices (List[str] | str | int): A single vertex, a name or an
+                id, or a list of vertices.
+
+        Raises:
+            ValueError: If the graph is interned and a vertex is not an id of
+                its registry.
         """
-        if isinstance(vertices, str):
-            self.__vertices.add(vertices)
-        else:
+        if isinstance(vertices, (str, int)):
+            vertices = [vertices]
+
+        if self.__registry is not None:
+            size = len(self.__registry)
+
             for vertex in vertices:
-                self.__vertices.add(vertex)
+                if not isinstance(vertex, int) or not 0 <= vertex < size:
+                    raise ValueError(
+                        f"'{vertex}' is not a vertex id of the registry of the graph."
+                    )
+
+        self.__vertices.update(vertices)
+        self.__version += 1
 
     def add_edge(self, origin: str, destination: str, distance: float) -> None:
         """Adds an edge between two vertices with the given weight.
@@ -212,6 +479,10 @@ class Graph(SimpleGraph):
             origin (str): The origin vertex.
             destination (str): The destination vertex.
             distance (float): The weight of the edge.
+
+        Raises:
+            ValueError: If the graph is interned and a vertex is not an id of
+                its registry.
         """
         self.add_vertex([origin, destination])
 
@@ -219,24 +490,173 @@ class Graph(SimpleGraph):
         neighborhood.append((destination, distance))
 
         self.__edge_list.update({origin: neighborhood})
+        self.__in_edges.setdefault(destination, set()).add(origin)
+        self.__version += 1
 
     def remove_vertex(self, vertex: str) -> None:
         """Removes a vertex and all associated edges from the graph.
 
+        Only the edges incident to the vertex are visited.
+
         Args:
             vertex (str): The vertex to be removed.
         """
-        if vertex in self.__vertices:
-            for vi in self.__vertices:
-                neighborhood = self.__edge_list.get(vi, [])
-                neighborhood = list(
-                    filter(lambda t: t[0] != vertex, neighborhood)
-                )
-                self.__edge_list.update({vi: neighborhood})
+        self.remove_vertices([vertex])
+
+    def remove_vertices(self, vertices: Iterable[str]) -> None:
+        """Removes several vertices and all associated edges from the graph.
+
+        Each neighborhood touching the removed vertices is filtered once, so
+        removing a region costs time proportional to the edges incident to
+        it rather than to the size of the graph.
+
+        Args:
+            vertices (Iterable[str]): The vertices to be removed.
+        """
+        removed = {vertex for vertex in vertices if vertex in self.__vertices}
+
+        if not removed:
+            return
+
+        origins = set()
+
+        for vertex in removed:
+            origins.update(self.__in_edges.get(vertex, ()))
 
-            self.__edge_list.pop(vertex)
+            for destination, _ in self.__edge_list.get(vertex, ()):
+                if destination not in removed:
+                    self.__in_edges[destination].discard(vertex)
+
+        for origin in origins - removed:
+            self.__edge_list[origin] = [
+                edge
+                for edge in self.__edge_list[origin]
+                if edge[0] not in removed
+            ]
+
+        for vertex in removed:
+            self.__edge_list.pop(vertex, None)
+            self.__in_edges.pop(vertex, None)
             self.__vertices.remove(vertex)
 
+        self.__version += 1
+
+    def remove_edge(self, origin: str, destination: str) -> None:
+        """Removes every edge from the origin to the destination vertex.
+
+        The edge in the reverse direction, if any, is kept.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+        """
+        if origin in self.__edge_list:
+            self.__edge_list[origin] = [
+                edge
+                for edge in self.__edge_list[origin]
+                if edge[0] != destination
+            ]
+            self.__in_edges.get(destination, set()).discard(origin)
+            self.__version += 1
+
+    def set_weight(
+        self, origin: str, destination: str, distance: float
+    ) -> None:
+        """Replaces the edges from the origin to the destination vertex.
+
+        The edge in the reverse direction, if any, is kept.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+            distance (float): The new weight of the edge.
+        """
+        self.remove_edge(origin, destination)
+        self.add_edge(origin, destination, distance)
+
     def __repr__(self) -> str:
         """Returns a string representation of the graph's adjacency list."""
         return f"{self.edges_list}"
+
+
+def _merge_edges(
+    edges: Iterable[Tuple[str, str, float]], directed: bool, duplicates: str
+) -> Dict[str, Dict[str, float]]:
+    """Builds the adjacency of the edges, merging parallel edges.
+
+    Every vertex gets an entry, including the destinations of a directed
+    graph without outgoing edges.
+    """
+    adjacency: Dict[str, Dict[str, float]] = defaultdict(dict)
+    keep_min = duplicates == Graph.MIN
+    keep_first = duplicates == Graph.FIRST
+
+    def add(source: str, target: str, distance: float):
+        neighborhood = adjacency[source]
+        current = neighborhood.get(target)
+
+        if current is None:
+            neighborhood[target] = distance
+        elif keep_min:
+            if distance < current:
+                neighborhood[target] = distance
+        elif not keep_first:
+            raise ValueError(
+                f"The edge ({source}, {target}) is given more than once."
+            )
+
+    for origin, destination, distance in edges:
+        add(origin, destination, distance)
+
+        if not directed and origin != destination:
+            add(destination, origin, distance)
+        elif destination not in adjacency:
+            adjacency[destination] = {}
+
+    return adjacency
+
+
+def _keep_edges(
+    edges: Iterable[Tuple[str, str, float]], directed: bool
+) -> Tuple[Set[str], Dict[str, List[Tuple[str, float]]], Dict[str, Set[str]]]:
+    """Builds the vertices, adjacency and in-edges of the edges, keeping
+    parallel edges.
+
+    The containers are filled in the order ``add_edge`` fills them, so they
+    iterate in the same order as the ones of the constructor.
+    """
+    vertices: Set[str] = set()
+    edge_list: Dict[str, List[Tuple[str, float]]] = {}
+    in_edges: Dict[str, Set[str]] = {}
+    add_vertex = vertices.add
+
+    def add(source: str, target: str, distance: float):
+        neighborhood = edge_list.get(source)
+
+        if neighborhood is None:
+            neighborhood = edge_list[source] = []
+
+        neighborhood.append((target, distance))
+        origins = in_edges.get(target)
+
+        if origins is None:
+            origins = in_edges[target] = set()
+
+        origins.add(source)
+
+    for origin, destination, distance in edges:
+        add_vertex(origin)
+        add_vertex(destination)
+        add(origin, destination, distance)
+
+        if not directed and origin != destination:
+            add(destination, origin, distance)
+        elif destination not in edge_list:
+            edge_list[destination] = []
+
+    return vertices, edge_list, in_edges
+
+
+def _to_list(column: Sequence) -> list:
+    """Converts a column, such as a NumPy array, to a list of Python values."""
+    return column.tolist() if hasattr(column, "tolist") else list(column)
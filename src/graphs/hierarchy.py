@@ -0,0 +1,563 @@
+import hashlib
+import heapq
+import math
+from itertools import pairwise
+from typing import IO, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from graphs.graph import SimpleGraph
+
+
+def _fingerprint(graph: SimpleGraph) -> str:
+    """Hashes the vertices and the lightest edge between each pair."""
+    edges: Dict[Tuple[str, str], float] = {}
+
+    for origin, neighborhood in graph.edges_list.items():
+        for destination, weight in neighborhood:
+            key = (origin, destination)
+            edges[key] = min(weight, edges.get(key, math.inf))
+
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(graph.vertices)).encode())
+    digest.update(repr(sorted(edges.items())).encode())
+
+    return digest.hexdigest()
+
+
+def _pack(
+    adjacency: List[List[Tuple[int, float]]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flattens adjacency lists into CSR offsets, targets and weights."""
+    offsets = np.zeros(len(adjacency) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(edges) for edges in adjacency])
+    targets = np.fromiter(
+        (target for edges in adjacency for target, _ in edges),
+        np.int64,
+        offsets[-1],
+    )
+    weights = np.fromiter(
+        (weight for edges in adjacency for _, weight in edges),
+        np.float64,
+        offsets[-1],
+    )
+
+    return offsets, targets, weights
+
+
+def _unpack(
+    offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray
+) -> List[List[Tuple[int, float]]]:
+    """Rebuilds the adjacency lists flattened by ``_pack``."""
+    targets, weights = targets.tolist(), weights.tolist()
+    bounds = offsets.tolist()
+
+    return [
+        list(zip(targets[start:end], weights[start:end]))
+        for start, end in pairwise(bounds)
+    ]
+
+
+class ContractionHierarchy:
+    """Point to point shortest path oracle built by contracting the map.
+
+    Vertices are contracted one at a time, cheapest first, and a shortcut
+    edge is added between two neighbors of the contracted vertex whenever
+    the path through it is the only shortest one found by a bounded witness
+    search. Each vertex then only keeps its edges to the vertices contracted
+    after it, so a query runs two small Dijkstra searches that only go up
+    the hierarchy, one from the origin and one backwards from the
+    destination, which meet at the shortest path. Shortcuts remember the
+    vertex they skip, so paths are unpacked into edges of the map.
+
+    The hierarchy holds the distances of the map it was built over and must
+    be rebuilt when the map changes. It is saved in a NumPy archive with a
+    fingerprint of the map, so a later run over the same map loads it
+    instead of building it again.
+
+    Example:
+        >>> hierarchy = ContractionHierarchy(map)
+        >>> hierarchy.save("map.ch.npz")
+        >>> hierarchy = ContractionHierarchy.load("map.ch.npz", map)
+        >>> hierarchy.path("A1", "D4")
+
+    Attributes:
+        _vertices (List[str]): The vertices, sorted, indexed by position.
+        _index (Dict[str, int]): The position of each vertex.
+        _rank (List[int]): The contraction order of each vertex.
+        _up (List[List[Tuple[int, float]]]): The edges of each vertex to the
+            vertices contracted after it.
+        _down (List[List[Tuple[int, float]]]): The edges to each vertex from
+            the vertices contracted after it, reversed.
+        _middle (Dict[Tuple[int, int], int]): The vertex skipped by each
+            shortcut.
+    """
+
+    def __init__(self, graph: SimpleGraph, witness_limit: int = 64):
+        """Builds the hierarchy of a map.
+
+        Args:
+            graph (SimpleGraph): The map. Between two vertices, only the
+                lightest edge is kept.
+            witness_limit (int): The number of vertices settled by each
+                witness search. Lower limits build faster but add more
+                shortcuts, which slows down the queries.
+        """
+        self._vertices = sorted(graph.vertices)
+        self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        self._fingerprint = _fingerprint(graph)
+        self._settled = 0
+        self._contract(graph, witness_limit)
+
+    def _contract(self, graph: SimpleGraph, witness_limit: int):
+        size = len(self._vertices)
+        index = self._index
+        # the edges between the vertices not contracted yet
+        out: List[Dict[int, float]] = [{} for _ in range(size)]
+        inc: List[Dict[int, float]] = [{} for _ in range(size)]
+
+        for origin, neighborhood in graph.edges_list.items():
+            u = index[origin]
+
+            for destination, weight in neighborhood:
+                w = index[destination]
+
+                if u != w and weight < out[u].get(w, math.inf):
+                    out[u][w] = inc[w][u] = weight
+
+        self._rank = [0] * size
+        self._up: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+        self._down: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+        self._middle: Dict[Tuple[int, int], int] = {}
+        deleted = [0] * size
+
+        def shortcuts(v: int) -> List[Tuple[int, int, float]]:
+            found = []
+
+            for u, to_v in inc[v].items():
+                via = {w: to_v + weight for w, weight in out[v].items()}
+                via.pop(u, None)
+
+                if not via:
+                    continue
+
+                witness = self._witness(
+                    out, u, v, max(via.values()), witness_limit
+                )
+
+                for w, distance in via.items():
+                    if witness.get(w, math.inf) > distance:
+                        found.append((u, w, distance))
+
+            return found
+
+        def priority(v: int, added: List[Tuple[int, int, float]]) -> int:
+            # the edges the contraction adds, plus the neighbors contracted
+            # so far, which spreads the contraction evenly over the map
+            return len(added) - len(inc[v]) - len(out[v]) + deleted[v]
+
+        queue = [(priority(v, shortcuts(v)), v) for v in range(size)]
+        heapq.heapify(queue)
+        rank = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            added = shortcuts(v)
+            current = priority(v, added)
+
+            if queue and current > queue[0][0]:
+                # lazy update, another vertex became cheaper
+                heapq.heappush(queue, (current, v))
+                continue
+
+            self._rank[v] = rank
+            rank += 1
+            self._up[v] = list(out[v].items())
+            self._down[v] = list(inc[v].items())
+
+            for u in inc[v]:
+                del out[u][v]
+                deleted[u] += 1
+
+            for w in out[v]:
+                del inc[w][v]
+                deleted[w] += 1
+
+            for u, w, distance in added:
+                if distance < out[u].get(w, math.inf):
+                    out[u][w] = inc[w][u] = distance
+                    self._middle[(u, w)] = v
+
+            out[v], inc[v] = {}, {}
+
+    @staticmethod
+    def _witness(
+        out: List[Dict[int, float]],
+        source: int,
+        skip: int,
+        max_distance: float,
+        limit: int,
+    ) -> Dict[int, float]:
+        """Bounded Dijkstra from a source that avoids a vertex.
+
+        Returns:
+            Dict[int, float]: The length of a path found to each vertex,
+                which may not be the shortest one.
+        """
+        distances = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+
+        while queue and settled < limit:
+            distance, u = heapq.heappop(queue)
+
+            if distance > max_distance:
+                break
+
+            if distance > distances[u]:
+                continue
+
+            settled += 1
+
+            for w, weight in out[u].items():
+                if w != skip:
+                    new_distance = distance + weight
+
+                    if new_distance < distances.get(w, math.inf):
+                        distances[w] = new_distance
+                        heapq.heappush(queue, (new_distance, w))
+
+        return distances
+
+    @property
+    def vertices(self) -> List[str]:
+        """Returns the vertices of the hierarchy.
+
+        Returns:
+            List[str]: The sorted vertices. It must not be modified.
+        """
+        return self._vertices
+
+    @property
+    def shortcuts(self) -> int:
+        """Returns the number of shortcuts added by the contraction.
+
+        Returns:
+            int: The number of shortcut edges.
+        """
+        return len(self._middle)
+
+    @property
+    def settled(self) -> int:
+        """Returns the vertices settled by the last query.
+
+        Returns:
+            int: The number of vertices settled by both searches.
+        """
+        return self._settled
+
+    def matches(self, graph: SimpleGraph) -> bool:
+        """Returns whether the hierarchy was built over a map like this one.
+
+        Args:
+            graph (SimpleGraph): The map.
+
+        Returns:
+            bool: True if the map has the same vertices and edge weights.
+        """
+        return _fingerprint(graph) == self._fingerprint
+
+    def distance(self, origin: str, destination: str) -> float:
+        """Returns the shortest distance between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            float: The distance, or ``math.inf`` if it is unreachable.
+        """
+        distance, _, _, _ = self._query(
+            self._position(origin), self._position(destination)
+        )
+
+        return distance
+
+    def path(self, origin: str, destination: str) -> List[str]:
+        """Returns the shortest path between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            List[str]: The vertices from the origin to the destination, or
+                an empty list if it is unreachable.
+        """
+        distance, meeting, forward, backward = self._query(
+            self._position(origin), self._position(destination)
+        )
+
+        if math.isinf(distance):
+            return []
+
+        # the edges up from the origin, then down to the destination
+        edges = []
+        vertex = meeting
+
+        while forward[vertex] is not None:
+            edges.append((forward[vertex], vertex))
+            vertex = forward[vertex]
+
+        edges.reverse()
+        vertex = meeting
+
+        while backward[vertex] is not None:
+            edges.append((vertex, backward[vertex]))
+            vertex = backward[vertex]
+
+        path = [self._position(origin)]
+
+        for edge in edges:
+            path.extend(self._unpack_edge(*edge))
+
+        return [self._vertices[i] for i in path]
+
+    def nearest(
+        self, origin: str, vertices: Iterable[str]
+    ) -> Tuple[str | None, float]:
+        """Returns the closest of several vertices to an origin.
+
+        The upward search from the origin is run once, and the search from
+        each candidate stops as soon as it can not beat the closest one
+        found so far.
+
+        Args:
+            origin (str): The origin vertex.
+            vertices (Iterable[str]): The candidates. Ties are broken by
+                their order.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            Tuple[str | None, float]: The closest reachable candidate and
+                its distance, or ``(None, math.inf)`` if none is reachable.
+        """
+        forward, _ = self._upward(self._position(origin), self._up)
+        settled = len(forward)
+        best, nearest = math.inf, None
+
+        for vertex in vertices:
+            distances, _ = self._upward(
+                self._position(vertex), self._down, best
+            )
+            settled += len(distances)
+
+            for meeting, distance in distances.items():
+                total = forward.get(meeting, math.inf) + distance
+
+                if total < best:
+                    best, nearest = total, vertex
+
+        self._settled = settled
+
+        return nearest, best
+
+    def _position(self, vertex: str) -> int:
+        try:
+            return self._index[vertex]
+        except KeyError:
+            raise ValueError(
+                f"'{vertex}' is not a vertex in the graph"
+            ) from None
+
+    def _upward(
+        self,
+        source: int,
+        edges: List[List[Tuple[int, float]]],
+        bound: float = math.inf,
+    ) -> Tuple[Dict[int, float], Dict[int, int | None]]:
+        """Settles the vertices reachable going up, closer than a bound."""
+        distances: Dict[int, float] = {}
+        tentative = {source: 0}
+        parents: Dict[int, int | None] = {source: None}
+        queue = [(0, source)]
+
+        while queue:
+            distance, u = heapq.heappop(queue)
+
+            if distance >= bound:
+                break
+
+            if u in distances:
+                continue
+
+            distances[u] = distance
+
+            for w, weight in edges[u]:
+                new_distance = distance + weight
+
+                if new_distance < tentative.get(w, math.inf):
+                    tentative[w] = new_distance
+                    parents[w] = u
+                    heapq.heappush(queue, (new_distance, w))
+
+        return distances, parents
+
+    def _query(
+        self, source: int, target: int
+    ) -> Tuple[float, int, Dict[int, int | None], Dict[int, int | None]]:
+        """Runs both upward searches, alternating, until they can not meet
+        closer.
+
+        Returns:
+            Tuple: The distance, the vertex where the searches met, and the
+                parents of each search.
+        """
+        sides = [
+            ({source: 0}, {source: None}, [(0, source)], set(), self._up),
+            ({target: 0}, {target: None}, [(0, target)], set(), self._down),
+        ]
+        best, meeting = (0, source) if source == target else (math.inf, -1)
+        settled = 0
+        side = 0
+
+        while sides[0][2] or sides[1][2]:
+            if not sides[side][2]:
+                side = 1 - side
+
+            distances, parents, queue, done, edges = sides[side]
+            other = sides[1 - side][0]
+            distance, u = heapq.heappop(queue)
+
+            if distance >= best:
+                # nothing left on this side can improve the distance
+                queue.clear()
+                side = 1 - side
+                continue
+
+            if u not in done:
+                done.add(u)
+                settled += 1
+
+                if u in other and distance + other[u] < best:
+                    best, meeting = distance + other[u], u
+
+                for w, weight in edges[u]:
+                    new_distance = distance + weight
+
+                    if new_distance < distances.get(w, math.inf):
+                        distances[w] = new_distance
+                        parents[w] = u
+                        heapq.heappush(queue, (new_distance, w))
+
+            side = 1 - side
+
+        self._settled = settled
+
+        return best, meeting, sides[0][1], sides[1][1]
+
+    def _unpack_edge(self, origin: int, destination: int) -> List[int]:
+        """Expands an edge of the hierarchy into the vertices after the
+        origin, up to the destination."""
+        vertices = []
+        stack = [(origin, destination)]
+
+        while stack:
+            u, w = stack.pop()
+            middle = self._middle.get((u, w))
+
+            if middle is None:
+                vertices.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+
+        return vertices
+
+    def save(self, file: str | IO[bytes]):
+        """Saves the hierarchy to a NumPy archive.
+
+        Args:
+            file (str | IO[bytes]): The path or binary file to write to.
+        """
+        up = _pack(self._up)
+        down = _pack(self._down)
+        shortcuts = np.array(
+            [(u, w, v) for (u, w), v in self._middle.items()], dtype=np.int64
+        ).reshape(-1, 3)
+
+        np.savez(
+            file,
+            vertices=np.array(self._vertices),
+            rank=np.array(self._rank, dtype=np.int64),
+            up_offsets=up[0],
+            up_targets=up[1],
+            up_weights=up[2],
+            down_offsets=down[0],
+            down_targets=down[1],
+            down_weights=down[2],
+            shortcuts=shortcuts,
+            fingerprint=np.array(self._fingerprint),
+        )
+
+    @classmethod
+    def load(
+        cls, file: str | IO[bytes], graph: SimpleGraph
+    ) -> "ContractionHierarchy":
+        """Loads a hierarchy saved by ``save``.
+
+        Args:
+            file (str | IO[bytes]): The path or binary file to read from.
+            graph (SimpleGraph): The map the hierarchy must describe.
+
+        Raises:
+            ValueError: If the hierarchy was built over a different map.
+
+        Returns:
+            ContractionHierarchy: The hierarchy.
+        """
+        with np.load(file, allow_pickle=False) as archive:
+            fingerprint = str(archive["fingerprint"])
+
+            if fingerprint != _fingerprint(graph):
+                raise ValueError(
+                    "The hierarchy was built over a different map, build it again."
+                )
+
+            hierarchy = cls.__new__(cls)
+            hierarchy._vertices = archive["vertices"].tolist()
+            hierarchy._index = {
+                vertex: i for i, vertex in enumerate(hierarchy._vertices)
+            }
+            hierarchy._fingerprint = fingerprint
+            hierarchy._settled = 0
+            hierarchy._rank = archive["rank"].tolist()
+            hierarchy._up = _unpack(
+                archive["up_offsets"],
+                archive["up_targets"],
+                archive["up_weights"],
+            )
+            hierarchy._down = _unpack(
+                archive["down_offsets"],
+                archive["down_targets"],
+                archive["down_weights"],
+            )
+            hierarchy._middle = {
+                (u, w): v for u, w, v in archive["shortcuts"].tolist()
+            }
+
+        return hierarchy
+
+    def __len__(self) -> int:
+        return len(self._vertices)
+
+    def __repr__(self):
+        return f"ContractionHierarchy({len(self._vertices)}, {len(self._middle)})"
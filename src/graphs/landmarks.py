@@ -0,0 +1,337 @@
+import heapq
+import math
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from graphs.graph import SimpleGraph
+from graphs.search import a_star
+
+
+def _distance_row(
+    adjacency: List[List[Tuple[int, float]]], source: int
+) -> np.ndarray:
+    """Computes the distances from a source over indexed adjacency lists."""
+    distances = np.full(len(adjacency), np.inf)
+    distances[source] = 0
+    frontier_queue = [(0.0, source)]
+
+    while frontier_queue:
+        current_distance, vertex = heapq.heappop(frontier_queue)
+
+        if current_distance > distances[vertex]:
+            continue
+
+        for neighbor, weight in adjacency[vertex]:
+            new_neighbor_distance = current_distance + weight
+
+            if new_neighbor_distance < distances[neighbor]:
+                distances[neighbor] = new_neighbor_distance
+                heapq.heappush(
+                    frontier_queue, (new_neighbor_distance, neighbor)
+                )
+
+    return distances
+
+
+class LandmarkIndex:
+    """Lower bounds of the distances of a map from a few landmarks.
+
+    For a landmark ``L``, the triangle inequality gives
+    ``d(u, t) >= d(L, t) - d(L, u)`` and ``d(u, t) >= d(u, L) - d(t, L)``,
+    so the distances from and to each landmark bound the distance between
+    any two vertices from below. The bounds guide A* towards a destination
+    and let ``nearest`` skip the candidates that can not be the closest,
+    on maps without coordinates.
+
+    Landmarks are chosen by farthest point selection: each one is the vertex
+    farthest from the landmarks chosen before it, so they end up on the
+    border of the map, where the bounds are tightest. Vertices no landmark
+    reaches are chosen first, so every component gets a landmark.
+
+    The index costs two float64 arrays per landmark, of one entry per
+    vertex. Since removing vertices or edges and raising weights only make
+    distances longer, the bounds remain valid after those changes, only
+    looser. Any other change requires a new index.
+
+    Example:
+        >>> landmarks = LandmarkIndex(map, 8)
+        >>> a_star(map, "A1", "D4", landmarks.heuristic("D4"))
+
+    Attributes:
+        _vertices (List[str]): The vertices, sorted, indexed by position.
+        _index (Dict[str, int]): The position of each vertex.
+        _landmarks (List[str]): The landmarks, in the order chosen.
+        _from (np.ndarray): The distance from each landmark to each vertex,
+            one row per landmark.
+        _to (np.ndarray): The distance from each vertex to each landmark,
+            one row per landmark.
+    """
+
+    def __init__(
+        self, graph: SimpleGraph, landmarks: int = 8, start: str | None = None
+    ):
+        """Chooses the landmarks of a map and computes their distances.
+
+        Args:
+            graph (SimpleGraph): The map.
+            landmarks (int): The number of landmarks, at most the number of
+                vertices.
+            start (str, optional): The vertex the first landmark is chosen
+                farthest from. Defaults to the smallest vertex.
+
+        Raises:
+            ValueError: If the number of landmarks is not positive or the
+                start is not in the map.
+        """
+        if landmarks <= 0:
+            raise ValueError(
+                f"The number of landmarks must be positive but is '{landmarks}'."
+            )
+
+        self._graph = graph
+        self._vertices = sorted(graph.vertices)
+        self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        self._settled = 0
+
+        size = len(self._vertices)
+        forward: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+        backward: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+
+        for origin, neighborhood in graph.edges_list.items():
+            u = self._index[origin]
+
+            for destination, weight in neighborhood:
+                w = self._index[destination]
+                forward[u].append((w, weight))
+                backward[w].append((u, weight))
+
+        count = min(landmarks, size)
+        self._from = np.empty((count, size))
+        self._to = np.empty((count, size))
+        self._landmarks: List[str] = []
+
+        # the first landmark is the farthest vertex from the start
+        nearest = _distance_row(
+            forward, self._position(start) if start is not None else 0
+        )
+
+        for row in range(count):
+            farther = nearest.copy()
+            farther[[self._index[v] for v in self._landmarks]] = -1
+            landmark = int(np.argmax(farther))
+
+            self._landmarks.append(self._vertices[landmark])
+            self._from[row] = _distance_row(forward, landmark)
+            self._to[row] = _distance_row(backward, landmark)
+            nearest = (
+                self._from[row]
+                if row == 0
+                else np.minimum(nearest, self._from[row])
+            )
+
+    @property
+    def vertices(self) -> List[str]:
+        """Returns the vertices indexed by the arrays of ``bounds``.
+
+        Returns:
+            List[str]: The sorted vertices. It must not be modified.
+        """
+        return self._vertices
+
+    @property
+    def landmarks(self) -> List[str]:
+        """Returns the landmarks, in the order they were chosen.
+
+        Returns:
+            List[str]: The landmarks.
+        """
+        return self._landmarks
+
+    @property
+    def settled(self) -> int:
+        """Returns the vertices settled by the last query.
+
+        Returns:
+            int: The number of vertices settled by A*.
+        """
+        return self._settled
+
+    def memory(self) -> Dict[str, int]:
+        """Returns the memory used by the distances of each landmark.
+
+        Returns:
+            Dict[str, int]: The size in bytes of the distance arrays of
+                each landmark.
+        """
+        return {
+            landmark: self._from[row].nbytes + self._to[row].nbytes
+            for row, landmark in enumerate(self._landmarks)
+        }
+
+    def bounds(self, destination: str) -> np.ndarray:
+        """Returns a lower bound of the distance of every vertex to another.
+
+        Args:
+            destination (str): The vertex the distances are bounded to.
+
+        Raises:
+            ValueError: If the destination is not in the map.
+
+        Returns:
+            np.ndarray: The bound from each vertex of ``vertices``, in
+                order, which is ``inf`` if it can not reach the destination.
+        """
+        target = self._position(destination)
+
+        with np.errstate(invalid="ignore"):
+            # inf - inf gives nan, which fmax skips
+            candidates = np.vstack(
+                [
+                    self._from[:, target, None] - self._from,
+                    self._to - self._to[:, target, None],
+                ]
+            )
+
+        return np.fmax(np.fmax.reduce(candidates, axis=0), 0)
+
+    def lower_bound(self, origin: str, destination: str) -> float:
+        """Returns a lower bound of the distance between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            float: The bound, ``inf`` if the destination is unreachable.
+        """
+        u, t = self._position(origin), self._position(destination)
+
+        with np.errstate(invalid="ignore"):
+            forward = np.fmax.reduce(self._from[:, t] - self._from[:, u])
+            backward = np.fmax.reduce(self._to[:, u] - self._to[:, t])
+
+        return float(np.fmax(np.fmax(forward, backward), 0))
+
+    def heuristic(self, destination: str) -> Callable[[str], float]:
+        """Returns the A* heuristic towards a destination.
+
+        Args:
+            destination (str): The destination of the search.
+
+        Raises:
+            ValueError: If the destination is not in the map.
+
+        Returns:
+            Callable[[str], float]: The lower bound of the distance from a
+                vertex to the destination.
+        """
+        bounds = self.bounds(destination).tolist()
+        index = self._index
+
+        return lambda vertex: bounds[index[vertex]]
+
+    def distance(self, origin: str, destination: str) -> float:
+        """Returns the shortest distance between two vertices, with A*.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            float: The distance, or ``math.inf`` if it is unreachable.
+        """
+        distance, _, self._settled = a_star(
+            self._graph, origin, destination, self.heuristic(destination)
+        )
+
+        return distance
+
+    def path(self, origin: str, destination: str) -> List[str]:
+        """Returns the shortest path between two vertices, with A*.
+
+        Args:
+            origin (str): The origin vertex.
+            destination (str): The destination vertex.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            List[str]: The vertices from the origin to the destination, or
+                an empty list if it is unreachable.
+        """
+        _, path, self._settled = a_star(
+            self._graph, origin, destination, self.heuristic(destination)
+        )
+
+        return path
+
+    def nearest(
+        self, origin: str, vertices: Iterable[str]
+    ) -> Tuple[str | None, float]:
+        """Returns the closest of several vertices to an origin.
+
+        The candidates are searched in the order of their lower bounds, and
+        the search stops at the first candidate whose bound is not below
+        the closest distance found, since neither it nor the ones after it
+        can be closer. Each search is also cut at that distance.
+
+        Args:
+            origin (str): The origin vertex.
+            vertices (Iterable[str]): The candidates. Ties are broken by
+                their bounds, then their order.
+
+        Raises:
+            ValueError: If a vertex is not in the map.
+
+        Returns:
+            Tuple[str | None, float]: The closest reachable candidate and
+                its distance, or ``(None, math.inf)`` if none is reachable.
+        """
+        candidates = list(vertices)
+        lower = [self.lower_bound(origin, vertex) for vertex in candidates]
+        best, nearest = math.inf, None
+        settled = 0
+
+        for bound, vertex in sorted(
+            zip(lower, candidates), key=lambda pair: pair[0]
+        ):
+            if bound >= best:
+                break
+
+            distance, _, count = a_star(
+                self._graph,
+                origin,
+                vertex,
+                self.heuristic(vertex),
+                best,
+            )
+            settled += count
+
+            if distance < best:
+                best, nearest = distance, vertex
+
+        self._settled = settled
+
+        return nearest, best
+
+    def _position(self, vertex: str) -> int:
+        try:
+            return self._index[vertex]
+        except KeyError:
+            raise ValueError(
+                f"'{vertex}' is not a vertex in the graph"
+            ) from None
+
+    def __len__(self) -> int:
+        return len(self._landmarks)
+
+    def __repr__(self):
+        return f"LandmarkIndex({len(self._vertices)}, {len(self._landmarks)})"
@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, List
+
+
+class VertexRegistry:
+    """Interns vertex names to dense integer ids.
+
+    Ids are assigned in the sorted order of the names, so comparing two ids
+    gives the same result as comparing their names, and the registry of a
+    map does not depend on the order its vertices were listed in. The same
+    int object is handed out for each id, so interned structures share it
+    instead of holding copies.
+
+    Attributes:
+        _names (List[str]): The name of each id.
+        _ids (Dict[str, int]): The id of each name.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        """Interns the given names.
+
+        Args:
+            names (Iterable[str]): The vertex names. Repeated names are
+                interned once.
+        """
+        self._names: List[str] = sorted(set(names))
+        self._ids: Dict[str, int] = {
+            name: index for index, name in enumerate(self._names)
+        }
+
+    @property
+    def names(self) -> List[str]:
+        """Returns the name of each id.
+
+        Returns:
+            List[str]: The names indexed by id. It must not be modified.
+        """
+        return self._names
+
+    def id(self, name: str) -> int:
+        """Returns the id of a name.
+
+        Args:
+            name (str): The vertex name.
+
+        Raises:
+            ValueError: If the name was not interned.
+
+        Returns:
+            int: The id of the vertex.
+        """
+        try:
+            return self._ids[name]
+        except KeyError:
+            raise ValueError(
+                f"'{name}' is not a vertex in the graph"
+            ) from None
+
+    def name(self, id: int) -> str:
+        """Returns the name of an id.
+
+        Args:
+            id (int): The vertex id.
+
+        Returns:
+            str: The vertex name.
+        """
+        return self._names[id]
+
+    def ids(self, names: Iterable[str]) -> List[int]:
+        """Returns the ids of several names.
+
+        Args:
+            names (Iterable[str]): The vertex names.
+
+        Returns:
+            List[int]: The id of each name, in order.
+        """
+        return [self.id(name) for name in names]
+
+    def resolve(self, vertex: int | str | None) -> str | None:
+        """Returns the name of a vertex, leaving names and None unchanged.
+
+        Used at the output boundary, where values may come from interned or
+        plain maps.
+
+        Args:
+            vertex (int | str | None): The vertex id or name.
+
+        Returns:
+            str | None: The vertex name.
+        """
+        if isinstance(vertex, int):
+            return self._names[vertex]
+
+        return vertex
+
+    def intern(self, vertex: int | str | None) -> int | None:
+        """Returns the id of a vertex, leaving ids and None unchanged.
+
+        Used at the input boundary, where vertices may be given by name or
+        by id.
+
+        Args:
+            vertex (int | str | None): The vertex name or id.
+
+        Raises:
+            ValueError: If the name was not interned.
+
+        Returns:
+            int | None: The vertex id.
+        """
+        if isinstance(vertex, str):
+            return self.id(vertex)
+
+        return vertex
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self):
+        return f"VertexRegistry({len(self._names)})"
@@ -1,7 +1,8 @@
+import heapq
 import math
 from graphs.graph import SimpleGraph
-from typing import Dict, List, Set, Tuple, Union
-from graphs.functions import predecessors_to_list
+from typing import Callable, Dict, List, Set, Tuple, Union
+from graphs.functions import predecessors_to_list, predecessors_to_path
 
 def dijkstra(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str, Union[float, List[str]]]]:
     """Computes the shortest paths from a given origin vertex using Dijkstra's algorithm.
@@ -19,6 +20,25 @@ def dijkstra(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str, Union[float
             - "distances": A dictionary where keys are vertices and values are shortest distances.
             - "paths": A dictionary mapping each vertex to the shortest path from the origin.
     """
+    distances, predecessors = dijkstra_tree(graph, origin)
+
+    return predecessors_to_list(predecessors, distances)
+
+
+def dijkstra_tree(graph: SimpleGraph, origin: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """Computes the shortest path tree from a given origin vertex using Dijkstra's algorithm.
+
+    Unlike ``dijkstra``, the paths are not expanded, so the tree takes linear
+    memory and each path can be rebuilt on demand with ``predecessors_to_path``.
+
+    Args:
+        graph (SimpleGraph): The graph on which the algorithm is applied.
+        origin (str): The starting vertex for path calculations.
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, str]]: The shortest distance to
+            each vertex and the predecessor of each vertex in the tree.
+    """
     distances: Dict[str, float] = dict()
     predecessors: Dict[str, str] = dict()
     visited_vertices: Set[str] = set()
@@ -46,7 +66,7 @@ def dijkstra(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str, Union[float
                     predecessors[neighbor] = predecessor
                     frontier_queue.append((new_neighbor_distance, neighbor))
 
-    return predecessors_to_list(predecessors, distances)
+    return distances, predecessors
 
 
 def breadth_first_search(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str, Union[float, List[str]]]]:
@@ -63,6 +83,22 @@ def breadth_first_search(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str,
             - "distances": A dictionary where keys are vertices and values are shortest distances in terms of hops.
             - "paths": A dictionary mapping each vertex to the shortest path from the origin.
     """
+    distances, predecessors = breadth_first_tree(graph, origin)
+
+    return predecessors_to_list(predecessors, distances)
+
+
+def breadth_first_tree(graph: SimpleGraph, origin: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """Computes the breadth-first search tree from the given origin vertex.
+
+    Args:
+        graph (SimpleGraph): The graph on which the algorithm is applied.
+        origin (str): The starting vertex for path calculations.
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, str]]: The number of hops to each
+            vertex and the predecessor of each vertex in the tree.
+    """
     distances: Dict[str, float] = dict()
     predecessors: Dict[str, str] = dict()
     frontier_queue: List[Tuple[float, str]] = []
@@ -84,4 +120,222 @@ def breadth_first_search(graph: SimpleGraph, origin: str) -> Dict[str, Dict[str,
                 predecessors[neighbor] = predecessor
                 frontier_queue.append((neighbor_distance, neighbor))
 
-    return predecessors_to_list(predecessors, distances)
+    return distances, predecessors
+
+
+def dijkstra_distances(graph: SimpleGraph, origin: str) -> Dict[str, float]:
+    """Computes the shortest distances from an origin with a binary heap.
+
+    Only the distances are computed, which makes this function suited for
+    building distance tables over large maps. Unreachable vertices are not
+    included in the result.
+
+    Args:
+        graph (SimpleGraph): The graph on which the algorithm is applied.
+        origin (str): The starting vertex for distance calculations.
+
+    Returns:
+        Dict[str, float]: The shortest distance to each reachable vertex.
+    """
+    edges_list = graph.edges_list
+    distances: Dict[str, float] = {origin: 0}
+    frontier_queue: List[Tuple[float, str]] = [(0, origin)]
+
+    while frontier_queue:
+        current_distance, vertex = heapq.heappop(frontier_queue)
+
+        if current_distance > distances[vertex]:
+            continue
+
+        for neighbor, weight in edges_list.get(vertex, ()):
+            new_neighbor_distance = current_distance + weight
+
+            if new_neighbor_distance < distances.get(neighbor, math.inf):
+                distances[neighbor] = new_neighbor_distance
+                heapq.heappush(frontier_queue, (new_neighbor_distance, neighbor))
+
+    return distances
+
+
+def a_star(
+    graph: SimpleGraph,
+    origin: str,
+    destination: str,
+    heuristic: Callable[[str], float] | None = None,
+    max_distance: float = math.inf,
+) -> Tuple[float, List[str], int]:
+    """Computes the shortest path between two vertices with A*.
+
+    The search settles the vertices by their distance from the origin plus
+    the heuristic estimate of their distance to the destination, and stops
+    when the destination is settled. Without a heuristic it is Dijkstra's
+    algorithm stopped at the destination.
+
+    Args:
+        graph (SimpleGraph): The graph on which the algorithm is applied.
+        origin (str): The starting vertex of the path.
+        destination (str): The last vertex of the path.
+        heuristic (Callable[[str], float], optional): A lower bound of the
+            distance from each vertex to the destination, which must also
+            be consistent, as the bounds of ``LandmarkIndex``.
+        max_distance (float): The search gives up on paths at least this
+            long, as if the destination was unreachable.
+
+    Returns:
+        Tuple[float, List[str], int]: The distance, the path from the origin
+            to the destination, empty if it is unreachable, and the number
+            of vertices settled.
+    """
+    edges_list = graph.edges_list
+    distances: Dict[str, float] = {origin: 0}
+    predecessors: Dict[str, str] = {}
+    settled: Set[str] = set()
+    estimate = heuristic(origin) if heuristic is not None else 0
+    frontier_queue: List[Tuple[float, float, str]] = [(estimate, 0, origin)]
+
+    while frontier_queue:
+        estimate, current_distance, vertex = heapq.heappop(frontier_queue)
+
+        if estimate >= max_distance:
+            break
+
+        if vertex in settled:
+            continue
+
+        settled.add(vertex)
+
+        if vertex == destination:
+            return (
+                current_distance,
+                predecessors_to_path(predecessors, destination),
+                len(settled),
+            )
+
+        for neighbor, weight in edges_list.get(vertex, ()):
+            new_neighbor_distance = current_distance + weight
+
+            if new_neighbor_distance < distances.get(neighbor, math.inf):
+                estimate = heuristic(neighbor) if heuristic is not None else 0
+
+                if estimate == math.inf:
+                    # the destination can not be reached from the neighbor
+                    continue
+
+                distances[neighbor] = new_neighbor_distance
+                predecessors[neighbor] = vertex
+                heapq.heappush(
+                    frontier_queue,
+                    (
+                        new_neighbor_distance + estimate,
+                        new_neighbor_distance,
+                        neighbor,
+                    ),
+                )
+
+    return math.inf, [], len(settled)
+
+
+def bidirectional_dijkstra(
+    graph: SimpleGraph,
+    origin: str,
+    destination: str,
+    symmetric: bool = False,
+) -> Tuple[float, List[str], int]:
+    """Computes the shortest path between two vertices from both ends.
+
+    One Dijkstra search grows from the origin and another one grows
+    backwards from the destination, always advancing the one with the
+    closest frontier, until the sum of both frontiers is not shorter than
+    the best path through a vertex reached by both. Each search covers
+    about half the radius of a single search, so far fewer vertices are
+    settled on large maps.
+
+    Args:
+        graph (SimpleGraph): The graph on which the algorithm is applied.
+        origin (str): The starting vertex of the path.
+        destination (str): The last vertex of the path.
+        symmetric (bool): Whether every edge has a reverse edge of the same
+            weight, so the backward search follows the edges of each vertex
+            instead of looking up its incoming edges.
+
+    Returns:
+        Tuple[float, List[str], int]: The distance, the path from the origin
+            to the destination, empty if it is unreachable, and the number
+            of vertices settled by both searches.
+    """
+    if origin == destination:
+        return 0, [origin], 1
+
+    edges_list = graph.edges_list
+
+    def incoming(vertex: str) -> List[Tuple[str, float]]:
+        if symmetric:
+            return edges_list.get(vertex, ())
+
+        return [
+            (
+                source,
+                min(w for target, w in edges_list[source] if target == vertex),
+            )
+            for source in graph.in_neighborhood(vertex)
+        ]
+
+    # the distances, predecessors, queue and settled vertices of each side,
+    # and the edges each side follows
+    sides = [
+        (
+            {origin: 0},
+            {},
+            [(0, origin)],
+            set(),
+            lambda vertex: edges_list.get(vertex, ()),
+        ),
+        ({destination: 0}, {}, [(0, destination)], set(), incoming),
+    ]
+    best_distance = math.inf
+    meeting = None
+
+    while sides[0][2] and sides[1][2]:
+        if sides[0][2][0][0] + sides[1][2][0][0] >= best_distance:
+            break
+
+        side = 0 if sides[0][2][0][0] <= sides[1][2][0][0] else 1
+        distances, predecessors, frontier_queue, settled, edges = sides[side]
+        other_distances = sides[1 - side][0]
+        current_distance, vertex = heapq.heappop(frontier_queue)
+
+        if vertex in settled:
+            continue
+
+        settled.add(vertex)
+
+        for neighbor, weight in edges(vertex):
+            new_neighbor_distance = current_distance + weight
+
+            if new_neighbor_distance < distances.get(neighbor, math.inf):
+                distances[neighbor] = new_neighbor_distance
+                predecessors[neighbor] = vertex
+                heapq.heappush(
+                    frontier_queue, (new_neighbor_distance, neighbor)
+                )
+
+            if neighbor in other_distances:
+                total = new_neighbor_distance + other_distances[neighbor]
+
+                if total < best_distance:
+                    best_distance, meeting = total, neighbor
+
+    count = len(sides[0][3]) + len(sides[1][3])
+
+    if meeting is None:
+        return math.inf, [], count
+
+    path = predecessors_to_path(sides[0][1], meeting)
+    successors = sides[1][1]
+    vertex = meeting
+
+    while vertex in successors:
+        vertex = successors[vertex]
+        path.append(vertex)
+
+    return best_distance, path, count
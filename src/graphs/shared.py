@@ -0,0 +1,433 @@
+import sys
+import weakref
+from collections.abc import Mapping
+from itertools import groupby
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+from graphs.graph import SimpleGraph
+from graphs.registry import VertexRegistry
+
+
+class SharedGraphHandle(NamedTuple):
+    """Identifies a map published in shared memory.
+
+    The handle is all a worker needs to attach to the map, so it is what
+    tasks should carry instead of the map itself.
+
+    Attributes:
+        name (str): The name of the shared memory block.
+        vertices (int): The number of vertices.
+        edges (int): The number of edges.
+        names_size (int): The size of the encoded vertex names, in bytes.
+        dtype (str): The type of the edge weights.
+        interned (bool): Whether the vertices are the int ids of an interned
+            map, rather than their names.
+    """
+
+    name: str
+    vertices: int
+    edges: int
+    names_size: int
+    dtype: str
+    interned: bool = False
+
+
+def _layout(handle: SharedGraphHandle) -> List[Tuple[str, str, int]]:
+    """Lists the arrays of the block as ``(name, dtype, length)`` tuples.
+
+    The 8 byte arrays come first, so every array is aligned.
+    """
+    return [
+        ("offsets", "int64", handle.vertices + 1),
+        ("in_offsets", "int64", handle.vertices + 1),
+        ("name_offsets", "int64", handle.vertices + 1),
+        ("weights", handle.dtype, handle.edges),
+        ("targets", "int32", handle.edges),
+        ("sources", "int32", handle.edges),
+        ("names", "uint8", handle.names_size),
+        ("present", "uint8", handle.vertices if handle.interned else 0),
+    ]
+
+
+def _release(memory: shared_memory.SharedMemory, owner: bool):
+    try:
+        memory.close()
+    except BufferError:
+        # arrays still referenced elsewhere keep the mapping alive
+        pass
+
+    if owner:
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _Adjacency(Mapping):
+    """Read-only adjacency list view over the CSR arrays of a map."""
+
+    def __init__(self, graph: "SharedGraph"):
+        self._graph = graph
+
+    def __getitem__(self, vertex: str) -> List[Tuple[str, float]]:
+        return self._graph._out_edges(self._graph._index[vertex])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph._index)
+
+    def __len__(self) -> int:
+        return len(self._graph._index)
+
+    def __contains__(self, vertex: object) -> bool:
+        return vertex in self._graph._index
+
+
+class SharedGraph(SimpleGraph):
+    """Read-only map stored in shared memory as compressed sparse rows.
+
+    The outgoing edges of the vertex ``i`` are ``targets[offsets[i]:
+    offsets[i + 1]]``, with their ``weights``, listed in the order of the
+    published map, and the incoming edges are stored the same way in
+    ``sources``. Vertex names are interned to their index in sorted order
+    and stored encoded as UTF-8. Interned maps keep their ids as index and
+    the names of their registry are stored instead, with a flag for each id
+    still in the map, so the shared map has the same vertices and registry.
+
+    A map is published once by the parent process, which owns the block and
+    frees it. Worker processes attach to it from its handle without copying
+    the arrays. Pickling a shared graph only sends its handle, so it can be
+    passed directly as a task argument to a process pool. Workers must be
+    started by ``multiprocessing`` from the publishing process, which then
+    cleans up the block even if the parent dies.
+
+    Example:
+        >>> with SharedGraph.publish(map) as shared:
+        ...     with Pool(4) as pool:
+        ...         pool.map(task, [(shared, vertex) for vertex in starts])
+    """
+
+    def __init__(
+        self,
+        memory: shared_memory.SharedMemory,
+        handle: SharedGraphHandle,
+        owner: bool,
+    ):
+        """Wraps a shared memory block holding a published map.
+
+        Use ``publish`` or ``attach`` instead.
+
+        Args:
+            memory (shared_memory.SharedMemory): The block.
+            handle (SharedGraphHandle): The handle of the block.
+            owner (bool): Whether this process frees the block on close.
+        """
+        self._memory = memory
+        self._handle = handle
+        self._owner = owner
+        self._arrays: Dict[str, np.ndarray] = {}
+        offset = 0
+
+        for name, dtype, length in _layout(handle):
+            array = np.ndarray(
+                (length,), dtype=dtype, buffer=memory.buf, offset=offset
+            )
+            array.flags.writeable = False
+            self._arrays[name] = array
+            offset += array.nbytes
+
+        names = self._arrays["names"].tobytes().decode("utf-8")
+        bounds = self._arrays["name_offsets"].tolist()
+        names = [names[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        if handle.interned:
+            # ids are their own index
+            self._registry = VertexRegistry(names)
+            self._labels = range(handle.vertices)
+            self._index = {
+                id: id
+                for id in np.flatnonzero(self._arrays["present"]).tolist()
+            }
+        else:
+            self._registry = None
+            self._labels = names
+            self._index = {name: index for index, name in enumerate(names)}
+
+        self._vertices = set(self._index)
+        self._finalizer = weakref.finalize(self, _release, memory, owner)
+
+    @classmethod
+    def publish(cls, graph: SimpleGraph) -> "SharedGraph":
+        """Copies a map into a new shared memory block.
+
+        Args:
+            graph (SimpleGraph): The map to publish. Later changes to it are
+                not reflected in the shared copy.
+
+        Returns:
+            SharedGraph: The shared copy, which owns the block.
+        """
+        registry = graph.registry
+        present = np.zeros(0, dtype=np.uint8)
+
+        if registry is not None:
+            # ids are their own index
+            names = registry.names
+            labels = index = range(len(names))
+            present = np.zeros(len(names), dtype=np.uint8)
+            present[list(graph.vertices)] = 1
+        else:
+            names = sorted(graph.vertices)
+            labels = names
+            index = {name: i for i, name in enumerate(names)}
+
+        edges_list = graph.edges_list
+        targets: List[int] = []
+        weights: List[float] = []
+        offsets = [0]
+
+        for label in labels:
+            for destination, weight in edges_list.get(label, ()):
+                targets.append(index[destination])
+                weights.append(weight)
+
+            offsets.append(len(targets))
+
+        encoded = [name.encode("utf-8") for name in names]
+        name_offsets = np.cumsum([0] + [len(name) for name in encoded])
+        dtype = (
+            "int64"
+            if all(isinstance(weight, int) for weight in weights)
+            else "float64"
+        )
+        sizes = SharedGraphHandle(
+            "",
+            len(names),
+            len(targets),
+            int(name_offsets[-1]),
+            dtype,
+            registry is not None,
+        )
+        size = sum(
+            np.dtype(dtype).itemsize * length
+            for _, dtype, length in _layout(sizes)
+        )
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        handle = sizes._replace(name=memory.name)
+
+        # incoming edges, sorted by destination and listed by origin
+        targets_array = np.asarray(targets, dtype=np.int32)
+        origins = np.repeat(
+            np.arange(len(names), dtype=np.int32), np.diff(offsets)
+        )
+        order = np.argsort(targets_array, kind="stable")
+        in_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(targets_array, minlength=len(names)),
+            out=in_offsets[1:],
+        )
+
+        columns = {
+            "offsets": offsets,
+            "in_offsets": in_offsets,
+            "name_offsets": name_offsets,
+            "weights": weights,
+            "targets": targets_array,
+            "sources": origins[order],
+            "names": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "present": present,
+        }
+        offset = 0
+
+        for name, dtype, length in _layout(handle):
+            array = np.ndarray(
+                (length,), dtype=dtype, buffer=memory.buf, offset=offset
+            )
+            array[:] = columns[name]
+            offset += array.nbytes
+            del array
+
+        return cls(memory, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedGraphHandle) -> "SharedGraph":
+        """Attaches to a map published by another process.
+
+        Args:
+            handle (SharedGraphHandle): The handle of the published map.
+
+        Returns:
+            SharedGraph: The shared map, which does not own the block.
+        """
+        if sys.version_info >= (3, 13):
+            memory = shared_memory.SharedMemory(handle.name, track=False)
+        else:
+            memory = shared_memory.SharedMemory(handle.name)
+
+        return cls(memory, handle, owner=False)
+
+    @property
+    def handle(self) -> SharedGraphHandle:
+        """Returns the handle workers use to attach to the map.
+
+        Returns:
+            SharedGraphHandle: The handle.
+        """
+        return self._handle
+
+    @property
+    def registry(self) -> VertexRegistry | None:
+        """Returns the names of the vertices if they are interned.
+
+        Returns:
+            VertexRegistry | None: The registry of the published map, read
+                back from the block, or None if the vertices are their names.
+        """
+        return self._registry
+
+    @property
+    def closed(self) -> bool:
+        """Returns whether the block was released by this process.
+
+        Returns:
+            bool: True after ``close``.
+        """
+        return not self._finalizer.alive
+
+    @property
+    def vertices(self) -> Set[str]:
+        """Returns the set of graph vertices.
+
+        Returns:
+            Set[str]: The set of vertices. It must not be modified.
+        """
+        return self._vertices
+
+    @property
+    def edges_list(self) -> Mapping:
+        """Returns the adjacency list of the graph.
+
+        Returns:
+            Mapping: A read-only mapping from each vertex to its edges, built
+                from the shared arrays on each lookup.
+        """
+        return _Adjacency(self)
+
+    def neighborhood(self, vertex: str) -> Set[str]:
+        """Gets the neighboring vertices of a given vertex.
+
+        Args:
+            vertex (str): The vertex whose neighbors are to be retrieved.
+
+        Returns:
+            Set[str]: The adjacent vertices.
+        """
+        return {name for name, _ in self._out_edges(self._index[vertex])}
+
+    def in_neighborhood(self, vertex: str) -> Set[str]:
+        """Gets the vertices with an edge to a given vertex.
+
+        Args:
+            vertex (str): The vertex whose in-neighbors are to be retrieved.
+
+        Returns:
+            Set[str]: The vertices with an edge to the vertex.
+        """
+        if vertex not in self._index:
+            return set()
+
+        index = self._index[vertex]
+        offsets = self._arrays["in_offsets"]
+        sources = self._arrays["sources"][offsets[index] : offsets[index + 1]]
+
+        return {self._labels[source] for source in sources.tolist()}
+
+    def edges(
+        self, origin: str, dest: str | None = None
+    ) -> List[Tuple[str, float]]:
+        """Retrieves edges from a given origin vertex.
+
+        Args:
+            origin (str): The origin vertex.
+            dest (str, optional): If specified, returns edges between the
+                origin and destination vertex. Otherwise, returns all edges.
+
+        Returns:
+            List[Tuple[str, float]]: A list of edges with their weights.
+        """
+        _edges = self._out_edges(self._index[origin])
+        _edges.sort()
+
+        return [
+            item
+            for key, group in groupby(_edges, lambda edge: edge[0])
+            if key == dest or dest is None
+            for item in group
+        ]
+
+    def weight(self, origin: str, dest: str) -> float:
+        """Gets the weight of an edge between two vertices.
+
+        Args:
+            origin (str): The origin vertex.
+            dest (str): The destination vertex.
+
+        Returns:
+            float: The weight of the edge.
+        """
+        return self.edges(origin, dest)[0][1]
+
+    def add_vertex(self, vertices: List[str] | str) -> None:
+        self._read_only()
+
+    def add_edge(self, origin: str, destination: str, distance: float) -> None:
+        self._read_only()
+
+    def remove_vertex(self, vertex: str) -> None:
+        self._read_only()
+
+    def remove_edge(self, origin: str, destination: str) -> None:
+        self._read_only()
+
+    def set_weight(
+        self, origin: str, destination: str, distance: float
+    ) -> None:
+        self._read_only()
+
+    def close(self) -> None:
+        """Releases the block in this process, freeing it if it is the owner.
+
+        The map can not be used afterwards.
+        """
+        self._arrays.clear()
+        self._finalizer()
+
+    def _out_edges(self, index: int) -> List[Tuple[str, float]]:
+        offsets = self._arrays["offsets"]
+        start, end = offsets[index], offsets[index + 1]
+        labels = self._labels
+
+        return [
+            (labels[target], weight)
+            for target, weight in zip(
+                self._arrays["targets"][start:end].tolist(),
+                self._arrays["weights"][start:end].tolist(),
+            )
+        ]
+
+    def _read_only(self):
+        raise RuntimeError("A shared graph can not be modified.")
+
+    def __enter__(self) -> "SharedGraph":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return (SharedGraph.attach, (self._handle,))
+
+    def __repr__(self) -> str:
+        return f"SharedGraph({self._handle.name}, {self._handle.vertices}, {self._handle.edges})"
@@ -2,10 +2,18 @@ from logs.logger import Logger
 from logs.timer import Timer
 from logs.path import Path
 from logs.water_counter import WaterCount
+from logs.delta import StepDelta, DeltaRecorder
+from logs.memory import MemoryReport
+from logs.history import History, HistoryState
 
 __all__ = [
     "Logger",
     "Timer",
     "Path",
     "WaterCount",
+    "StepDelta",
+    "DeltaRecorder",
+    "MemoryReport",
+    "History",
+    "HistoryState",
 ]
@@ -0,0 +1,153 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+from events import Event, EventListener
+from graphs import VertexRegistry
+
+
+class StepDelta(NamedTuple):
+    """Changes of the simulation state during one update.
+
+    Attributes:
+        iteration (int): The number of updates run after this one.
+        ignited (Tuple[str, ...]): The vertices that caught fire.
+        put_out (Tuple[str, ...]): The vertices whose fire was put out.
+        moves (Tuple[Tuple[int, str], ...]): The moves of the trucks, as
+            ``(truck, vertex)`` pairs in the order they happened.
+        water (float): The water spent putting out fires, in liters.
+    """
+
+    iteration: int
+    ignited: Tuple[str, ...]
+    put_out: Tuple[str, ...]
+    moves: Tuple[Tuple[int, str], ...]
+    water: float
+
+    @property
+    def empty(self) -> bool:
+        """Returns whether nothing changed during the update.
+
+        Returns:
+            bool: True if no vertex ignited or was put out and no truck
+                moved.
+        """
+        return not (self.ignited or self.put_out or self.moves)
+
+    def merge(self, other: "StepDelta") -> "StepDelta":
+        """Combines this delta with the one of a later update.
+
+        Args:
+            other (StepDelta): The later delta.
+
+        Returns:
+            StepDelta: The changes of both updates.
+        """
+        return StepDelta(
+            other.iteration,
+            self.ignited + other.ignited,
+            self.put_out + other.put_out,
+            self.moves + other.moves,
+            self.water + other.water,
+        )
+
+
+class DeltaRecorder(EventListener):
+    """Collects the changes of the current update from the events.
+
+    Only the changes since the last ``take`` are kept, so the memory used
+    does not grow with the length of the simulation. The vertices of an
+    interned map are named back in the deltas. A truck travelling over
+    several vertices at once counts as a single move to the last one,
+    unless the travel is split into updates by ``take_ticks``.
+    """
+
+    def __init__(
+        self,
+        water_per_vertex: Dict[str, float],
+        registry: VertexRegistry | None = None,
+    ):
+        self._water_per_vertex = water_per_vertex
+        self._registry = registry
+        self._ignited: List[str] = []
+        self._put_out: List[str] = []
+        self._moves: List[Tuple[int, str]] = []
+        self._travels: List[Tuple[int, Tuple[str, ...]]] = []
+        self._water = 0
+
+    def take(self, iteration: int) -> StepDelta:
+        """Returns the changes collected so far and starts over.
+
+        Args:
+            iteration (int): The number of updates run so far.
+
+        Returns:
+            StepDelta: The changes since the previous call.
+        """
+        self._moves.extend(
+            (truck, vertices[-1]) for truck, vertices in self._travels
+        )
+        self._travels.clear()
+
+        if self._registry is None:
+            delta = StepDelta(
+                iteration,
+                tuple(self._ignited),
+                tuple(self._put_out),
+                tuple(self._moves),
+                self._water,
+            )
+        else:
+            name = self._registry.resolve
+            delta = StepDelta(
+                iteration,
+                tuple(name(vertex) for vertex in self._ignited),
+                tuple(name(vertex) for vertex in self._put_out),
+                tuple((truck, name(vertex)) for truck, vertex in self._moves),
+                self._water,
+            )
+
+        self._ignited.clear()
+        self._put_out.clear()
+        self._moves.clear()
+        self._water = 0
+
+        return delta
+
+    def take_ticks(self, iteration: int, ticks: int) -> List[StepDelta]:
+        """Returns the changes of several updates skipped at once.
+
+        The ``k``-th delta holds the ``k``-th vertex of each travel, and the
+        first one holds every other change.
+
+        Args:
+            iteration (int): The number of updates run before them.
+            ticks (int): The number of updates skipped.
+
+        Returns:
+            List[StepDelta]: One delta per update, in order.
+        """
+        travels, self._travels = self._travels, []
+        deltas = []
+
+        for tick in range(ticks):
+            self._moves.extend(
+                (truck, vertices[tick])
+                for truck, vertices in travels
+                if tick < len(vertices)
+            )
+            deltas.append(self.take(iteration + tick + 1))
+
+        return deltas
+
+    def handle(self, event: Event):
+        if event.type == Event.ON_GET_FIRE:
+            self._ignited.append(event.target)
+
+        elif event.type == Event.ON_PUT_OUT:
+            self._put_out.append(event.target)
+            self._water += self._water_per_vertex[event.target]
+
+        elif event.type == Event.ON_MOVE:
+            self._moves.append((event.sender_id, event.target))
+
+        elif event.type == Event.ON_TRAVEL:
+            self._travels.append((event.sender_id, event.target))
@@ -0,0 +1,455 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from logs.delta import StepDelta
+
+
+class HistoryState(NamedTuple):
+    """State of a simulation after a given update.
+
+    Attributes:
+        iteration (int): The number of updates run.
+        on_fire (Tuple[str, ...]): The vertices on fire, sorted.
+        trucks (Dict[int, str]): The vertex of each truck, by id.
+        water (float): The water spent so far, in liters.
+    """
+
+    iteration: int
+    on_fire: Tuple[str, ...]
+    trucks: Dict[int, str]
+    water: float
+
+    def to_dict(self) -> Dict[str, object]:
+        """Returns the state as JSON serializable data.
+
+        Returns:
+            Dict[str, object]: The fields of the state.
+        """
+        return {
+            "iteration": self.iteration,
+            "on_fire": list(self.on_fire),
+            "trucks": {str(truck): v for truck, v in self.trucks.items()},
+            "water": self.water,
+        }
+
+
+class _Segment:
+    """A keyframe and the deltas of the updates after it, up to the next.
+
+    The vertices on fire are counted, since a vertex can catch fire again
+    before its first fire is put out.
+    """
+
+    __slots__ = ("deltas", "iteration", "on_fire", "ticks", "trucks", "water")
+
+    def __init__(
+        self,
+        iteration: int,
+        on_fire: Dict[str, int],
+        trucks: Dict[int, str],
+        water: float,
+    ):
+        self.iteration = iteration
+        self.on_fire = on_fire
+        self.trucks = trucks
+        self.water = water
+        self.deltas: List[StepDelta] = []
+        self.ticks: List[int] = []
+
+
+class History:
+    """Records the state of a simulation at every update, to query it later.
+
+    The history keeps a keyframe, the whole state, every ``interval``
+    updates, and the changes of each update in between as a ``StepDelta``.
+    The state after any update is rebuilt from the last keyframe before it,
+    found by binary search, by replaying the deltas since, so a query costs
+    ``O(log T)`` plus the changes of at most ``interval`` updates.
+
+    The memory used grows with the changes of the simulation, plus one
+    state per keyframe, so a longer interval trades slower queries for less
+    memory. With a ``window``, the segments older than the last ``window``
+    updates are dropped too, bounding the memory of long simulations.
+
+    Example:
+        >>> history = History(interval=25)
+        >>> app = App(map, "A1", ["B2"], ["C3"], water, history=history)
+        >>> app.run()
+        >>> history.state(40).trucks
+        {0: 'B7'}
+        >>> history.save(30, 60)  # writes output/history.json
+
+    Attributes:
+        _segments (List[_Segment]): The keyframes, in order, each with the
+            deltas recorded after it.
+        _keyframes (List[int]): The iteration of each keyframe, searched by
+            the queries.
+    """
+
+    def __init__(
+        self,
+        interval: int = 20,
+        window: int | None = None,
+        output_file: str | None = "history.json",
+    ):
+        """Initializes an empty history.
+
+        Args:
+            interval (int): The updates between two keyframes.
+            window (int, optional): The number of last updates kept.
+                Defaults to keeping every update.
+            output_file (str, optional): The file written by ``save`` in the
+                output directory, next to the simulation log.
+
+        Raises:
+            ValueError: If the interval or the window is not positive.
+        """
+        if interval <= 0:
+            raise ValueError(
+                f"The interval must be positive but is '{interval}'."
+            )
+
+        if window is not None and window <= 0:
+            raise ValueError(f"The window must be positive but is '{window}'.")
+
+        self._interval = interval
+        self._window = window
+        self._output_file = output_file
+        self._segments: List[_Segment] = []
+        self._keyframes: List[int] = []
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    @property
+    def first(self) -> int | None:
+        """Returns the first update whose state can be queried.
+
+        Returns:
+            int | None: The iteration of the oldest keyframe kept, or None if
+                nothing was recorded.
+        """
+        return self._keyframes[0] if self._keyframes else None
+
+    @property
+    def last(self) -> int | None:
+        """Returns the last update recorded.
+
+        Returns:
+            int | None: The iteration of the last delta or keyframe, or None
+                if nothing was recorded.
+        """
+        if not self._segments:
+            return None
+
+        segment = self._segments[-1]
+
+        return segment.ticks[-1] if segment.ticks else segment.iteration
+
+    @property
+    def keyframes(self) -> int:
+        return len(self._keyframes)
+
+    def due(self, iteration: int) -> bool:
+        """Tells whether a keyframe is due at an iteration.
+
+        Args:
+            iteration (int): The number of updates run.
+
+        Returns:
+            bool: True if ``interval`` updates were run since the last
+                keyframe.
+        """
+        return (
+            not self._keyframes
+            or iteration - self._keyframes[-1] >= self._interval
+        )
+
+    def keyframe(
+        self,
+        iteration: int,
+        on_fire: Iterable[str],
+        trucks: Dict[int, str],
+        water: float,
+    ):
+        """Records the whole state after an update.
+
+        A keyframe at the iteration of the last one replaces it, for changes
+        made between two updates, like a truck added to the simulation.
+
+        Args:
+            iteration (int): The number of updates run.
+            on_fire (Iterable[str]): The vertices on fire, once per fire.
+            trucks (Dict[int, str]): The vertex of each truck, by id.
+            water (float): The water spent so far.
+
+        Raises:
+            ValueError: If the iteration is before the last one recorded.
+        """
+        last = self.last
+
+        if last is not None and iteration < last:
+            raise ValueError(
+                f"The iteration {iteration} is before the last one recorded, {last}."
+            )
+
+        counts: Dict[str, int] = {}
+
+        for vertex in on_fire:
+            counts[vertex] = counts.get(vertex, 0) + 1
+
+        segment = _Segment(iteration, counts, dict(trucks), water)
+
+        if self._keyframes and self._keyframes[-1] == iteration:
+            self._segments[-1] = segment
+        else:
+            self._segments.append(segment)
+            self._keyframes.append(iteration)
+
+        self._prune()
+
+    def record(self, delta: StepDelta):
+        """Records the changes of an update.
+
+        Args:
+            delta (StepDelta): The changes, with the number of updates run
+                after them.
+
+        Raises:
+            RuntimeError: If no keyframe was recorded yet.
+            ValueError: If the update is before the last one recorded.
+        """
+        if not self._segments:
+            raise RuntimeError(
+                "You must record a keyframe before recording changes."
+            )
+
+        last = self.last
+
+        if delta.iteration < last:
+            raise ValueError(
+                f"The iteration {delta.iteration} is before the last one recorded, {last}."
+            )
+
+        segment = self._segments[-1]
+        segment.deltas.append(delta)
+        segment.ticks.append(delta.iteration)
+
+    def state(self, iteration: int) -> HistoryState:
+        """Rebuilds the state after an update.
+
+        Between two recorded updates, the state is the one of the earlier.
+
+        Args:
+            iteration (int): The number of updates run.
+
+        Raises:
+            ValueError: If the update is not in the history.
+
+        Returns:
+            HistoryState: The state after the update.
+        """
+        return next(self.states(iteration, iteration))
+
+    def states(self, first: int, last: int) -> Iterator[HistoryState]:
+        """Rebuilds the state after each update of a range.
+
+        The deltas are replayed once for the whole range, from the last
+        keyframe before its first update, and from each keyframe reached.
+
+        Args:
+            first (int): The first update.
+            last (int): The last update, included.
+
+        Raises:
+            ValueError: If the range is not in the history.
+
+        Yields:
+            HistoryState: The state after each update, in order.
+        """
+        self._check(first, last)
+        index = bisect_right(self._keyframes, first) - 1
+        segment = self._segments[index]
+        on_fire = dict(segment.on_fire)
+        trucks = dict(segment.trucks)
+        water = segment.water
+        position = 0
+
+        for iteration in range(first, last + 1):
+            # a later keyframe replaces the state replayed so far
+            if (
+                index + 1 < len(self._keyframes)
+                and self._keyframes[index + 1] <= iteration
+            ):
+                index += 1
+                segment = self._segments[index]
+                on_fire = dict(segment.on_fire)
+                trucks = dict(segment.trucks)
+                water = segment.water
+                position = 0
+
+            while (
+                position < len(segment.ticks)
+                and segment.ticks[position] <= iteration
+            ):
+                water += _apply(segment.deltas[position], on_fire, trucks)
+                position += 1
+
+            yield HistoryState(
+                iteration, tuple(sorted(on_fire)), dict(trucks), water
+            )
+
+    def deltas(self, first: int, last: int) -> List[StepDelta]:
+        """Returns the changes recorded in a range of updates.
+
+        Args:
+            first (int): The first update.
+            last (int): The last update, included.
+
+        Raises:
+            ValueError: If the range is not in the history.
+
+        Returns:
+            List[StepDelta]: The deltas of the updates, in order.
+        """
+        self._check(first, last)
+        index = bisect_right(self._keyframes, first) - 1
+        start = bisect_left(self._segments[index].ticks, first)
+
+        return list(self._deltas(last, index, start))
+
+    def export(
+        self, first: int | None = None, last: int | None = None
+    ) -> Dict[str, object]:
+        """Returns a range of the history as JSON serializable data.
+
+        Args:
+            first (int, optional): The first update. Defaults to the first
+                one kept.
+            last (int, optional): The last update, included. Defaults to the
+                last one recorded.
+
+        Raises:
+            ValueError: If the range is not in the history.
+
+        Returns:
+            Dict[str, object]: The state after the first update and the
+                deltas of the following ones, enough to replay the range.
+        """
+        first = self.first if first is None else first
+        last = self.last if last is None else last
+
+        return {
+            "first": first,
+            "last": last,
+            "state": self.state(first).to_dict(),
+            "deltas": [
+                {
+                    "iteration": delta.iteration,
+                    "ignited": list(delta.ignited),
+                    "put_out": list(delta.put_out),
+                    "moves": [list(move) for move in delta.moves],
+                    "water": delta.water,
+                }
+                for delta in self.deltas(first + 1, last)
+                if not delta.empty or delta.water
+            ]
+            if first < last
+            else [],
+        }
+
+    def save(
+        self, first: int | None = None, last: int | None = None
+    ) -> str | None:
+        """Writes a range of the history as JSON in the output directory.
+
+        Args:
+            first (int, optional): The first update, as in ``export``.
+            last (int, optional): The last update, as in ``export``.
+
+        Raises:
+            ValueError: If the range is not in the history.
+
+        Returns:
+            str | None: The path of the file written, or None if the history
+                has no output file.
+        """
+        if self._output_file is None:
+            return None
+
+        path = os.path.join(os.getcwd(), "output", self._output_file)
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.export(first, last), file, indent=2)
+
+        return path
+
+    def _check(self, first: int, last: int):
+        """Raises a ValueError if a range is not in the history."""
+        if not self._segments:
+            raise ValueError("The history is empty.")
+
+        if first > last:
+            raise ValueError(f"The range [{first}, {last}] is empty.")
+
+        if first < self.first or last > self.last:
+            raise ValueError(
+                f"The range [{first}, {last}] is not in the history, which holds [{self.first}, {self.last}]."
+            )
+
+    def _deltas(
+        self, last: int, index: int, start: int
+    ) -> Iterator[StepDelta]:
+        """Yields the deltas from the ``start`` delta of a segment up to an
+        update."""
+        for segment in self._segments[index:]:
+            if segment.iteration > last:
+                return
+
+            end = bisect_right(segment.ticks, last)
+            yield from segment.deltas[start:end]
+            start = 0
+
+            if end < len(segment.ticks):
+                return
+
+    def _prune(self):
+        """Drops the segments older than the window."""
+        if self._window is None:
+            return
+
+        oldest = self.last - self._window
+        dropped = bisect_right(self._keyframes, oldest) - 1
+
+        if dropped > 0:
+            del self._segments[:dropped]
+            del self._keyframes[:dropped]
+
+    def __len__(self) -> int:
+        return sum(len(segment.ticks) for segment in self._segments)
+
+    def __repr__(self):
+        return f"History({self._interval}, {len(self._keyframes)})"
+
+
+def _apply(
+    delta: StepDelta, on_fire: Dict[str, int], trucks: Dict[int, str]
+) -> float:
+    """Applies the changes of an update to a state, returning the water."""
+    for vertex in delta.ignited:
+        on_fire[vertex] = on_fire.get(vertex, 0) + 1
+
+    for vertex in delta.put_out:
+        count = on_fire.get(vertex)
+
+        if count == 1:
+            del on_fire[vertex]
+        elif count is not None:
+            on_fire[vertex] = count - 1
+
+    trucks.update(delta.moves)
+
+    return delta.water
@@ -1,26 +1,48 @@
 import os
 from events import Event, EventListener
+from graphs import VertexRegistry
 
 
 class Logger(EventListener):
-    counter: int = 0
-
-    def __init__(self, output_file: str = "simulation.txt", verbose: bool = True):
+    def __init__(
+        self,
+        output_file: str | None = "simulation.txt",
+        verbose: bool = True,
+        registry: VertexRegistry | None = None,
+    ):
         self._output_file = output_file
         self.verbose = verbose
+        self._registry = registry
+        self._counter = 0
+
+    def snapshot(self) -> int:
+        return self._counter
+
+    def restore(self, state: int):
+        self._counter = state
+
+    def name(self, vertex) -> str:
+        """Returns the name of a vertex of an interned map."""
+        if self._registry is None:
+            return vertex
+
+        return self._registry.resolve(vertex)
 
     def handle(self, event: Event):
-        self.add_iteration_mark()
+        # a travel is logged like one move per vertex
+        self.add_iteration_mark(
+            len(event.target) if event.type == Event.ON_TRAVEL else 1
+        )
 
         if event.type == Event.ON_START:
             self.log("The simulation was started")
 
         elif event.type == Event.ON_GET_FIRE:
-            self.log(f"The vertex '{event.target}' is on fire")
+            self.log(f"The vertex '{self.name(event.target)}' is on fire")
 
         elif event.type == Event.ON_SET:
             self.log(
-                f"The fire truck '{event.receiver_id:02}' was designed for the vertex '{event.target}'"
+                f"The fire truck '{event.receiver_id:02}' was designed for the vertex '{self.name(event.target)}'"
             )
 
         elif event.type == Event.ON_ALREADY:
@@ -30,7 +52,7 @@ class Logger(EventListener):
 
         elif event.type == Event.ON_PUT_OUT:
             self.log(
-                f"The the fire truck '{event.sender_id:02}' managed to put out the fire at '{event.target}'"
+                f"The the fire truck '{event.sender_id:02}' managed to put out the fire at '{self.name(event.target)}'"
             )
 
         elif event.type == Event.ON_REFUEL:
@@ -38,17 +60,24 @@ class Logger(EventListener):
                 f"The the fire truck '{event.sender_id:02}' need to refuel the water tank'"
             )
 
-    def add_iteration_mark(self):
-        Logger.counter += 1
-        self.log(f"{Logger.counter:03}", end=": ")
+    def add_iteration_mark(self, count: int = 1):
+        first = self._counter + 1
+        self._counter += count
+
+        if self._output_file is None and not self.verbose:
+            return
+
+        marks = range(first, self._counter + 1)
+        self.log(": ".join(f"{mark:03}" for mark in marks), end=": ")
 
     def log(self, text: str, end: str = "\n"):
-        path = os.path.join(os.getcwd(), "output", self._output_file)
+        if self._output_file is not None:
+            path = os.path.join(os.getcwd(), "output", self._output_file)
 
-        with open(path, "a+", encoding="utf-8") as file:
-            file.write(text)
-            file.write(end)
-            file.close()
+            with open(path, "a+", encoding="utf-8") as file:
+                file.write(text)
+                file.write(end)
+                file.close()
 
         if self.verbose:
             print(text.replace('\t', '  '), end=end)
@@ -0,0 +1,294 @@
+import json
+import os
+import sys
+import tracemalloc
+import types
+from typing import Dict, List, Set
+
+import numpy as np
+
+# the directory of the packages of the simulation
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# objects shared by the whole program rather than owned by a component
+_SHARED = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
+
+# objects that hold no references to other objects
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+
+
+def _size(root: object, roots: Set[int], seen: Set[int]) -> int:
+    """Adds up the sizes of the objects reachable from a root.
+
+    The walk stops at the other roots and at the objects already counted,
+    so an object shared by several components is counted once, in the
+    first one sized.
+
+    Args:
+        root (object): The object sized.
+        roots (Set[int]): The ids of the roots of every component.
+        seen (Set[int]): The ids of the objects already counted, updated
+            in place.
+
+    Returns:
+        int: The size in bytes.
+    """
+    total = 0
+    stack = [root]
+
+    while stack:
+        item = stack.pop()
+        key = id(item)
+
+        if key in seen or (key in roots and item is not root):
+            continue
+
+        seen.add(key)
+
+        if isinstance(item, _SHARED):
+            continue
+
+        total += sys.getsizeof(item)
+
+        if isinstance(item, _ATOMIC):
+            continue
+
+        if isinstance(item, np.ndarray):
+            # a view does not own its data, which its base holds
+            if item.base is not None:
+                stack.append(item.base)
+
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+
+            for cls in type(item).__mro__:
+                for slot in cls.__dict__.get("__slots__", ()):
+                    if hasattr(item, slot):
+                        stack.append(getattr(item, slot))
+
+    return total
+
+
+def _package(filename: str) -> str:
+    """Returns the package of the simulation a source file belongs to."""
+    path = os.path.relpath(os.path.abspath(filename), _ROOT)
+
+    if path.startswith(os.pardir) or os.sep not in path:
+        return "other"
+
+    return path.split(os.sep, 1)[0]
+
+
+class MemoryReport:
+    """Samples the memory used by each component of a simulation.
+
+    The size of a component is the size of every object reachable from it,
+    except through another component, measured with ``sys.getsizeof`` and
+    the buffers of NumPy arrays. Alongside it, ``tracemalloc`` gives the
+    memory allocated by the whole process, its peak since the last sample,
+    and the share allocated by the code of each package.
+
+    The report is opt-in, since sizing walks every object of the simulation
+    and tracing slows down allocations.
+
+    Example:
+        >>> report = MemoryReport(interval=20)
+        >>> app = App(map, "A1", ["B2"], ["C3"], water, memory=report)
+        >>> app.run()
+        >>> app.results()  # writes output/memory.json too
+        >>> report.peaks()["search"]
+        1048576
+
+    Attributes:
+        _samples (List[Dict[str, object]]): The samples taken, in order.
+    """
+
+    def __init__(
+        self,
+        interval: int = 10,
+        output_file: str | None = "memory.json",
+        trace: bool = True,
+    ):
+        """Initializes a report without any sample.
+
+        Args:
+            interval (int): The updates between two samples.
+            output_file (str, optional): The file written by ``save`` in the
+                output directory, next to the simulation log.
+            trace (bool): If true, the allocations are traced with
+                ``tracemalloc`` too.
+
+        Raises:
+            ValueError: If the interval is not positive.
+        """
+        if interval <= 0:
+            raise ValueError(
+                f"The interval must be positive but is '{interval}'."
+            )
+
+        self._interval = interval
+        self._output_file = output_file
+        self._trace = trace
+        self._tracing = False
+        self._last: int | None = None
+        self._samples: List[Dict[str, object]] = []
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    @property
+    def samples(self) -> List[Dict[str, object]]:
+        """Returns the samples taken.
+
+        Returns:
+            List[Dict[str, object]]: The iteration, the size of each
+                component and, if traced, the allocated memory of each
+                sample. It must not be modified.
+        """
+        return self._samples
+
+    def start(self):
+        """Starts tracing the allocations, if not traced already."""
+        if self._trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self):
+        """Stops tracing the allocations, if started by ``start``."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def due(self, iteration: int) -> bool:
+        """Tells whether a sample is due at an iteration.
+
+        Args:
+            iteration (int): The number of updates run.
+
+        Returns:
+            bool: True if ``interval`` updates were run since the last
+                sample.
+        """
+        return self._last is None or iteration - self._last >= self._interval
+
+    def sample(self, iteration: int, components: Dict[str, object]):
+        """Measures the memory of each component.
+
+        Args:
+            iteration (int): The number of updates run.
+            components (Dict[str, object]): The root object of each
+                component, or a tuple of them for a component made of
+                several objects, by name, sized in order.
+        """
+        if self._samples and self._samples[-1]["iteration"] == iteration:
+            return
+
+        members = {
+            name: root if isinstance(root, tuple) else (root,)
+            for name, root in components.items()
+        }
+        roots = {id(root) for group in members.values() for root in group}
+        seen: Set[int] = set()
+        sample: Dict[str, object] = {
+            "iteration": iteration,
+            "components": {
+                name: sum(_size(root, roots, seen) for root in group)
+                for name, group in members.items()
+            },
+        }
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            allocations: Dict[str, int] = {}
+
+            # the samples of the report are not part of the simulation
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ]
+            )
+
+            for statistic in snapshot.statistics("filename"):
+                package = _package(statistic.traceback[0].filename)
+                allocations[package] = (
+                    allocations.get(package, 0) + statistic.size
+                )
+
+            sample["traced"] = {"current": current, "peak": peak}
+            sample["allocations"] = dict(
+                sorted(allocations.items(), key=lambda item: -item[1])
+            )
+            # the next peak is the one since this sample
+            tracemalloc.reset_peak()
+
+        self._last = iteration
+        self._samples.append(sample)
+
+    def peaks(self) -> Dict[str, int]:
+        """Returns the largest size sampled of each component.
+
+        Returns:
+            Dict[str, int]: The peak size in bytes of each component, and
+                the peak traced memory as ``traced`` if traced.
+        """
+        peaks: Dict[str, int] = {}
+
+        for sample in self._samples:
+            for name, size in sample["components"].items():
+                peaks[name] = max(peaks.get(name, 0), size)
+
+            if "traced" in sample:
+                peaks["traced"] = max(
+                    peaks.get("traced", 0), sample["traced"]["peak"]
+                )
+
+        return peaks
+
+    def to_dict(self) -> Dict[str, object]:
+        """Returns the report as JSON serializable data.
+
+        Returns:
+            Dict[str, object]: The interval, the peak of each component and
+                every sample.
+        """
+        return {
+            "interval": self._interval,
+            "peaks": self.peaks(),
+            "samples": self._samples,
+        }
+
+    def save(self) -> str | None:
+        """Writes the report as JSON in the output directory.
+
+        Returns:
+            str | None: The path of the file written, or None if the report
+                has no output file.
+        """
+        if self._output_file is None:
+            return None
+
+        path = os.path.join(os.getcwd(), "output", self._output_file)
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+        return path
+
+    def __repr__(self):
+        return f"MemoryReport({self._interval}, {len(self._samples)})"
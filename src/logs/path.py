@@ -1,20 +1,277 @@
-from typing import Dict, List
+import os
+import tempfile
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
 from events import Event, EventListener
 
 
-class Path(EventListener):
+def _write_varint(buffer: bytearray, value: int):
+    """Appends a non-negative int in 7 bit groups, lowest first."""
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+
+    buffer.append(value)
+
+
+def _decode(chunks: Iterable[bytes]) -> Iterator[Tuple[int, int]]:
+    """Decodes the runs written by ``_Track.close_run`` as (id, count)."""
+    base = 0
+    value = shift = 0
+    delta = None
+
+    for chunk in chunks:
+        for byte in chunk:
+            value |= (byte & 0x7F) << shift
+
+            if byte & 0x80:
+                shift += 7
+                continue
+
+            if delta is None:
+                # zigzag: 0, -1, 1, -2, ... are stored as 0, 1, 2, 3, ...
+                delta = (value >> 1) ^ -(value & 1)
+            else:
+                base += delta
+                yield base, value
+                delta = None
+
+            value = shift = 0
+
+
+class _Track:
+    """The moves of a truck, as runs of visits to the same vertex.
+
+    Closed runs are encoded as the difference with the id of the previous
+    run and the number of visits, both as varints. Neighboring vertices
+    usually get close ids, so most runs take two bytes.
+    """
+
+    __slots__ = ("buffer", "segments", "base", "last", "count", "length")
+
     def __init__(self):
-        self._paths: Dict[str, List[str]] = dict()
+        self.buffer = bytearray()
+        # (offset, size) of the runs spilled to disk, in order
+        self.segments: List[Tuple[int, int]] = []
+        self.base = 0
+        self.last = -1
+        self.count = 0
+        self.length = 0
+
+    def close_run(self):
+        delta = self.last - self.base
+        _write_varint(
+            self.buffer, delta << 1 if delta >= 0 else (~delta << 1) | 1
+        )
+        _write_varint(self.buffer, self.count)
+        self.base = self.last
+
+
+class Path(EventListener):
+    """Records the vertices visited by each truck.
+
+    Vertices are interned to int ids and consecutive visits to the same
+    vertex are stored as a single run, so a truck waiting in place costs
+    nothing. When the encoded runs held in memory exceed ``spill_size``
+    bytes, they are moved to a temporary file, deleted when the path is
+    collected. Use ``vertices`` and ``runs`` to read the paths without
+    building them.
+    """
+
+    def __init__(
+        self, spill_size: int | None = 1 << 20, spill_dir: str | None = None
+    ):
+        """Initializes an empty record.
+
+        Args:
+            spill_size (int, optional): The size in bytes of the runs kept
+                in memory before they are moved to disk. If None, they are
+                always kept in memory.
+            spill_dir (str, optional): The directory of the temporary file.
+                Defaults to the system temporary directory.
+        """
+        self._tracks: Dict[str, _Track] = {}
+        self._ids: Dict[str, int] = {}
+        self._vertices: List[str] = []
+        self._spill_size = spill_size
+        self._spill_dir = spill_dir
+        self._memory = 0
+        self._file: IO[bytes] | None = None
+
+    @property
+    def trucks(self) -> List[str]:
+        """Returns the trucks that moved, in the order they first moved.
+
+        Returns:
+            List[str]: The id of each truck, as a string.
+        """
+        return list(self._tracks)
 
     @property
     def paths(self) -> Dict[str, List[str]]:
-        return self._paths
+        """Returns the vertices visited by each truck.
+
+        The lists are built on each call, so long runs should be read with
+        ``vertices`` instead.
+
+        Returns:
+            Dict[str, List[str]]: The vertices visited by each truck.
+        """
+        return {key: list(self.vertices(key)) for key in self._tracks}
+
+    def length(self, truck: str) -> int:
+        """Returns the number of moves of a truck.
+
+        Args:
+            truck (str): The id of the truck, as a string.
+
+        Returns:
+            int: The number of vertices visited, counting repetitions.
+        """
+        return self._tracks[truck].length
+
+    def runs(self, truck: str) -> Iterator[Tuple[str, int]]:
+        """Iterates over the visits of a truck, grouped by vertex.
+
+        Args:
+            truck (str): The id of the truck, as a string.
+
+        Yields:
+            Tuple[str, int]: Each vertex and the number of consecutive
+                visits to it.
+        """
+        track = self._tracks[truck]
+        vertices = self._vertices
+
+        for id, count in _decode(self._chunks(track)):
+            yield vertices[id], count
+
+        if track.count:
+            yield vertices[track.last], track.count
+
+    def vertices(self, truck: str) -> Iterator[str]:
+        """Iterates over the vertices visited by a truck.
+
+        Args:
+            truck (str): The id of the truck, as a string.
+
+        Yields:
+            str: Each vertex visited, in order.
+        """
+        for vertex, count in self.runs(truck):
+            for _ in range(count):
+                yield vertex
+
+    def snapshot(
+        self,
+    ) -> Tuple[Tuple[str, ...], Dict[str, Tuple[bytes, int, int, int, int]]]:
+        """Captures the record, with the runs still encoded.
+
+        Returns:
+            Tuple: The interned vertices and the runs of each truck.
+        """
+        return (
+            tuple(self._vertices),
+            {
+                key: (
+                    b"".join(self._chunks(track)),
+                    track.base,
+                    track.last,
+                    track.count,
+                    track.length,
+                )
+                for key, track in self._tracks.items()
+            },
+        )
+
+    def restore(
+        self,
+        state: Tuple[
+            Tuple[str, ...], Dict[str, Tuple[bytes, int, int, int, int]]
+        ],
+    ):
+        """Restores a record captured by ``snapshot``.
+
+        Args:
+            state (Tuple): The state returned by ``snapshot``.
+        """
+        vertices, tracks = state
+        self._vertices = list(vertices)
+        self._ids = {vertex: id for id, vertex in enumerate(vertices)}
+        self._tracks = {}
+        self._memory = 0
+        self._file = None
+
+        for key, (encoded, base, last, count, length) in tracks.items():
+            track = _Track()
+            track.buffer[:] = encoded
+            track.base, track.last, track.count = base, last, count
+            track.length = length
+            self._tracks[key] = track
+            self._memory += len(encoded)
+
+        self._spill_if_needed()
 
     def handle(self, event: Event):
         if event.type == Event.ON_MOVE:
+            self._visit(str(event.sender_id), event.target)
+
+        elif event.type == Event.ON_TRAVEL:
             key = str(event.sender_id)
 
-            if key not in self._paths:
-                self._paths[key] = []
-                
-            self._paths[key].append(event.target)
+            for vertex in event.target:
+                self._visit(key, vertex)
+
+    def _visit(self, key: str, vertex: str):
+        """Appends a visit to the track of a truck."""
+        track = self._tracks.get(key)
+
+        if track is None:
+            track = self._tracks[key] = _Track()
+
+        id = self._ids.get(vertex)
+
+        if id is None:
+            id = self._ids[vertex] = len(self._vertices)
+            self._vertices.append(vertex)
+
+        track.length += 1
+
+        if id == track.last:
+            track.count += 1
+            return
+
+        if track.count:
+            size = len(track.buffer)
+            track.close_run()
+            self._memory += len(track.buffer) - size
+
+        track.last = id
+        track.count = 1
+        self._spill_if_needed()
+
+    def _chunks(self, track: _Track) -> Iterator[bytes]:
+        """Yields the closed runs of a truck, from disk then memory."""
+        for offset, size in track.segments:
+            self._file.seek(offset)
+            yield self._file.read(size)
+
+        yield bytes(track.buffer)
+
+    def _spill_if_needed(self):
+        if self._spill_size is None or self._memory <= self._spill_size:
+            return
+
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self._spill_dir)
+
+        self._file.seek(0, os.SEEK_END)
+
+        for track in self._tracks.values():
+            if track.buffer:
+                track.segments.append((self._file.tell(), len(track.buffer)))
+                self._file.write(track.buffer)
+                track.buffer.clear()
+
+        self._file.flush()
+        self._memory = 0
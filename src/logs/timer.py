@@ -9,6 +9,12 @@ class Timer(EventListener):
     def time(self) -> int:
         return self._time_count
 
+    def snapshot(self) -> int:
+        return self._time_count
+
+    def restore(self, state: int):
+        self._time_count = state
+
     def handle(self, event: Event):
         if event.type == Event.ON_PUT_OUT:
             self._time_count += 1
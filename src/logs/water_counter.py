@@ -11,6 +11,12 @@ class WaterCount(EventListener):
     def count(self) -> float:
         return self._countage
 
+    def snapshot(self) -> float:
+        return self._countage
+
+    def restore(self, state: float):
+        self._countage = state
+
     def handle(self, event):
         if event.type == Event.ON_PUT_OUT:
             self._countage += self._water_per_vertex[event.target]
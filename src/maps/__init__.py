@@ -1,11 +1,17 @@
-from maps.auto_map import generate_map, generate_vertices_names
+from maps.auto_map import generate_map, generate_edges, generate_vertices_names
+from maps.cache import MapCache
 from maps.input_map import input_map, input_edge, input_vertex_float, input_water_per_vertex
+from maps.scenario import Scenario, ScenarioGenerator
 
 __all__ = [
     "generate_map",
+    "generate_edges",
     "generate_vertices_names",
     "input_map",
     "input_edge",
     "input_vertex_float",
     "input_water_per_vertex",
+    "Scenario",
+    "ScenarioGenerator",
+    "MapCache",
 ]
@@ -1,9 +1,16 @@
 import math
 
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Tuple
 
 from graphs import Graph
 
+if TYPE_CHECKING:
+    from maps.cache import MapCache
+
+# changes whenever ``generate_map`` builds different maps for the same
+# arguments, which invalidates the maps cached by ``MapCache``
+GENERATOR_VERSION = 1
+
 
 def generate_vertices_names(
     vertices_number: int = 26, vertices_labels: List[str] | None = None
@@ -100,7 +107,47 @@ def link_vertices_in_col(previous_row: List[str], current_row: List[str]):
 def generate_map(
     map_shape: int | Tuple[int, int] = 26,
     vertices_labels: List[str] | None = None,
+    intern: bool = False,
+    cache: "MapCache | None" = None,
 ) -> Graph:
+    """Generates a grid shaped map.
+
+    Args:
+        map_shape (int | Tuple[int, int]): The number of rows and columns.
+        vertices_labels (List[str] | None): The labels of the vertex names,
+            as in ``generate_vertices_names``.
+        intern (bool): If true, the vertices of the map are interned to int
+            ids, whose names are kept by the map registry.
+        cache (MapCache, optional): The cache the map is loaded from, or
+            stored in once generated.
+
+    Returns:
+        Graph: The generated map.
+    """
+    if cache is not None:
+        graph = cache.map(map_shape, vertices_labels)
+    else:
+        graph = Graph(generate_edges(map_shape, vertices_labels)[1])
+
+    return graph.interned() if intern else graph
+
+
+def generate_edges(
+    map_shape: int | Tuple[int, int] = 26,
+    vertices_labels: List[str] | None = None,
+) -> Tuple[List[str], List[Tuple[str, str, float]]]:
+    """Generates the vertices and edges of a grid shaped map.
+
+    Args:
+        map_shape (int | Tuple[int, int]): The number of rows and columns.
+        vertices_labels (List[str] | None): The labels of the vertex names,
+            as in ``generate_vertices_names``.
+
+    Returns:
+        Tuple[List[str], List[Tuple[str, str, float]]]: The vertex names, in
+            the order they were generated, and the edges given to the
+            ``Graph`` constructor by ``generate_map``.
+    """
     iteration = 0
     rows = []
     edges = []
@@ -130,4 +177,4 @@ def generate_map(
             edges += link_vertices_in_row(rows[j])
             edges += link_vertices_in_col(rows[i], rows[j])
 
-    return Graph(edges)
+    return vertex_names, edges
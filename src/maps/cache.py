@@ -0,0 +1,311 @@
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+from typing import List, Tuple
+
+import numpy as np
+
+from graphs import Graph
+from maps.auto_map import GENERATOR_VERSION, create_shape, generate_edges
+
+
+class MapCache:
+    """Keeps the maps built by ``generate_map`` on disk, to load them again.
+
+    Each map is stored in its own NumPy archive, named after a hash of its
+    shape, its labels and the version of the generator, so a map is only
+    generated once for all the processes sharing the directory. The archive
+    holds the vertex names and the edges as arrays of indices into them,
+    which are read back without parsing and replayed with
+    ``Graph.from_edges``, so the loaded map is the same as a generated one,
+    down to the order its vertices and edges are listed in.
+
+    Archives are written to a temporary file and renamed into place, so
+    processes filling the cache at the same time never read a partial map,
+    and the last one written wins. When the archives exceed ``max_bytes``,
+    the least recently used ones are removed.
+
+    Example:
+        >>> cache = MapCache()
+        >>> map = generate_map(500, cache=cache)  # generated and stored
+        >>> map = generate_map(500, cache=cache)  # loaded
+
+    Attributes:
+        _directory (str): The directory of the archives.
+        _max_bytes (int): The size the archives are evicted down to.
+    """
+
+    SUFFIX = ".npz"
+    TEMPORARY_SUFFIX = ".tmp"
+    # the age of a temporary file left by a process that did not finish it
+    STALE_SECONDS = 3600
+
+    def __init__(self, directory: str | None = None, max_bytes: int = 1 << 30):
+        """Initializes a cache over a directory, created if missing.
+
+        Args:
+            directory (str, optional): The directory of the archives.
+                Defaults to ``maps`` in the output directory.
+            max_bytes (int): The maximum size of the archives.
+
+        Raises:
+            ValueError: If the maximum size is not positive.
+        """
+        if max_bytes <= 0:
+            raise ValueError(
+                f"The maximum size must be positive but is '{max_bytes}'."
+            )
+
+        self._directory = (
+            directory
+            if directory is not None
+            else os.path.join(os.getcwd(), "output", "maps")
+        )
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def hits(self) -> int:
+        """Returns how many maps were loaded from the cache.
+
+        Returns:
+            int: The number of cache hits.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Returns how many maps were generated.
+
+        Returns:
+            int: The number of cache misses.
+        """
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        """Returns the size of the archives.
+
+        Returns:
+            int: The size in bytes of every map in the directory.
+        """
+        return sum(size for _, _, size in self._archives())
+
+    def key(
+        self,
+        map_shape: int | Tuple[int, int] = 26,
+        vertices_labels: List[str] | None = None,
+    ) -> str:
+        """Returns the key of a map, which names its archive.
+
+        Args:
+            map_shape (int | Tuple[int, int]): The number of rows and
+                columns, as in ``generate_map``.
+            vertices_labels (List[str] | None): The labels of the vertex
+                names, as in ``generate_map``.
+
+        Returns:
+            str: A hash of the shape, the labels and the generator version.
+        """
+        labels = list(vertices_labels) if vertices_labels is not None else None
+        digest = hashlib.sha256()
+        digest.update(
+            repr((GENERATOR_VERSION, create_shape(map_shape), labels)).encode()
+        )
+
+        return digest.hexdigest()
+
+    def map(
+        self,
+        map_shape: int | Tuple[int, int] = 26,
+        vertices_labels: List[str] | None = None,
+    ) -> Graph:
+        """Loads a map, or generates and stores it if it is not cached.
+
+        Args:
+            map_shape (int | Tuple[int, int]): The number of rows and
+                columns, as in ``generate_map``.
+            vertices_labels (List[str] | None): The labels of the vertex
+                names, as in ``generate_map``.
+
+        Returns:
+            Graph: The same map as ``generate_map`` builds.
+        """
+        key = self.key(map_shape, vertices_labels)
+        path = self._path(key)
+        graph = self._load(path, key)
+
+        if graph is not None:
+            self._hits += 1
+
+            return graph
+
+        self._misses += 1
+        names, edges = generate_edges(map_shape, vertices_labels)
+        self._store(path, key, names, edges)
+        self.evict(keep=key)
+
+        return Graph.from_edges(edges, duplicates=Graph.KEEP)
+
+    def evict(self, keep: str | None = None) -> int:
+        """Removes the least recently used maps beyond the maximum size.
+
+        Temporary files left by processes that stopped while writing are
+        removed too.
+
+        Args:
+            keep (str, optional): The key of a map never removed, such as
+                the one just stored.
+
+        Returns:
+            int: The number of maps removed.
+        """
+        archives = sorted(self._archives(), key=lambda archive: archive[1])
+        total = sum(size for _, _, size in archives)
+        removed = 0
+
+        for path, _, size in archives:
+            if total <= self._max_bytes:
+                break
+
+            if keep is not None and path == self._path(keep):
+                continue
+
+            # another process may have removed it already
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+        self._remove_stale()
+
+        return removed
+
+    def clear(self):
+        """Removes every map of the cache."""
+        for path, _, _ in self._archives():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + MapCache.SUFFIX)
+
+    def _archives(self) -> List[Tuple[str, float, int]]:
+        """Lists the path, last use and size of each archive."""
+        archives = []
+
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(MapCache.SUFFIX):
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+
+                archives.append((entry.path, stat.st_mtime, stat.st_size))
+
+        return archives
+
+    def _load(self, path: str, key: str) -> Graph | None:
+        """Loads the map of an archive, or None if it is missing or not
+        readable, in which case it is generated again."""
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                if str(archive["key"]) != key:
+                    return None
+
+                names = archive["vertices"].tolist()
+                origins = archive["origins"].tolist()
+                destinations = archive["destinations"].tolist()
+                weights = archive["weights"].tolist()
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+        # the modification time orders the archives by last use
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return Graph.from_edges(
+            origins=[names[index] for index in origins],
+            destinations=[names[index] for index in destinations],
+            weights=weights,
+            duplicates=Graph.KEEP,
+        )
+
+    def _store(
+        self,
+        path: str,
+        key: str,
+        names: List[str],
+        edges: List[Tuple[str, str, float]],
+    ):
+        """Writes the archive of a map under a temporary name, then renames
+        it into place."""
+        index = {name: i for i, name in enumerate(names)}
+        dtype = np.int32 if len(names) < 2**31 else np.int64
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self._directory, suffix=MapCache.TEMPORARY_SUFFIX
+        )
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(
+                    file,
+                    key=np.array(key),
+                    vertices=np.array(names, dtype=str),
+                    origins=np.fromiter(
+                        (index[origin] for origin, _, _ in edges),
+                        dtype,
+                        len(edges),
+                    ),
+                    destinations=np.fromiter(
+                        (index[destination] for _, destination, _ in edges),
+                        dtype,
+                        len(edges),
+                    ),
+                    weights=np.array([weight for _, _, weight in edges]),
+                )
+
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def _remove_stale(self):
+        """Removes the temporary files older than ``STALE_SECONDS``."""
+        oldest = time.time() - MapCache.STALE_SECONDS
+
+        with os.scandir(self._directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(MapCache.TEMPORARY_SUFFIX):
+                    continue
+
+                try:
+                    if entry.stat().st_mtime < oldest:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def __len__(self) -> int:
+        return len(self._archives())
+
+    def __repr__(self):
+        return f"MapCache({self._directory!r}, {self._max_bytes})"
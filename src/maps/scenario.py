@@ -0,0 +1,271 @@
+from collections import OrderedDict
+from typing import Iterator, List, NamedTuple
+
+import numpy as np
+
+from graphs import SimpleGraph, dijkstra_distances
+
+
+class Scenario(NamedTuple):
+    """Positions of a simulation drawn by a ``ScenarioGenerator``.
+
+    Attributes:
+        fire_start_vertex (str): The vertex where the fire starts.
+        firefighters_position (List[str]): The firefighter posts.
+        water_sources_position (List[str]): The water sources.
+    """
+
+    fire_start_vertex: str
+    firefighters_position: List[str]
+    water_sources_position: List[str]
+
+
+class ScenarioGenerator:
+    """Draws reproducible simulation scenarios from a map.
+
+    Every scenario has an ignition point, posts at least ``min_distance``
+    away from it, and water sources, all of them different vertices. The
+    vertices are kept sorted in an array, so a seed gives the same
+    scenarios in any process, whatever the hash seed. Scenarios are drawn
+    in batches with NumPy. The vertices far enough from each ignition point
+    are cached, so constrained batches cost one search per new ignition
+    point.
+
+    Example:
+        >>> generator = ScenarioGenerator(map, seed=7, min_distance=3)
+        >>> scenario = generator.scenario()
+        >>> App(map, *scenario, water_per_vertex)
+    """
+
+    def __init__(
+        self,
+        map: SimpleGraph,
+        seed: int | None = None,
+        posts: int = 3,
+        water_sources: int = 3,
+        min_distance: float = 0,
+        ignition_points: List[str] | None = None,
+        cache_size: int = 4096,
+    ):
+        """Initializes a generator over a map.
+
+        Args:
+            map (SimpleGraph): The map of the scenarios.
+            seed (int, optional): The seed of the generator.
+            posts (int): The number of firefighter posts of each scenario.
+            water_sources (int): The number of water sources of each
+                scenario.
+            min_distance (float): The minimum shortest path distance from
+                the ignition point to each post. If positive, posts must
+                also be reachable from the ignition point.
+            ignition_points (List[str], optional): The vertices where fires
+                may start. Defaults to every vertex of the map.
+            cache_size (int): The maximum number of ignition points whose
+                distant vertices are cached.
+
+        Raises:
+            ValueError: If a count is negative, the map does not have
+                enough vertices or an ignition point is not in the map.
+        """
+        if posts < 0 or water_sources < 0:
+            raise ValueError(
+                "The number of posts and water sources can not be negative."
+            )
+
+        self._vertices = sorted(map.vertices)
+
+        if 1 + posts + water_sources > len(self._vertices):
+            raise ValueError(
+                f"The map has {len(self._vertices)} vertices, not enough for {1 + posts + water_sources} distinct positions."
+            )
+
+        index = {vertex: i for i, vertex in enumerate(self._vertices)}
+
+        if ignition_points is None:
+            self._ignitions = np.arange(len(self._vertices))
+        else:
+            for vertex in ignition_points:
+                if vertex not in index:
+                    raise ValueError(
+                        f"'{vertex}' is not a vertex in the graph"
+                    )
+
+            self._ignitions = np.array(
+                [index[vertex] for vertex in ignition_points], dtype=np.int64
+            )
+
+        self._map = map
+        self._index = index
+        self._random = np.random.default_rng(seed)
+        self._posts = posts
+        self._water_sources = water_sources
+        self._min_distance = min_distance
+        self._all = np.arange(len(self._vertices))
+        self._far: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._cache_size = cache_size
+
+    @property
+    def vertices(self) -> List[str]:
+        """Returns the vertices indexed by the arrays of ``batch``.
+
+        Returns:
+            List[str]: The sorted vertices. It must not be modified.
+        """
+        return self._vertices
+
+    def batch(self, count: int) -> np.ndarray:
+        """Draws many scenarios as vertex indexes.
+
+        Args:
+            count (int): The number of scenarios.
+
+        Raises:
+            ValueError: If an ignition point has not enough vertices far
+                enough for the posts.
+
+        Returns:
+            np.ndarray: A ``count x (1 + posts + water sources)`` array with
+                the ignition point, the posts and the water sources of each
+                scenario, as indexes into ``vertices``.
+        """
+        ignitions = self._ignitions[
+            self._random.integers(0, len(self._ignitions), count)
+        ][:, None]
+
+        if self._min_distance > 0:
+            posts = np.empty((count, self._posts), dtype=np.int64)
+            order = np.argsort(ignitions[:, 0], kind="stable")
+            starts = np.flatnonzero(np.diff(ignitions[order, 0], prepend=-1))
+
+            for rows in np.split(order, starts[1:]):
+                if len(rows):
+                    posts[rows] = self._sample(
+                        self._far_from(int(ignitions[rows[0], 0])),
+                        ignitions[rows],
+                        self._posts,
+                    )
+        else:
+            posts = self._sample(self._all, ignitions, self._posts)
+
+        taken = np.hstack([ignitions, posts])
+        water_sources = self._sample(self._all, taken, self._water_sources)
+
+        return np.hstack([taken, water_sources])
+
+    def generate(self, count: int) -> List[Scenario]:
+        """Draws many scenarios.
+
+        Args:
+            count (int): The number of scenarios.
+
+        Returns:
+            List[Scenario]: The scenarios, with the vertices of the map.
+        """
+        vertices = self._vertices
+        end = 1 + self._posts
+
+        return [
+            Scenario(
+                vertices[row[0]],
+                [vertices[i] for i in row[1:end]],
+                [vertices[i] for i in row[end:]],
+            )
+            for row in self.batch(count).tolist()
+        ]
+
+    def scenario(self) -> Scenario:
+        """Draws a single scenario.
+
+        Returns:
+            Scenario: The scenario.
+        """
+        return self.generate(1)[0]
+
+    def __iter__(self) -> Iterator[Scenario]:
+        while True:
+            yield from self.generate(1024)
+
+    def _far_from(self, ignition: int) -> np.ndarray:
+        """Returns the vertices reachable at least min_distance away."""
+        far = self._far.get(ignition)
+
+        if far is not None:
+            self._far.move_to_end(ignition)
+            return far
+
+        distances = dijkstra_distances(self._map, self._vertices[ignition])
+        far = np.array(
+            sorted(
+                self._index[vertex]
+                for vertex, distance in distances.items()
+                if distance >= self._min_distance
+            ),
+            dtype=np.int64,
+        )
+
+        if len(far) < self._posts:
+            raise ValueError(
+                f"Only {len(far)} vertices are at least {self._min_distance} away from '{self._vertices[ignition]}'."
+            )
+
+        self._far[ignition] = far
+
+        if len(self._far) > self._cache_size:
+            self._far.popitem(last=False)
+
+        return far
+
+    def _sample(
+        self, candidates: np.ndarray, exclude: np.ndarray, k: int
+    ) -> np.ndarray:
+        """Draws k distinct candidates per row, none of them excluded.
+
+        Args:
+            candidates (np.ndarray): The sorted vertex indexes to draw from.
+            exclude (np.ndarray): The vertex indexes already taken by each
+                row, which must be distinct within the row.
+            k (int): The number of vertices drawn per row.
+
+        Returns:
+            np.ndarray: A ``rows x k`` array of vertex indexes.
+        """
+        rows, size = len(exclude), len(candidates)
+
+        if k == 0 or rows == 0:
+            return np.empty((rows, k), dtype=np.int64)
+
+        if 4 * (k + exclude.shape[1]) >= size:
+            # few candidates, rank all of them by random keys
+            keys = self._random.random((rows, size))
+            positions = np.minimum(
+                np.searchsorted(candidates, exclude), size - 1
+            )
+            excluded = candidates[positions] == exclude
+            keys[np.nonzero(excluded)[0], positions[excluded]] = np.inf
+
+            chosen = np.argsort(keys, axis=1)[:, :k]
+
+            if np.isinf(np.take_along_axis(keys, chosen, axis=1)).any():
+                raise ValueError(
+                    f"Not enough vertices to draw {k} distinct positions."
+                )
+
+            return candidates[chosen]
+
+        # many candidates, redraw the few rows with a repeated vertex
+        drawn = candidates[self._random.integers(0, size, (rows, k))]
+        pending = np.arange(rows)
+
+        while len(pending):
+            taken = np.sort(
+                np.hstack([exclude[pending], drawn[pending]]), axis=1
+            )
+            pending = pending[(taken[:, 1:] == taken[:, :-1]).any(axis=1)]
+            drawn[pending] = candidates[
+                self._random.integers(0, size, (len(pending), k))
+            ]
+
+        return drawn
+
+    def __repr__(self):
+        return f"ScenarioGenerator({len(self._vertices)}, {self._posts}, {self._water_sources}, {self._min_distance})"
@@ -0,0 +1,7 @@
+from parallel.partition import Partition
+from parallel.simulation import PartitionedSimulation
+
+__all__ = [
+    "Partition",
+    "PartitionedSimulation",
+]
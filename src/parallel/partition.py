@@ -0,0 +1,213 @@
+import math
+from collections import deque
+from typing import Dict, List, Tuple
+
+from graphs import Graph
+
+
+class Partition:
+    """Splits a map into connected regions of similar size.
+
+    The regions are grown from seeds by a breadth-first search from all of
+    them at once, and each vertex joins the region of the vertex it was
+    reached from, so a region is connected on a map whose edges go both
+    ways. The seeds are chosen by farthest point selection: each one is the
+    vertex the most hops away from the seeds chosen before it, which
+    spreads them over the map. Vertices no seed reaches, in components
+    without a seed, join the smallest region.
+
+    The edges between two regions make their halo: the vertices of a region
+    with a neighbor in another one, and the state exchanged across them.
+
+    Example:
+        >>> partition = Partition(map, 4)
+        >>> partition.region_of("A1")
+        2
+
+    Attributes:
+        _regions (List[List[str]]): The vertices of each region, in the
+            order of the vertices of the map.
+        _region_of (Dict[str, int]): The region of each vertex.
+    """
+
+    def __init__(self, map: Graph, regions: int):
+        """Partitions a map.
+
+        Args:
+            map (Graph): The map.
+            regions (int): The number of regions, at most the number of
+                vertices.
+
+        Raises:
+            ValueError: If the number of regions is not positive.
+        """
+        if regions <= 0:
+            raise ValueError(
+                f"The number of regions must be positive but is '{regions}'."
+            )
+
+        self._map = map
+        vertices = list(map.vertices)
+        count = min(regions, len(vertices))
+        seeds: List[str] = []
+        # the first seed is the farthest vertex from the smallest one
+        hops = self._hops([min(vertices)]) if vertices else {}
+
+        for _ in range(count):
+            seeds.append(
+                max(
+                    (vertex for vertex in vertices if vertex not in seeds),
+                    key=lambda vertex: hops.get(vertex, math.inf),
+                )
+            )
+            hops = self._hops(seeds)
+
+        self._region_of = self._grow(seeds, {})
+        sizes = [0] * count
+
+        for region in self._region_of.values():
+            sizes[region] += 1
+
+        for vertex in vertices:
+            if vertex not in self._region_of:
+                region = sizes.index(min(sizes))
+                reached = self._grow([vertex], self._region_of, region)
+                self._region_of.update(reached)
+                sizes[region] += len(reached)
+
+        self._regions: List[List[str]] = [[] for _ in range(count)]
+
+        for vertex in vertices:
+            self._regions[self._region_of[vertex]].append(vertex)
+
+    @property
+    def regions(self) -> List[List[str]]:
+        """Returns the vertices of each region.
+
+        Returns:
+            List[List[str]]: The vertices of each region, in the order of
+                the vertices of the map. It must not be modified.
+        """
+        return self._regions
+
+    def region_of(self, vertex: str) -> int:
+        """Returns the region of a vertex.
+
+        Args:
+            vertex (str): The vertex.
+
+        Raises:
+            ValueError: If the vertex is not in the map.
+
+        Returns:
+            int: The index of its region.
+        """
+        try:
+            return self._region_of[vertex]
+        except KeyError:
+            raise ValueError(
+                f"'{vertex}' is not a vertex in the graph"
+            ) from None
+
+    def edges(self, region: int) -> List[Tuple[str, str, float]]:
+        """Returns the edges between the vertices of a region.
+
+        Args:
+            region (int): The index of the region.
+
+        Returns:
+            List[Tuple[str, str, float]]: The directed edges as
+                ``(origin, destination, weight)`` tuples, in the order of
+                the neighborhoods of the map.
+        """
+        region_of = self._region_of
+        edges_list = self._map.edges_list
+
+        return [
+            (origin, destination, weight)
+            for origin in self._regions[region]
+            for destination, weight in edges_list.get(origin, [])
+            if region_of[destination] == region
+        ]
+
+    def halo(self, region: int) -> Dict[str, List[Tuple[str, int]]]:
+        """Returns the neighbors of a region in the other regions.
+
+        Args:
+            region (int): The index of the region.
+
+        Returns:
+            Dict[str, List[Tuple[str, int]]]: The neighbors of each vertex
+                of the region with one outside it, with their regions.
+        """
+        halo: Dict[str, List[Tuple[str, int]]] = {}
+        region_of = self._region_of
+
+        for origin in self._regions[region]:
+            for destination in self._map.neighborhood(origin):
+                if region_of[destination] != region:
+                    halo.setdefault(origin, []).append(
+                        (destination, region_of[destination])
+                    )
+
+        return halo
+
+    def cut(self) -> int:
+        """Counts the edges between different regions.
+
+        Returns:
+            int: The number of directed edges crossing regions.
+        """
+        return sum(
+            len(neighbors)
+            for region in range(len(self._regions))
+            for neighbors in self.halo(region).values()
+        )
+
+    def _hops(self, sources: List[str]) -> Dict[str, int]:
+        """Counts the hops from the nearest source to the vertices reached."""
+        hops = {source: 0 for source in sources}
+        frontier_queue = deque(sources)
+
+        while frontier_queue:
+            vertex = frontier_queue.popleft()
+
+            for neighbor in self._map.neighborhood(vertex):
+                if neighbor not in hops:
+                    hops[neighbor] = hops[vertex] + 1
+                    frontier_queue.append(neighbor)
+
+        return hops
+
+    def _grow(
+        self,
+        seeds: List[str],
+        assigned: Dict[str, int],
+        region: int | None = None,
+    ) -> Dict[str, int]:
+        """Assigns the vertices reached from the seeds to their regions.
+
+        Each seed starts the region of its index, unless a region is given
+        for all of them. Vertices already assigned are not crossed.
+        """
+        region_of = {
+            seed: region if region is not None else index
+            for index, seed in enumerate(seeds)
+        }
+        frontier_queue = deque(seeds)
+
+        while frontier_queue:
+            vertex = frontier_queue.popleft()
+
+            for neighbor in self._map.neighborhood(vertex):
+                if neighbor not in region_of and neighbor not in assigned:
+                    region_of[neighbor] = region_of[vertex]
+                    frontier_queue.append(neighbor)
+
+        return region_of
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+    def __repr__(self):
+        return f"Partition({len(self._map.vertices)}, {len(self._regions)})"
@@ -0,0 +1,453 @@
+import heapq
+import math
+import multiprocessing
+import os
+from multiprocessing.connection import Connection
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Self, Tuple
+
+from app import App
+from graphs import Graph, PathCache
+from parallel.partition import Partition
+
+# the vertices of other regions reached by the fire front, by region
+Outbox = Dict[int, List[str]]
+
+
+class _Region:
+    """Spreads the fire over one region of a map, one hop per update.
+
+    The fire front of each hop reaches the neighbors inside the region
+    directly, and the ones in other regions through the outbox, which the
+    simulation delivers as the inbox of their region on the next hop. The
+    front keeps the order of the vertices of the whole map, so the fronts of
+    every region together make the layer ``PathCache.layers`` gives on the
+    whole map.
+    """
+
+    def __init__(
+        self,
+        vertices: List[str],
+        edges: List[Tuple[str, str, float]],
+        halo: Dict[str, List[Tuple[str, int]]],
+        rank: Dict[str, int],
+        fire_start_vertex: str | None,
+    ):
+        self._map = Graph()
+        self._map.add_vertex(vertices)
+
+        for origin, destination, weight in edges:
+            self._map.add_edge(origin, destination, weight)
+
+        self._halo = halo
+        self._rank = rank
+        self._reached = set()
+        self._candidates = (
+            {fire_start_vertex} if fire_start_vertex is not None else set()
+        )
+
+    def spread(self, inbox: List[str]) -> Tuple[Outbox, List[str]]:
+        """Spreads the fire of the region by one more hop.
+
+        Args:
+            inbox (List[str]): The vertices of the region reached by the
+                fire front of the other regions on the last hop.
+
+        Returns:
+            Tuple[Outbox, List[str]]: The vertices of other regions reached
+                by the front of this hop, and the front in the order of the
+                vertices of the map.
+        """
+        self._candidates.update(inbox)
+        front = sorted(
+            self._candidates.difference(self._reached),
+            key=self._rank.__getitem__,
+        )
+        self._candidates.clear()
+        self._reached.update(front)
+        outbox: Outbox = {}
+
+        for vertex in front:
+            for neighbor in self._map.neighborhood(vertex):
+                if neighbor not in self._reached:
+                    self._candidates.add(neighbor)
+
+            for neighbor, region in self._halo.get(vertex, ()):
+                outbox.setdefault(region, []).append(neighbor)
+
+        return outbox, front
+
+
+class _FireLayers(Mapping):
+    """The fire layers of a simulation, spread hop by hop as they are read.
+
+    An update can spread the fire by several layers, so each layer is only
+    spread when the simulation first reads it, or a later one. Iterating
+    over the layers spreads all of them.
+    """
+
+    def __init__(self, hop: Callable[[], List[str]]):
+        """Initializes the layers, none spread yet.
+
+        Args:
+            hop (Callable[[], List[str]]): Spreads the next hop, returning
+                its layer, empty once the fire reached every vertex it can.
+        """
+        self._hop = hop
+        self._layers: List[List[str]] = []
+        self._spread = False
+
+    def _spread_to(self, distance: float):
+        while not self._spread and len(self._layers) <= distance:
+            layer = self._hop()
+
+            if layer:
+                self._layers.append(layer)
+            else:
+                self._spread = True
+
+    def __getitem__(self, distance: float) -> List[str]:
+        self._spread_to(distance)
+
+        if distance in range(len(self._layers)):
+            return self._layers[distance]
+
+        raise KeyError(distance)
+
+    def __iter__(self) -> Iterator[int]:
+        self._spread_to(math.inf)
+
+        return iter(range(len(self._layers)))
+
+    def __len__(self) -> int:
+        self._spread_to(math.inf)
+
+        return len(self._layers)
+
+
+def _serve(connection: Connection, arguments: Tuple):
+    """Runs the calls of a simulation on a region until it is closed.
+
+    Args:
+        connection (Connection): Receives ``(method, arguments)`` calls,
+            or None to stop, and sends back ``(True, result)`` or
+            ``(False, error)`` for each one.
+        arguments (Tuple): The arguments of the region.
+    """
+    try:
+        region, error = _Region(*arguments), None
+    except Exception as exception:
+        region, error = None, exception
+
+    try:
+        while (call := connection.recv()) is not None:
+            method, parameters = call
+
+            try:
+                if error is not None:
+                    raise error
+
+                connection.send((True, getattr(region, method)(*parameters)))
+            except Exception as exception:
+                connection.send(
+                    (False, f"{type(exception).__name__}: {exception}")
+                )
+    except EOFError:
+        pass
+    finally:
+        connection.close()
+
+
+class PartitionedSimulation:
+    """Runs a simulation whose fire spreads over regions, each in its own
+    process.
+
+    The map is split by a ``Partition``, and each region spreads the fire
+    over its vertices, one hop at a time, as the updates reach the hop.
+    After each hop the regions exchange their halo, the vertices of the
+    fire front next to another region, which gives each region the fire
+    that crosses into it on the next hop. The fronts of every region make
+    the next fire layer of the simulation, the one ``PathCache.layers``
+    gives on the whole map.
+
+    The trucks are allocated to the fires one after the other, each seeing
+    the events of the ones before it, so they are simulated together on the
+    whole map by an ``App`` in this process, and drive across the borders
+    of the regions. The regions spread the next hop while the trucks run,
+    and a ``PathCache`` with an executor plans the routes of the trucks in
+    parallel. The results are the same as the ones of ``App`` in
+    ``App.TICK`` mode, whatever the number of regions.
+
+    Example:
+        >>> with PartitionedSimulation(
+        ...     map, "A1", ["B2", "X9"], ["C3"], water, regions=4
+        ... ) as simulation:
+        ...     simulation.run()
+        ...     simulation.summary()
+        {'time': 12, 'water': 180, 'iterations': 31, 'put_out': False}
+    """
+
+    REGION_SIZE = 20000  # The vertices spread over by a single process.
+
+    def __init__(
+        self,
+        map: Graph,
+        fire_start_vertex: str,
+        firefighters_position: List[str],
+        water_sources_position: List[str],
+        water_needed_extinguish_fire: Dict[str, float],
+        fire_truck_water_volume: float = 150,
+        regions: int | None = None,
+        processes: bool = True,
+        paths: PathCache | None = None,
+    ):
+        """Partitions a map and starts a process per region.
+
+        Args:
+            map (Graph): The map of the simulation.
+            fire_start_vertex (str): The vertex where the fire starts.
+            firefighters_position (List[str]): The firefighter posts.
+            water_sources_position (List[str]): The water sources.
+            water_needed_extinguish_fire (Dict[str, float]): The water
+                needed to put out the fire in each vertex.
+            fire_truck_water_volume (float): The tank capacity of the trucks.
+            regions (int, optional): The number of regions. Defaults to one
+                per ``REGION_SIZE`` vertices, at most one per CPU.
+            processes (bool): If false, the regions run one after the other
+                in the calling process, which gives the same results.
+            paths (PathCache, optional): The search trees of the map, as in
+                ``App``, which can plan the routes with an executor.
+
+        Raises:
+            ValueError: If the number of regions is not positive or a
+                vertex is not in the map.
+        """
+        registry = map.registry
+        intern = registry.intern if registry is not None else lambda v: v
+        start = intern(fire_start_vertex)
+
+        if regions is None:
+            regions = min(
+                os.cpu_count() or 1,
+                math.ceil(len(map.vertices) / self.REGION_SIZE),
+            )
+
+        self._partition = Partition(map, regions)
+        region_of = self._partition.region_of
+        region_of(start)
+
+        self._rank = {
+            vertex: index for index, vertex in enumerate(map.vertices)
+        }
+        self._outboxes: List[Outbox] = []
+        # whether the next hop was sent to the regions and not received yet
+        self._spreading = False
+        self._app = App(
+            map,
+            fire_start_vertex,
+            firefighters_position,
+            water_sources_position,
+            water_needed_extinguish_fire,
+            fire_truck_water_volume,
+            verbose=0,
+            paths=paths,
+            fire_layers=_FireLayers(self._hop),
+        )
+        self._ran = False
+
+        arguments = [
+            (
+                vertices,
+                self._partition.edges(region),
+                self._partition.halo(region),
+                {vertex: self._rank[vertex] for vertex in vertices},
+                start if region_of(start) == region else None,
+            )
+            for region, vertices in enumerate(self._partition.regions)
+        ]
+
+        self._regions: List[_Region] = []
+        self._connections: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+        self._sent: Tuple[str, List[Tuple]] | None = None
+
+        if not processes:
+            self._regions = [_Region(*argument) for argument in arguments]
+            return
+
+        for argument in arguments:
+            connection, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve, args=(child, argument), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    @property
+    def partition(self) -> Partition:
+        return self._partition
+
+    @property
+    def iteration(self) -> int:
+        """Returns the number of updates run so far.
+
+        Returns:
+            int: The number of updates.
+        """
+        return self._app.iteration
+
+    def run(self, max_iterations: int = 150):
+        """Runs the simulation until it ends, as ``App.run``.
+
+        Args:
+            max_iterations (int): The maximum number of updates.
+
+        Raises:
+            RuntimeError: If the spread of a region failed, or the
+                simulation was already run.
+        """
+        if self._ran:
+            raise RuntimeError("The simulation was already run.")
+
+        self._ran = True
+        self._app.run(max_iterations)
+
+    def summary(self) -> Dict[str, object]:
+        """Returns the results of the simulation, as ``App.summary``.
+
+        Raises:
+            RuntimeError: If the simulation has not been run yet.
+
+        Returns:
+            Dict[str, object]: The simulation time, the water spent, the
+                number of updates run and whether the fire was put out.
+        """
+        self._check_ran()
+
+        return self._app.summary()
+
+    @property
+    def paths(self) -> Dict[str, List[str]]:
+        """Returns the vertices visited by each truck, as ``App.paths``.
+
+        Raises:
+            RuntimeError: If the simulation has not been run yet.
+
+        Returns:
+            Dict[str, List[str]]: The vertex names visited by each truck,
+                by the id of the truck as a string.
+        """
+        self._check_ran()
+
+        return self._app.paths
+
+    def close(self):
+        """Stops the processes of the regions."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+
+            connection.close()
+
+        for process in self._processes:
+            process.join()
+
+        self._connections = []
+        self._processes = []
+
+    def _check_ran(self):
+        if not self._ran:
+            raise RuntimeError(
+                "You must run the process before retrieving results."
+            )
+
+    def _send(self, method: str, arguments: List[Tuple]):
+        """Calls a method of every region, with its own arguments, without
+        waiting for the results.
+
+        The calls are sent to every process at once, so the regions run at
+        the same time, and while this process goes on until ``_receive``.
+        """
+        if not self._connections:
+            self._sent = (method, arguments)
+            return
+
+        for connection, parameters in zip(self._connections, arguments):
+            connection.send((method, parameters))
+
+    def _receive(self) -> List:
+        """Waits for the results of the calls sent last by ``_send``."""
+        if not self._connections:
+            (method, arguments), self._sent = self._sent, None
+            results = []
+
+            for region, parameters in enumerate(arguments):
+                try:
+                    results.append(
+                        getattr(self._regions[region], method)(*parameters)
+                    )
+                except Exception as exception:
+                    raise RuntimeError(
+                        f"The region {region} failed: {type(exception).__name__}: {exception}"
+                    ) from exception
+
+            return results
+
+        replies = [connection.recv() for connection in self._connections]
+
+        for region, (succeeded, result) in enumerate(replies):
+            if not succeeded:
+                raise RuntimeError(f"The region {region} failed: {result}")
+
+        return [result for _, result in replies]
+
+    def _hop(self) -> List[str]:
+        """Spreads the next hop of the fire over the regions.
+
+        The hop after it is sent right away, so the regions spread it while
+        the trucks run.
+
+        Returns:
+            List[str]: The layer of the hop, in the order of the vertices of
+                the map, or an empty list once the fire stopped spreading.
+        """
+        if not self._spreading:
+            self._send_hop()
+
+        replies = self._receive()
+        self._outboxes = [outbox for outbox, _ in replies]
+        layer = list(
+            heapq.merge(
+                *(front for _, front in replies), key=self._rank.__getitem__
+            )
+        )
+        self._spreading = len(layer) > 0
+
+        if self._spreading:
+            self._send_hop()
+
+        return layer
+
+    def _send_hop(self):
+        """Sends the halo of the last hop to the regions, to spread the
+        next one."""
+        inboxes: List[List[str]] = [[] for _ in self._partition.regions]
+
+        for outbox in self._outboxes:
+            for region, vertices in outbox.items():
+                inboxes[region].extend(vertices)
+
+        self._send("spread", [(inbox,) for inbox in inboxes])
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f"PartitionedSimulation({len(self._partition)})"
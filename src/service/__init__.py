@@ -0,0 +1,7 @@
+from service.server import SimulationService
+from service.client import SimulationClient
+
+__all__ = [
+    "SimulationService",
+    "SimulationClient",
+]
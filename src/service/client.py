@@ -0,0 +1,192 @@
+import http.client
+import json
+import socket
+from typing import Dict, List, Self, Tuple
+
+from app import App
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix socket."""
+
+    def __init__(self, path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class SimulationClient:
+    """Sends requests to a ``SimulationService``.
+
+    The connection is kept open between requests and reopened if the
+    service closed it.
+
+    Example:
+        >>> client = SimulationClient(("127.0.0.1", 8000))
+        >>> client.simulate("grid", "A1", ["B2", "C3"], ["D4"])
+        {'time': 12, 'water': 45, 'iterations': 12, 'put_out': True, ...}
+    """
+
+    def __init__(
+        self, address: Tuple[str, int] | str, timeout: float | None = None
+    ):
+        """Initializes a client of a service.
+
+        Args:
+            address (Tuple[str, int] | str): The host and port of the
+                service, or the path of its Unix socket.
+            timeout (float, optional): The socket timeout, in seconds.
+        """
+        self._address = address
+        self._timeout = timeout
+        self._connection: http.client.HTTPConnection | None = None
+
+    def health(self) -> Dict[str, object]:
+        """Returns the load of the service.
+
+        Returns:
+            Dict[str, object]: The workers, the requests in progress and the
+                requests accepted at most.
+        """
+        return self._request("GET", "/health")
+
+    def maps(self) -> Dict[str, int]:
+        """Returns the maps served.
+
+        Returns:
+            Dict[str, int]: The number of vertices of each map, by name.
+        """
+        return self._request("GET", "/maps")
+
+    def vertices(self, map: str) -> List[str]:
+        """Returns the vertices of a map.
+
+        Args:
+            map (str): The name of the map.
+
+        Raises:
+            ValueError: If the map is not served.
+
+        Returns:
+            List[str]: The sorted vertex names.
+        """
+        return self._request("GET", f"/maps/{map}")["vertices"]
+
+    def simulate(
+        self,
+        map: str,
+        fire_start_vertex: str,
+        firefighters_position: List[str],
+        water_sources_position: List[str] | None = None,
+        water_per_vertex: float = 15,
+        water_needed_extinguish_fire: Dict[str, float] | None = None,
+        fire_truck_water_volume: float = 150,
+        max_iterations: int = 150,
+        mode: str = App.TICK,
+        paths: bool = False,
+    ) -> Dict[str, object]:
+        """Runs a simulation in the service.
+
+        Args:
+            map (str): The name of the map.
+            fire_start_vertex (str): The vertex where the fire starts.
+            firefighters_position (List[str]): The firefighter posts.
+            water_sources_position (List[str], optional): The water sources.
+            water_per_vertex (float): The water needed to put out the fire
+                in a vertex.
+            water_needed_extinguish_fire (Dict[str, float], optional): The
+                water needed by the vertices that differ from
+                ``water_per_vertex``.
+            fire_truck_water_volume (float): The tank capacity of the trucks.
+            max_iterations (int): The maximum number of updates.
+            mode (str): The time advance mode, as in ``App.advance``.
+            paths (bool): If true, the results include the truck paths.
+
+        Raises:
+            ValueError: If the request is invalid or the map is not served.
+            RuntimeError: If the service is busy or the simulation failed.
+
+        Returns:
+            Dict[str, object]: The results returned by
+                ``SimulationService.simulate``.
+        """
+        return self._request(
+            "POST",
+            "/simulate",
+            {
+                "map": map,
+                "fire_start_vertex": fire_start_vertex,
+                "firefighters_position": firefighters_position,
+                "water_sources_position": water_sources_position or [],
+                "water_per_vertex": water_per_vertex,
+                "water_needed_extinguish_fire": (
+                    water_needed_extinguish_fire or {}
+                ),
+                "fire_truck_water_volume": fire_truck_water_volume,
+                "max_iterations": max_iterations,
+                "mode": mode,
+                "paths": paths,
+            },
+        )
+
+    def close(self):
+        """Closes the connection to the service."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            if isinstance(self._address, str):
+                self._connection = _UnixConnection(
+                    self._address, self._timeout
+                )
+            else:
+                host, port = self._address
+                self._connection = http.client.HTTPConnection(
+                    host, port, timeout=self._timeout
+                )
+
+        return self._connection
+
+    def _request(
+        self, method: str, route: str, body: Dict[str, object] | None = None
+    ) -> Dict[str, object]:
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data else {}
+
+        for attempt in range(2):
+            connection = self._connect()
+
+            try:
+                connection.request(method, route, data, headers)
+                response = connection.getresponse()
+                result = json.loads(response.read())
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # the service closed the kept connection, retry on a new one
+                self.close()
+
+                if attempt:
+                    raise
+
+        if response.status in (400, 404):
+            raise ValueError(result["error"])
+
+        if response.status != 200:
+            raise RuntimeError(result["error"])
+
+        return result
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f"SimulationClient({self._address})"
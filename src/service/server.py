@@ -0,0 +1,541 @@
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError,
+)
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, List, Self, Tuple
+
+from app import App
+from graphs import Graph, PathCache
+
+# maps preprocessed by ``_load`` in each worker process
+_maps: Dict[str, Tuple[Graph, PathCache]] = {}
+
+
+def _load(
+    maps: Dict[str, Graph], precompute: bool
+) -> Dict[str, Tuple[Graph, PathCache]]:
+    """Preprocesses the maps of a worker.
+
+    Args:
+        maps (Dict[str, Graph]): The maps, by name.
+        precompute (bool): If true, the shortest path tree of every vertex
+            is computed ahead of the requests.
+
+    Returns:
+        Dict[str, Tuple[Graph, PathCache]]: Each map and its search trees.
+    """
+    for name, map in maps.items():
+        paths = PathCache(map)
+
+        if precompute:
+            paths.prefetch(map.vertices)
+
+        _maps[name] = (map, paths)
+
+    return _maps
+
+
+def _ready(worker: int) -> int:
+    """Returns the process id of a worker, once it loaded the maps."""
+    return os.getpid()
+
+
+def _simulate(
+    request: Dict[str, object],
+    maps: Dict[str, Tuple[Graph, PathCache]] | None = None,
+) -> Dict[str, object]:
+    """Runs the simulation of a request on a preprocessed map.
+
+    Args:
+        request (Dict[str, object]): The request, as validated by
+            ``SimulationService.parse``.
+        maps (Dict[str, Tuple[Graph, PathCache]], optional): The maps of
+            the worker. Defaults to the ones loaded in the process.
+
+    Returns:
+        Dict[str, object]: The results of the simulation.
+    """
+    map, paths = (_maps if maps is None else maps)[request["map"]]
+    names = map.registry.names if map.registry is not None else map.vertices
+    water = request["water_per_vertex"]
+    water_per_vertex = {vertex: water for vertex in names}
+    water_per_vertex.update(request["water_needed_extinguish_fire"])
+
+    start = time.perf_counter()
+    app = App(
+        map,
+        request["fire_start_vertex"],
+        request["firefighters_position"],
+        request["water_sources_position"],
+        water_per_vertex,
+        request["fire_truck_water_volume"],
+        verbose=0,
+        paths=paths,
+    )
+    app.run(request["max_iterations"], request["mode"])
+
+    result = app.summary()
+    result["elapsed"] = time.perf_counter() - start
+
+    if request["paths"]:
+        result["paths"] = app.paths
+
+    return result
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers the requests of a ``SimulationService``.
+
+    Every response is a JSON object. Errors carry an ``error`` message,
+    with status 400 for invalid requests, 404 for unknown maps or routes,
+    503 when the request queue is full or its worker process died, and 504
+    when a simulation timed out.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "SimulationService"
+    service: "SimulationService"
+
+    def do_GET(self):
+        route = self.path.rstrip("/").split("/")[1:]
+
+        if route == ["health"]:
+            self._send(200, self.service.health())
+
+        elif route == ["maps"]:
+            self._send(200, self.service.maps())
+
+        elif len(route) == 2 and route[0] == "maps":
+            try:
+                self._send(200, {"vertices": self.service.vertices(route[1])})
+            except KeyError:
+                self._send(404, {"error": f"'{route[1]}' is not a map."})
+
+        else:
+            self._send(404, {"error": f"'{self.path}' is not a route."})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if self.path.rstrip("/") != "/simulate":
+            self._send(404, {"error": f"'{self.path}' is not a route."})
+            return
+
+        try:
+            request = self.service.parse(json.loads(body or b"{}"))
+        except KeyError as error:
+            self._send(404, {"error": error.args[0]})
+            return
+        except (ValueError, TypeError) as error:
+            self._send(400, {"error": str(error)})
+            return
+
+        try:
+            self._send(200, self.service.simulate(request))
+        except BlockingIOError as error:
+            self._send(503, {"error": str(error)}, {"Retry-After": "1"})
+        except BrokenProcessPool:
+            self._send(
+                503,
+                {"error": "The worker process died, retry the request."},
+                {"Retry-After": "1"},
+            )
+        except TimeoutError:
+            self._send(504, {"error": "The simulation timed out."})
+        except ValueError as error:
+            self._send(400, {"error": str(error)})
+        except Exception as error:
+            self._send(500, {"error": f"{type(error).__name__}: {error}"})
+
+    def _send(
+        self,
+        status: int,
+        body: Dict[str, object],
+        headers: Dict[str, str] | None = None,
+    ):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # the clients of a Unix socket have no address
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+class SimulationService:
+    """Serves simulations over maps preprocessed once, through HTTP.
+
+    The maps are loaded once by each worker, which keeps their search trees
+    warm across requests, so a request only pays for its own simulation.
+    Simulations run in a pool of worker processes, or threads, behind a
+    bounded queue: when every worker is busy and ``queue_size`` requests
+    are already waiting, new requests are rejected with status 503 instead
+    of piling up. When a worker process dies, the requests it was running
+    fail with status 503 and the pool is started again, loading the maps
+    anew. The service listens on a localhost TCP address or on a Unix
+    socket, given as a path.
+
+    Routes:
+        ``GET /health``: the workers and the requests in progress.
+        ``GET /maps``: the number of vertices of each map.
+        ``GET /maps/<name>``: the vertices of a map.
+        ``POST /simulate``: runs the simulation described by a JSON object
+        with the fields of ``REQUEST``, where ``map``,
+        ``fire_start_vertex`` and ``firefighters_position`` are required.
+
+    Example:
+        >>> with SimulationService({"grid": map}).start() as service:
+        ...     client = SimulationClient(service.address)
+        ...     client.simulate("grid", "A1", ["B2"], ["C3"])
+    """
+
+    # the fields of a simulation request and their defaults
+    REQUEST = {
+        "map": None,
+        "fire_start_vertex": None,
+        "firefighters_position": None,
+        "water_sources_position": [],
+        "water_per_vertex": 15,
+        "water_needed_extinguish_fire": {},
+        "fire_truck_water_volume": 150,
+        "max_iterations": 150,
+        "mode": App.TICK,
+        "paths": False,
+    }
+
+    def __init__(
+        self,
+        maps: Dict[str, Graph],
+        address: Tuple[str, int] | str = ("127.0.0.1", 0),
+        workers: int | None = None,
+        queue_size: int = 16,
+        processes: bool = True,
+        precompute: bool = False,
+        timeout: float | None = None,
+    ):
+        """Initializes a service and binds its address.
+
+        Args:
+            maps (Dict[str, Graph]): The maps served, by name.
+            address (Tuple[str, int] | str): The host and port to listen
+                on, where port 0 picks a free one, or the path of a Unix
+                socket.
+            workers (int, optional): The number of workers. Defaults to the
+                number of CPUs.
+            queue_size (int): The number of requests that may wait for a
+                free worker.
+            processes (bool): If true, the workers are processes, each
+                holding its own copy of the maps. Otherwise they are threads
+                sharing the maps of the service.
+            precompute (bool): If true, the shortest path tree of every
+                vertex is computed when a worker starts, which takes memory
+                quadratic in the number of vertices.
+            timeout (float, optional): The time in seconds a request waits
+                for its simulation before failing with status 504.
+
+        Raises:
+            ValueError: If there is no map or a size is not positive.
+        """
+        if not maps:
+            raise ValueError("The service needs at least one map.")
+
+        workers = workers or os.cpu_count() or 1
+
+        if workers <= 0 or queue_size < 0:
+            raise ValueError(
+                "The number of workers must be positive and the queue size can not be negative."
+            )
+
+        self._maps = maps
+        self._workers = workers
+        self._precompute = precompute
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._capacity = workers + queue_size
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._warm: Dict[str, Tuple[Graph, PathCache]] | None = None
+        self._executor: Executor
+
+        if processes:
+            self._executor = self._process_pool()
+        else:
+            self._warm = {
+                name: (map, PathCache(map)) for name, map in maps.items()
+            }
+
+            if precompute:
+                for map, paths in self._warm.values():
+                    paths.prefetch(map.vertices)
+
+            self._executor = ThreadPoolExecutor(workers)
+
+        handler = type(
+            "Handler",
+            (_Handler,),
+            {
+                "service": self,
+                # headers and body are written apart, do not wait to merge
+                # them on TCP
+                "disable_nagle_algorithm": not isinstance(address, str),
+            },
+        )
+
+        if isinstance(address, str):
+            # a socket left behind by a previous service is replaced
+            if os.path.exists(address) and stat.S_ISSOCK(
+                os.stat(address).st_mode
+            ):
+                os.unlink(address)
+
+            self._server = _UnixHTTPServer(address, handler)
+        else:
+            self._server = ThreadingHTTPServer(address, handler)
+            self._server.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int] | str:
+        """Returns the address the service listens on.
+
+        Returns:
+            Tuple[str, int] | str: The host and port, or the socket path.
+        """
+        if self._server.address_family == socket.AF_UNIX:
+            return self._server.server_address
+
+        return self._server.server_address[:2]
+
+    def maps(self) -> Dict[str, int]:
+        """Returns the maps served.
+
+        Returns:
+            Dict[str, int]: The number of vertices of each map, by name.
+        """
+        return {name: len(map.vertices) for name, map in self._maps.items()}
+
+    def vertices(self, name: str) -> List[str]:
+        """Returns the vertices of a map.
+
+        Args:
+            name (str): The name of the map.
+
+        Raises:
+            KeyError: If the map is not served.
+
+        Returns:
+            List[str]: The sorted vertex names.
+        """
+        map = self._maps[name]
+
+        if map.registry is not None:
+            return list(map.registry.names)
+
+        return sorted(map.vertices)
+
+    def health(self) -> Dict[str, object]:
+        """Returns the load of the service.
+
+        Returns:
+            Dict[str, object]: The number of workers, of requests in
+                progress or waiting, and of requests accepted at most.
+        """
+        return {
+            "workers": self._workers,
+            "pending": self._pending,
+            "capacity": self._capacity,
+        }
+
+    def parse(self, body: object) -> Dict[str, object]:
+        """Validates a simulation request and fills in its defaults.
+
+        Args:
+            body (object): The decoded JSON body of the request.
+
+        Raises:
+            KeyError: If the map is not served.
+            ValueError: If a field is unknown, missing or invalid.
+
+        Returns:
+            Dict[str, object]: The complete request.
+        """
+        if not isinstance(body, dict):
+            raise ValueError("The request must be a JSON object.")
+
+        for field in body:
+            if field not in SimulationService.REQUEST:
+                raise ValueError(f"'{field}' is not a request field.")
+
+        request = {**SimulationService.REQUEST, **body}
+
+        for field in SimulationService.REQUEST:
+            if request[field] is None:
+                raise ValueError(f"The request needs a '{field}'.")
+
+        if request["map"] not in self._maps:
+            raise KeyError(f"'{request['map']}' is not a map.")
+
+        if request["mode"] not in (App.TICK, App.EVENT):
+            raise ValueError(
+                f"'{request['mode']}' is not a valid time advance mode."
+            )
+
+        if not isinstance(request["firefighters_position"], list) or not (
+            isinstance(request["water_sources_position"], list)
+        ):
+            raise ValueError("The positions must be lists of vertices.")
+
+        if not isinstance(request["water_needed_extinguish_fire"], dict):
+            raise ValueError(
+                "The water_needed_extinguish_fire must map vertices to liters."
+            )
+
+        return request
+
+    def simulate(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Runs a request in the worker pool and waits for its results.
+
+        Args:
+            request (Dict[str, object]): The request returned by ``parse``.
+
+        Raises:
+            BlockingIOError: If the request queue is full.
+            BrokenProcessPool: If a worker process died, in which case the
+                pool is replaced for the next requests.
+            TimeoutError: If the simulation took longer than the timeout.
+            ValueError: If a vertex is not in the map or a value is invalid.
+
+        Returns:
+            Dict[str, object]: The simulation time, the water spent, the
+                number of updates, whether the fire was put out, the time
+                spent running it and, if requested, the truck paths.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise BlockingIOError("The request queue is full.")
+
+        with self._lock:
+            self._pending += 1
+
+        executor = self._executor
+
+        try:
+            future = executor.submit(_simulate, request, self._warm)
+        except BaseException as error:
+            self._release(None)
+
+            if isinstance(error, BrokenProcessPool):
+                self._restart(executor)
+
+            raise
+
+        # the slot is held until the worker is done, even after a timeout
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(self._timeout)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """Creates a pool of worker processes that load the maps."""
+        return ProcessPoolExecutor(
+            self._workers,
+            initializer=_load,
+            initargs=(self._maps, self._precompute),
+        )
+
+    def _restart(self, broken: Executor):
+        """Replaces a process pool broken by a worker that died.
+
+        The requests failing together on the same pool replace it once.
+
+        Args:
+            broken (Executor): The pool the request failed on.
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+
+            self._executor = self._process_pool()
+
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future: Future | None):
+        with self._lock:
+            self._pending -= 1
+
+        self._slots.release()
+
+    def start(self) -> Self:
+        """Starts the workers and serves requests in a background thread.
+
+        Returns:
+            SimulationService: The service itself.
+        """
+        self._warm_up()
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+        return self
+
+    def serve_forever(self):
+        """Starts the workers and serves requests until ``close``."""
+        self._warm_up()
+        self._server.serve_forever()
+
+    def _warm_up(self):
+        """Starts every worker, so they load the maps before any request."""
+        list(self._executor.map(_ready, range(self._workers)))
+
+    def close(self):
+        """Stops serving and shuts the workers down."""
+        if self._thread is not None:
+            self._server.shutdown()
+
+        self._server.server_close()
+        self._executor.shutdown(cancel_futures=True)
+
+        if self._server.address_family == socket.AF_UNIX:
+            try:
+                os.unlink(self._server.server_address)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f"SimulationService({self.address}, {self._workers})"
@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+import pytest
+
+import analysis.sweep
+from analysis import PostPlacement, RouteBenchmark, SpreadEnsemble, Sweep
+from app import App
+from graphs import Graph, PathCache, a_star
+from maps import generate_map
+
+
+def line(size: int) -> Graph:
+    names = [f"V{i:02d}" for i in range(size)]
+
+    return Graph([(a, b, 1) for a, b in zip(names, names[1:])])
+
+
+def water(map: Graph) -> dict:
+    return {vertex: 5 for vertex in map.vertices}
+
+
+def test_sweep_on_interned_map_matches_plain_map():
+    plain = line(12)
+    interned = line(12).interned()
+    grid = {"firefighters_position": [["V11", "V06"]], "trucks": [1, 2]}
+
+    results = [
+        Sweep(map, "V00", water(plain), ["V09"]).run(grid, compare=False)
+        for map in (plain, interned)
+    ]
+
+    assert [run[:5] for run in results[0].runs] == [
+        run[:5] for run in results[1].runs
+    ]
+    assert all(run.water > 0 for run in results[1].runs)
+
+
+def test_placement_on_interned_map_returns_names():
+    map = line(12)
+    plain = PostPlacement(map, seed=1).optimise(2)
+    interned = PostPlacement(map.interned(), seed=1).optimise(2)
+
+    # ties between posts may be broken differently, but not the cost
+    assert interned.cost == pytest.approx(plain.cost)
+    assert set(interned.posts) <= set(map.vertices)
+    assert all(
+        isinstance(post, str)
+        for posts, _ in interned.candidates
+        for post in posts
+    )
+
+
+def test_sweep_records_failed_configuration_and_goes_on(monkeypatch):
+    class FailingApp(App):
+        def run(self, max_iterations=150, mode=App.TICK):
+            # like the updates of a large map running out of stack
+            if self._fire_truck_volume == 13:
+                raise RecursionError("maximum recursion depth exceeded")
+
+            super().run(max_iterations, mode)
+
+    monkeypatch.setattr(analysis.sweep, "App", FailingApp)
+    map = line(12)
+    grid = {
+        "firefighters_position": [["V11", "V06"]],
+        "fire_truck_water_volume": [13, 150],
+    }
+
+    result = Sweep(map, "V00", water(map), ["V09"]).run(grid)
+
+    assert [run.failed for run in result.runs] == [True, False]
+    assert result.failed == result.runs[:1]
+    assert result.runs[0].error == (
+        "RecursionError: maximum recursion depth exceeded"
+    )
+    assert result.runs[1].iterations > 0
+    assert "failed runs: 1" in result.table()
+    assert result.speedup is None
+
+
+def test_route_benchmark_tolerates_rounding():
+    names = [f"V{i:02d}" for i in range(12)]
+    map = Graph(
+        [
+            (a, b, 0.1 * (i + 1))
+            for i, (a, b) in enumerate(zip(names, names[1:]))
+        ]
+    )
+
+    def reversed_sum(origin, destination):
+        # the same path, with its weights added in the other order
+        _, path, settled = a_star(map, origin, destination)
+        weights = [map.weight(a, b) for a, b in zip(path, path[1:])]
+
+        return sum(reversed(weights)), path, settled
+
+    def longer(origin, destination):
+        distance, path, settled = a_star(map, origin, destination)
+
+        return distance + 0.5, path, settled
+
+    benchmark = RouteBenchmark(map, queries=50, seed=3)
+    result = benchmark.run({"reversed": reversed_sum})
+
+    assert [run.search for run in result.runs] == ["dijkstra", "reversed"]
+
+    with pytest.raises(RuntimeError, match="'longer' found"):
+        benchmark.run({"longer": longer})
+
+
+def test_infinite_spread_gives_the_fire_layers():
+    map = generate_map(6)
+    # a component the fire never reaches
+    map.add_edge("X", "Y", 1)
+    hops = {
+        vertex: hop
+        for hop, vertices in PathCache(map).layers("J1").items()
+        for vertex in vertices
+        if hop < math.inf
+    }
+    expected = [hops.get(vertex, -1) for vertex in sorted(map.vertices)]
+
+    result = SpreadEnsemble(map, math.inf).run("J1", 4, seed=0)
+
+    assert result.vertices == sorted(map.vertices)
+    assert result.arrival.tolist() == [expected] * 4
+
+
+def test_arrival_distribution_adds_up_to_burn_probability():
+    map = generate_map(6)
+    result = SpreadEnsemble(map, 0.7, burn_time=2).run("J1", 300, seed=5)
+    probability = result.burn_probability()
+
+    assert 0 < min(probability.values()) < max(probability.values()) == 1
+
+    for vertex in result.vertices:
+        distribution = result.arrival_distribution(vertex)
+
+        assert distribution.sum() == pytest.approx(probability[vertex])
+
+
+def test_ensemble_seed_gives_the_same_result():
+    ensemble = SpreadEnsemble(generate_map(6), 0.7, burn_time=2)
+    first = ensemble.run("J1", 200, seed=11)
+
+    assert np.array_equal(
+        first.arrival, ensemble.run("J1", 200, seed=11).arrival
+    )
+    assert not np.array_equal(
+        first.arrival, ensemble.run("J1", 200, seed=12).arrival
+    )
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from app import App
+from graphs import Graph
+from logs import History, MemoryReport
+from maps import generate_map
+
+LOG = os.path.join("output", "simulation.txt")
+
+
+@pytest.fixture(autouse=True)
+def output(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("output")
+
+
+def water(map: Graph) -> dict:
+    return {vertex: 5 for vertex in map.vertices}
+
+
+def line(size: int, weight: float) -> Graph:
+    names = [f"V{i:02d}" for i in range(size)]
+
+    return Graph([(a, b, weight) for a, b in zip(names, names[1:])])
+
+
+def take_log() -> str:
+    """Returns the log written so far and removes it, as it is appended to."""
+    with open(LOG, encoding="utf-8") as file:
+        log = file.read()
+
+    os.remove(LOG)
+
+    return log
+
+
+def simulate(map: Graph, mode: str, *args) -> tuple:
+    """Runs an app in a mode, returning everything it outputs."""
+    history = History(interval=3, output_file=None)
+    app = App(map, *args, water(map), verbose=1, history=history)
+    app.run(150, mode)
+
+    return (
+        take_log(),
+        app.summary(),
+        app.paths,
+        history.export(),
+        list(history.states(history.first, history.last)),
+    )
+
+
+@pytest.mark.parametrize(
+    "map, args",
+    [
+        # heavy edges, so trucks travel for several idle updates at once
+        (lambda: line(12, 4), ("V00", ["V11", "V08"], ["V10"])),
+        (lambda: generate_map(6), ("J1", ["A1", "F2"], ["C1"])),
+    ],
+)
+def test_event_mode_matches_tick_mode(map, args):
+    assert simulate(map(), App.EVENT, *args) == simulate(
+        map(), App.TICK, *args
+    )
+
+
+def test_snapshot_resumes_the_same_simulation():
+    map = generate_map(6)
+    args = ("J1", ["A1", "F2"], ["C1"], water(map))
+
+    app = App(map, *args)
+    app.run(150)
+    expected = take_log(), app.summary(), app.paths
+
+    first = App(map, *args)
+    first.advance(10)
+    snapshot = first.snapshot()
+
+    # other simulations running meanwhile do not share the log state
+    App(map, *args, verbose=0).run(150)
+    resumed = App.from_snapshot(map, snapshot)
+    resumed.run(150)
+
+    assert (take_log(), resumed.summary(), resumed.paths) == expected
+    assert first.snapshot().logs == snapshot.logs
+
+
+@pytest.mark.parametrize("mode", [App.TICK, App.EVENT])
+def test_memory_report_is_saved_with_every_component(mode):
+    map = generate_map(6)
+    report = MemoryReport(interval=4)
+    app = App(map, "J1", ["A1", "F2"], ["C1"], water(map), memory=report)
+    app.run(150, mode)
+    app.results()
+
+    with open(os.path.join("output", "memory.json"), encoding="utf-8") as file:
+        saved = json.load(file)
+
+    components = {"map", "search", "fleet", "fire", "events", "logs"}
+    samples = saved["samples"]
+    iterations = [sample["iteration"] for sample in samples]
+    gaps = [b - a for a, b in zip(iterations, iterations[1:])]
+
+    assert saved == json.loads(json.dumps(report.to_dict()))
+    assert saved["interval"] == 4
+    assert set(saved["peaks"]) == components | {"traced"}
+    assert all(set(sample["components"]) == components for sample in samples)
+    assert all(min(sample["components"].values()) > 0 for sample in samples)
+    assert iterations[0] == 0 and iterations[-1] == app.iteration
+    assert min(gaps) > 0
+
+    # the last sample is taken at the end, whenever the simulation ends
+    if mode == App.TICK:
+        assert gaps[:-1] == [4] * (len(gaps) - 1) and gaps[-1] <= 4
+    else:
+        # a sample due during skipped updates is taken after them
+        assert all(gap >= 4 for gap in gaps[:-1])
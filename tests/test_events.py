@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app import App
+from events import Event, EventStream
+from graphs import Graph
+from maps import generate_map
+
+
+def water(map: Graph) -> dict:
+    return {vertex: 5 for vertex in map.vertices}
+
+
+def fire(vertex: str) -> Event:
+    return Event(Event.ON_GET_FIRE, vertex)
+
+
+def move(truck: int, vertex: str) -> Event:
+    return Event(Event.ON_MOVE, vertex, truck)
+
+
+async def produce(stream: EventStream, items: list, error=None) -> list:
+    """Sends items through a stream while reading them, returning what the
+    consumer read, or the error it got."""
+    for item in items:
+        stream.publish(item)
+
+    async def close():
+        await stream.flush()
+        await stream.close(error)
+
+    producer = asyncio.create_task(close())
+    # lets the producer fill the stream before the consumer reads
+    await asyncio.sleep(0)
+    read = []
+
+    try:
+        async for item in stream:
+            read.append(item)
+    except Exception as exception:
+        read.append(exception)
+
+    await producer
+
+    return read
+
+
+def targets(items: list) -> list:
+    return [item.target for item in items]
+
+
+def test_block_waits_for_the_consumer():
+    async def main():
+        stream = EventStream(2)
+
+        for vertex in ("A1", "A2", "A3"):
+            stream.publish(fire(vertex))
+
+        flush = asyncio.create_task(stream.flush())
+        await asyncio.sleep(0)
+
+        assert not flush.done() and len(stream) == 2
+
+        assert (await stream.get()).target == "A1"
+        await flush
+
+        return stream
+
+    stream = asyncio.run(main())
+
+    assert len(stream) == 2
+    assert stream.dropped == 0
+
+
+def test_drop_oldest_discards_the_oldest_items():
+    stream = EventStream(2, EventStream.DROP_OLDEST)
+    events = [fire(vertex) for vertex in ("A1", "A2", "A3", "A4")]
+
+    assert targets(asyncio.run(produce(stream, events))) == ["A3", "A4"]
+    assert stream.dropped == 2
+
+
+def test_coalesce_never_discards_ignitions():
+    stream = EventStream(2, EventStream.COALESCE)
+    events = [fire(vertex) for vertex in ("A1", "A2", "A3", "A4")]
+
+    assert targets(asyncio.run(produce(stream, events))) == [
+        "A1",
+        "A2",
+        "A3",
+        "A4",
+    ]
+    assert stream.dropped == 0
+
+
+def test_coalesce_merges_and_discards_truck_events():
+    stream = EventStream(2, EventStream.COALESCE)
+    events = [fire("A1"), move(0, "B1"), move(0, "B2"), fire("A2")]
+
+    # the second move replaces the first, then makes room for the fire
+    assert targets(asyncio.run(produce(stream, events))) == ["A1", "A2"]
+    assert stream.dropped == 2
+
+    stream = EventStream(3, EventStream.COALESCE)
+    events = [move(0, "B1"), move(1, "C1"), move(0, "B2")]
+
+    assert targets(asyncio.run(produce(stream, events))) == ["B2", "C1"]
+    assert stream.dropped == 1
+
+
+def test_error_reaches_the_consumer_after_pending_items():
+    stream = EventStream(4)
+    read = asyncio.run(produce(stream, [fire("A1")], ValueError("stopped")))
+
+    assert read[0].target == "A1"
+    assert isinstance(read[1], ValueError) and str(read[1]) == "stopped"
+
+
+def test_invalid_stream_is_rejected():
+    with pytest.raises(ValueError, match="greater than zero"):
+        EventStream(0)
+
+    with pytest.raises(ValueError, match="not a backpressure policy"):
+        EventStream(policy="skip")
+
+
+def simulation() -> App:
+    map = generate_map(6)
+
+    return App(map, "J1", ["A1", "F2"], ["C1"], water(map), verbose=0)
+
+
+async def read(stream) -> list:
+    return [item async for item in stream]
+
+
+def test_stream_of_deltas_matches_steps():
+    app = simulation()
+    steps = list(app.iter_steps())
+
+    streamed = simulation()
+    deltas = asyncio.run(read(streamed.stream(deltas=True, maxsize=1)))
+
+    assert deltas == steps
+    assert streamed.summary() == app.summary()
+
+
+def test_coalesced_stream_keeps_every_ignition():
+    app = simulation()
+    events = asyncio.run(read(app.stream()))
+
+    coalesced = simulation()
+    kept = asyncio.run(
+        read(coalesced.stream(maxsize=2, policy=EventStream.COALESCE))
+    )
+
+    def ignited(events):
+        return [e.target for e in events if e.type == Event.ON_GET_FIRE]
+
+    assert ignited(kept) == ignited(events)
+    assert len(kept) < len(events)
+    assert coalesced.summary() == app.summary()
@@ -0,0 +1,569 @@
+import math
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from graphs import (
+    ContractionHierarchy,
+    DynamicShortestPaths,
+    Graph,
+    LandmarkIndex,
+    PathCache,
+    SharedGraph,
+    bidirectional_dijkstra,
+    dijkstra_distances,
+    dijkstra_tree,
+)
+from maps import generate_map
+
+
+def grid(size: int, seed: int | None = None) -> Graph:
+    """Builds a size x size grid, with random weights if seeded."""
+    rng = random.Random(seed)
+    edges = []
+
+    for row in range(size):
+        for column in range(size):
+            vertex = (row, column)
+
+            if column + 1 < size:
+                edges.append((vertex, (row, column + 1)))
+            if row + 1 < size:
+                edges.append((vertex, (row + 1, column)))
+
+    return Graph(
+        [
+            (f"{a}", f"{b}", rng.randint(1, 9) if seed is not None else 1)
+            for a, b in edges
+        ]
+    )
+
+
+def random_graph(size: int, seed: int, directed: bool) -> Graph:
+    """Builds a sparse graph with random weights, which may be disconnected."""
+    rng = random.Random(seed)
+    names = [f"V{i:03d}" for i in range(size)]
+    edges = []
+
+    while len(edges) < 2 * size:
+        origin, destination = rng.sample(names, 2)
+        edges.append((origin, destination, rng.randint(1, 9)))
+
+    return Graph.from_edges(edges, directed=directed)
+
+
+def assert_path(map: Graph, path, origin: str, destination: str, distance):
+    """Checks a path follows edges of the map and has the given length."""
+    assert path[0] == origin and path[-1] == destination
+    assert sum(
+        map.weight(vertex, next) for vertex, next in zip(path, path[1:])
+    ) == pytest.approx(distance)
+
+
+def assert_matches_dijkstra(map: Graph, origin: str, distances, predecessors):
+    expected, _ = dijkstra_tree(map, origin)
+
+    assert {v: d for v, d in distances.items() if d < math.inf} == {
+        v: d for v, d in expected.items() if d < math.inf
+    }
+
+    for vertex, predecessor in predecessors.items():
+        if predecessor is not None:
+            assert distances[vertex] == (
+                distances[predecessor] + map.weight(predecessor, vertex)
+            )
+
+
+def test_interned_map_only_takes_ids_of_its_registry():
+    plain = Graph()
+    plain.add_vertex(5)
+
+    assert plain.vertices == {5}
+
+    map = Graph([("A", "B", 1), ("B", "C", 2)]).interned()
+    map.remove_vertex(1)
+    map.add_vertex(1)
+    map.add_edge(0, 1, 3)
+
+    assert map.vertices == {0, 1, 2}
+    assert map.weight(0, 1) == 3
+
+    for vertices in (3, -1, "D", "A", [2, 7]):
+        with pytest.raises(ValueError, match="registry"):
+            map.add_vertex(vertices)
+
+    with pytest.raises(ValueError, match="registry"):
+        map.add_edge(0, 7, 1)
+
+    assert map.vertices == {0, 1, 2}
+    assert [vertex for vertex, _ in map.edges_list[0]] == [1]
+
+
+def test_shared_interned_map_keeps_ids_and_names():
+    map = generate_map(7, intern=True)
+    map.remove_vertex(map.registry.id("C2"))
+
+    with SharedGraph.publish(map) as shared:
+        assert shared.handle.interned
+        assert shared.vertices == map.vertices
+        assert shared.registry.names == map.registry.names
+
+        for vertex in map.vertices:
+            assert sorted(shared.edges_list[vertex]) == sorted(
+                map.edges_list[vertex]
+            )
+            assert shared.in_neighborhood(vertex) == map.in_neighborhood(
+                vertex
+            )
+
+        attached = pickle.loads(pickle.dumps(shared))
+
+        assert attached.vertices == map.vertices
+        assert dijkstra_distances(attached, 0) == dijkstra_distances(map, 0)
+        attached.close()
+
+
+def test_process_pool_searches_interned_map_in_shared_memory():
+    map = generate_map(5, intern=True)
+    origins = sorted(map.vertices)[:4]
+    expected = PathCache(map)
+
+    with ProcessPoolExecutor(2) as executor:
+        paths = PathCache(map, executor=executor)
+        paths.prefetch(origins)
+
+        assert isinstance(paths._search_graph(), SharedGraph)
+
+        for origin in origins:
+            assert paths.tree(origin)[0] == expected.tree(origin)[0]
+
+        paths.clear()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repair_after_vertex_removal_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    map = grid(8, seed)
+    origin = "(0, 0)"
+    tree = DynamicShortestPaths(map, origin)
+
+    for _ in range(3):
+        removed = rng.sample(sorted(map.vertices - {origin}), 5)
+        map.remove_vertices(removed)
+        tree.repair(vertices=removed)
+
+        assert_matches_dijkstra(map, origin, tree.distances, tree.predecessors)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repair_after_edge_removal_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    map = grid(8, seed)
+    origin = "(3, 3)"
+    tree = DynamicShortestPaths(map, origin)
+
+    for _ in range(3):
+        edges = rng.sample(
+            sorted(
+                (vertex, destination)
+                for vertex in map.vertices
+                for destination in map.neighborhood(vertex)
+            ),
+            8,
+        )
+
+        for vertex, destination in edges:
+            map.remove_edge(vertex, destination)
+
+        tree.repair(edges=edges)
+
+        assert_matches_dijkstra(map, origin, tree.distances, tree.predecessors)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_repair_after_weight_increase_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    map = grid(8, seed)
+    origins = ["(0, 0)", "(7, 7)", "(2, 5)"]
+    paths = PathCache(map)
+
+    for origin in origins:
+        paths.tree(origin)
+
+    for _ in range(3):
+        # heavier edges on the current paths, which must be repaired
+        edges = []
+
+        for origin in origins:
+            _, predecessors = paths.tree(origin)
+            vertex = rng.choice(sorted(v for v in predecessors if v != origin))
+            edges.append((predecessors[vertex], vertex))
+
+        paths.increase_weights(
+            (vertex, destination, map.weight(vertex, destination) + 5)
+            for vertex, destination in dict.fromkeys(edges)
+        )
+
+        for origin in origins:
+            assert_matches_dijkstra(map, origin, *paths.tree(origin))
+
+    assert paths.misses == len(origins)
+
+
+def test_remove_vertex_scales_with_in_degree():
+    small, large = grid(30), grid(300)
+
+    # the neighborhoods away from the removed vertex are left untouched
+    before = dict(large.edges_list)
+    large.remove_vertex("(150, 150)")
+    neighbors = {"(149, 150)", "(151, 150)", "(150, 149)", "(150, 151)"}
+
+    assert all(
+        large.edges_list[vertex] is before[vertex]
+        for vertex in large.vertices - neighbors
+    )
+
+    def removal_time(map: Graph, size: int) -> float:
+        vertices = [
+            f"({row}, {column})"
+            for row in range(1, size - 1, 3)
+            for column in range(1, size - 1, 3)
+        ][:50]
+        start = time.perf_counter()
+
+        for vertex in vertices:
+            map.remove_vertex(vertex)
+
+        return time.perf_counter() - start
+
+    # a cost linear in the vertices would be 100 times slower on the large
+    # grid, while every removed vertex has the same in-degree on both
+    assert removal_time(large, 300) < 10 * removal_time(small, 30)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_hierarchy_matches_dijkstra(seed, directed):
+    rng = random.Random(seed)
+    map = random_graph(60, seed, directed)
+    vertices = sorted(map.vertices)
+    hierarchy = ContractionHierarchy(map)
+
+    for origin in rng.sample(vertices, 5):
+        expected = dijkstra_distances(map, origin)
+
+        for destination in vertices:
+            distance = expected.get(destination, math.inf)
+            path = hierarchy.path(origin, destination)
+
+            assert hierarchy.distance(origin, destination) == distance
+
+            if math.isinf(distance):
+                assert path == []
+            else:
+                assert_path(map, path, origin, destination, distance)
+
+        candidates = rng.sample(vertices, 6)
+        nearest, distance = hierarchy.nearest(origin, candidates)
+
+        assert distance == min(expected.get(v, math.inf) for v in candidates)
+
+        if math.isinf(distance):
+            assert nearest is None
+        else:
+            assert expected[nearest] == distance
+
+
+def test_hierarchy_round_trip(tmp_path):
+    map = random_graph(60, 7, directed=True)
+    hierarchy = ContractionHierarchy(map)
+    path = tmp_path / "map.ch.npz"
+    hierarchy.save(str(path))
+
+    loaded = ContractionHierarchy.load(str(path), map)
+
+    assert loaded.vertices == hierarchy.vertices
+    assert loaded.shortcuts == hierarchy.shortcuts
+    assert loaded.matches(map)
+
+    for origin in hierarchy.vertices[:5]:
+        for destination in hierarchy.vertices:
+            assert loaded.path(origin, destination) == hierarchy.path(
+                origin, destination
+            )
+
+
+def test_hierarchy_of_other_map_is_rejected(tmp_path):
+    map = random_graph(30, 3, directed=False)
+    hierarchy = ContractionHierarchy(map)
+    path = tmp_path / "map.ch.npz"
+    hierarchy.save(str(path))
+
+    origin, (destination, weight) = next(
+        (vertex, neighborhood[0])
+        for vertex, neighborhood in sorted(map.edges_list.items())
+        if neighborhood
+    )
+    map.remove_edge(origin, destination)
+    map.add_edge(origin, destination, weight + 1)
+
+    assert not hierarchy.matches(map)
+
+    with pytest.raises(ValueError, match="different map"):
+        ContractionHierarchy.load(str(path), map)
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_landmark_bounds_never_exceed_distances(seed, directed):
+    rng = random.Random(seed)
+    map = random_graph(60, seed, directed)
+    landmarks = LandmarkIndex(map, 4)
+    paths = PathCache(map, landmarks=landmarks)
+
+    def assert_bounds(origins):
+        for origin in origins:
+            expected = dijkstra_distances(map, origin)
+
+            for destination in sorted(map.vertices):
+                distance = expected.get(destination, math.inf)
+
+                assert landmarks.lower_bound(origin, destination) <= distance
+                assert paths.distance(origin, destination) == distance
+
+    assert_bounds(rng.sample(sorted(map.vertices), 5))
+
+    # longer distances keep the bounds valid
+    paths.remove_vertices(rng.sample(sorted(map.vertices), 10))
+
+    assert paths.landmarks is landmarks
+    assert_bounds(rng.sample(sorted(map.vertices), 5))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_landmark_nearest_matches_tree_scan(seed):
+    rng = random.Random(seed)
+    map = random_graph(60, seed, directed=True)
+    landmarks = LandmarkIndex(map, 4)
+
+    for origin in rng.sample(sorted(map.vertices), 5):
+        distances, _ = dijkstra_tree(map, origin)
+        candidates = rng.sample(sorted(map.vertices), 6)
+        nearest, distance = landmarks.nearest(origin, candidates)
+
+        assert distance == min(distances[v] for v in candidates)
+
+        if math.isinf(distance):
+            assert nearest is None
+        else:
+            assert distances[nearest] == distance
+
+
+def test_every_component_gets_a_landmark():
+    components = [
+        [f"{label}{i}" for i in range(size)]
+        for label, size in (("A", 10), ("B", 3), ("C", 6))
+    ]
+    map = Graph(
+        [
+            (a, b, 1)
+            for vertices in components
+            for a, b in zip(vertices, vertices[1:])
+        ]
+    )
+
+    landmarks = LandmarkIndex(map, 3).landmarks
+
+    assert all(
+        any(landmark in vertices for landmark in landmarks)
+        for vertices in components
+    )
+
+
+@pytest.mark.parametrize(
+    "directed, symmetric", [(True, False), (False, False), (False, True)]
+)
+@pytest.mark.parametrize("duplicates", [Graph.MIN, Graph.KEEP])
+@pytest.mark.parametrize("seed", range(3))
+def test_bidirectional_matches_dijkstra(seed, duplicates, directed, symmetric):
+    rng = random.Random(seed)
+    names = [f"V{i:03d}" for i in range(40)]
+    edges = [(*rng.sample(names, 2), rng.randint(1, 9)) for _ in range(60)]
+    # parallel edges, so the backward search takes the lightest one
+    edges += [(a, b, w + rng.randint(-1, 1)) for a, b, w in edges[:20]]
+    # a component no other vertex reaches
+    edges.append(("X000", "X001", 1))
+    map = Graph.from_edges(edges, directed=directed, duplicates=duplicates)
+    unreachable = 0
+
+    for origin in rng.sample(sorted(map.vertices), 8):
+        expected = dijkstra_distances(map, origin)
+
+        for destination in sorted(map.vertices):
+            distance, path, settled = bidirectional_dijkstra(
+                map, origin, destination, symmetric
+            )
+
+            assert distance == expected.get(destination, math.inf)
+            assert settled >= 1
+
+            if math.isinf(distance):
+                assert path == []
+                unreachable += 1
+            else:
+                assert_path(map, path, origin, destination, distance)
+
+    assert unreachable > 0
+
+
+def test_bidirectional_follows_incoming_edges():
+    map = Graph.from_edges(
+        [("A", "B", 1), ("B", "C", 1), ("A", "C", 5)], directed=True
+    )
+
+    assert bidirectional_dijkstra(map, "A", "C")[:2] == (2, ["A", "B", "C"])
+    assert bidirectional_dijkstra(map, "C", "A")[:2] == (math.inf, [])
+    assert bidirectional_dijkstra(map, "B", "A")[:2] == (math.inf, [])
+
+
+@pytest.mark.parametrize("directed", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_bidirectional_cache_routes(seed, directed):
+    rng = random.Random(seed)
+    map = random_graph(60, seed, directed)
+    paths = PathCache(map, bidirectional=True)
+    vertices = sorted(map.vertices)
+    requests = [tuple(rng.sample(vertices, 2)) for _ in range(30)]
+    # a cached tree answers its origin instead
+    paths.tree(requests[0][0])
+
+    for (origin, destination), path in zip(requests, paths.routes(requests)):
+        distance = dijkstra_distances(map, origin).get(destination, math.inf)
+
+        assert paths.distance(origin, destination) == distance
+
+        if math.isinf(distance):
+            assert path == [destination]
+        else:
+            assert_path(map, path, origin, destination, distance)
+
+
+def structure(map: Graph) -> tuple:
+    """Returns the vertices, edges in order and in-edges of a map."""
+    return (
+        map.vertices,
+        list(map.edges_list.items()),
+        {vertex: map.in_neighborhood(vertex) for vertex in map.vertices},
+    )
+
+
+PARALLEL = [("A", "B", 3), ("B", "C", 1), ("A", "B", 2), ("B", "A", 5)]
+
+
+@pytest.mark.parametrize(
+    "duplicates, directed, expected",
+    [
+        (Graph.MIN, True, {"A": [("B", 2)], "B": [("C", 1), ("A", 5)]}),
+        (Graph.FIRST, True, {"A": [("B", 3)], "B": [("C", 1), ("A", 5)]}),
+        (
+            Graph.MIN,
+            False,
+            {"A": [("B", 2)], "B": [("A", 2), ("C", 1)], "C": [("B", 1)]},
+        ),
+        (
+            Graph.FIRST,
+            False,
+            {"A": [("B", 3)], "B": [("A", 3), ("C", 1)], "C": [("B", 1)]},
+        ),
+    ],
+)
+def test_from_edges_merges_parallel_edges(duplicates, directed, expected):
+    map = Graph.from_edges(PARALLEL, directed=directed, duplicates=duplicates)
+
+    # the destinations of a directed graph have an empty neighborhood
+    edges = {vertex: e for vertex, e in map.edges_list.items() if e}
+
+    assert map.vertices == {"A", "B", "C"}
+    assert edges == expected
+    assert map.in_neighborhood("A") == {"B"}
+    assert map.in_neighborhood("C") == {"B"}
+
+
+def test_from_edges_rejects_parallel_edges():
+    with pytest.raises(ValueError, match=r"\(A, B\) is given more than once"):
+        Graph.from_edges(PARALLEL, directed=True, duplicates=Graph.ERROR)
+
+    # the reverse edge of an undirected graph is parallel to B -> A
+    with pytest.raises(ValueError, match="more than once"):
+        Graph.from_edges(PARALLEL[:2] + PARALLEL[3:], duplicates=Graph.ERROR)
+
+    assert (
+        Graph.from_edges(PARALLEL[:2], duplicates=Graph.ERROR).edges_list
+        == Graph.from_edges(PARALLEL[:2]).edges_list
+    )
+
+    with pytest.raises(ValueError, match="not a duplicate policy"):
+        Graph.from_edges(PARALLEL, duplicates="sum")
+
+
+def test_from_edges_takes_columns():
+    origins = np.array([a for a, _, _ in PARALLEL])
+    destinations = np.array([b for _, b, _ in PARALLEL])
+    weights = np.array([w for _, _, w in PARALLEL], dtype=np.float64)
+
+    for duplicates in (Graph.MIN, Graph.FIRST, Graph.KEEP):
+        map = Graph.from_edges(
+            origins=origins,
+            destinations=destinations,
+            weights=weights,
+            directed=True,
+            duplicates=duplicates,
+        )
+
+        assert structure(map) == structure(
+            Graph.from_edges(PARALLEL, directed=True, duplicates=duplicates)
+        )
+        assert all(
+            type(vertex) is str and type(weight) is float
+            for edges in map.edges_list.values()
+            for vertex, weight in edges
+        )
+
+    unweighted = Graph.from_edges(origins=["A", "B"], destinations=["B", "C"])
+
+    assert unweighted.weight("C", "B") == 1
+
+    with pytest.raises(ValueError, match="same length"):
+        Graph.from_edges(origins=origins, destinations=destinations[:2])
+
+    with pytest.raises(ValueError, match="Either the edges"):
+        Graph.from_edges(PARALLEL, origins=origins, destinations=destinations)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_undirected_from_edges_matches_constructor(seed):
+    rng = random.Random(seed)
+    # the generated maps have parallel edges, one of each is kept
+    pairs = {
+        (origin, destination): weight
+        for origin, neighborhood in generate_map(7).edges_list.items()
+        for destination, weight in neighborhood
+        if origin < destination
+    }
+    edges = [(a, b, weight) for (a, b), weight in sorted(pairs.items())]
+    rng.shuffle(edges)
+    edges = [
+        (b, a, w) if rng.random() < 0.5 else (a, b, w) for a, b, w in edges
+    ]
+
+    assert structure(Graph.from_edges(edges)) == structure(Graph(edges))
+    # parallel edges too, when they are kept
+    edges += edges[:10]
+
+    assert structure(
+        Graph.from_edges(edges, duplicates=Graph.KEEP)
+    ) == structure(Graph(edges))
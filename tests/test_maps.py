@@ -0,0 +1,161 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from graphs import Graph, dijkstra_distances
+from maps import MapCache, ScenarioGenerator, generate_map
+
+
+def adjacency(map: Graph) -> list:
+    """Lists the edges of each vertex, in the order the map keeps them."""
+    return list(map.edges_list.items())
+
+
+def archive(cache: MapCache, shape: int) -> str:
+    return os.path.join(cache.directory, cache.key(shape) + MapCache.SUFFIX)
+
+
+def load(directory: str, shape: int) -> list:
+    return adjacency(generate_map(shape, cache=MapCache(directory)))
+
+
+def test_cached_map_is_the_generated_map(tmp_path):
+    cache = MapCache(str(tmp_path))
+    expected = generate_map(6, ["X", "Y"])
+
+    stored = generate_map(6, ["X", "Y"], cache=cache)
+    loaded = generate_map(6, ["X", "Y"], cache=cache)
+
+    assert (cache.misses, cache.hits, len(cache)) == (1, 1, 1)
+    assert adjacency(stored) == adjacency(loaded) == adjacency(expected)
+    assert generate_map(6, cache=cache).vertices == generate_map(6).vertices
+    assert cache.misses == 2
+
+
+def test_unreadable_archive_is_generated_again(tmp_path):
+    cache = MapCache(str(tmp_path))
+    generate_map(5, cache=cache)
+
+    with open(archive(cache, 5), "wb") as file:
+        file.write(b"not an archive")
+
+    assert adjacency(generate_map(5, cache=cache)) == adjacency(
+        generate_map(5)
+    )
+    assert (cache.misses, cache.hits) == (2, 0)
+    assert adjacency(generate_map(5, cache=cache)) == adjacency(
+        generate_map(5)
+    )
+    assert cache.hits == 1
+
+
+def test_least_recently_used_maps_are_evicted(tmp_path):
+    sizes = {}
+
+    for shape in (4, 5, 6):
+        scratch = MapCache(str(tmp_path / "scratch"))
+        generate_map(shape, cache=scratch)
+        sizes[shape] = os.path.getsize(archive(scratch, shape))
+
+    cache = MapCache(str(tmp_path / "maps"), sizes[4] + sizes[6] + 1)
+    generate_map(4, cache=cache)
+    generate_map(5, cache=cache)
+
+    # the map of shape 4 is used after the one of shape 5
+    os.utime(archive(cache, 4), (1, 1))
+    os.utime(archive(cache, 5), (2, 2))
+    generate_map(4, cache=cache)
+    generate_map(6, cache=cache)
+
+    assert os.path.exists(archive(cache, 4))
+    assert not os.path.exists(archive(cache, 5))
+    assert os.path.exists(archive(cache, 6))
+    assert cache.size <= sizes[4] + sizes[6] + 1
+
+
+def test_processes_filling_the_same_map_agree(tmp_path):
+    directory = str(tmp_path)
+
+    with ProcessPoolExecutor(4) as executor:
+        maps = list(executor.map(load, [directory] * 8, [30] * 8))
+
+    assert all(map == adjacency(generate_map(30)) for map in maps)
+    assert len(MapCache(directory)) == 1
+    assert not [
+        name
+        for name in os.listdir(directory)
+        if name.endswith(MapCache.TEMPORARY_SUFFIX)
+    ]
+
+
+@pytest.mark.parametrize("min_distance", [0, 3])
+@pytest.mark.parametrize("shape", [6, 20])
+def test_scenarios_respect_their_constraints(shape, min_distance):
+    map = generate_map(shape)
+    generator = ScenarioGenerator(map, 1, 4, 5, min_distance)
+    distances = {}
+
+    for scenario in generator.generate(300):
+        start, posts, water_sources = scenario
+        positions = [start] + posts + water_sources
+
+        assert (len(posts), len(water_sources)) == (4, 5)
+        assert len(set(positions)) == len(positions)
+
+        if start not in distances:
+            distances[start] = dijkstra_distances(map, start)
+
+        assert all(
+            distances[start].get(post, -1) >= min_distance for post in posts
+        )
+
+
+SCENARIOS = """
+from maps import ScenarioGenerator, generate_map
+generator = ScenarioGenerator(generate_map(8), 7, min_distance=2)
+print(generator.batch(200).tolist(), generator.generate(3))
+"""
+
+
+def test_seed_gives_the_same_scenarios_in_any_process():
+    source = os.path.join(os.path.dirname(__file__), os.pardir, "src")
+
+    def run(hash_seed: str) -> str:
+        environment = dict(
+            os.environ, PYTHONHASHSEED=hash_seed, PYTHONPATH=source
+        )
+
+        return subprocess.run(
+            [sys.executable, "-c", SCENARIOS],
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    scenarios = run("1")
+
+    assert scenarios.startswith("[[")
+    assert run("2") == run("3") == scenarios
+
+
+def test_too_few_distant_vertices_are_rejected():
+    names = [f"V{i:02d}" for i in range(10)]
+    map = Graph([(a, b, 1) for a, b in zip(names, names[1:])])
+    generator = ScenarioGenerator(
+        map,
+        0,
+        posts=2,
+        water_sources=1,
+        min_distance=5,
+        ignition_points=["V05"],
+    )
+
+    with pytest.raises(ValueError, match="Only 1 vertices are at least 5"):
+        generator.batch(4)
+
+    with pytest.raises(ValueError, match="not enough for 11"):
+        ScenarioGenerator(map, posts=5, water_sources=5)
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from app import App
+from graphs import Graph
+from maps import generate_map
+from parallel import Partition, PartitionedSimulation
+
+
+def water(map: Graph) -> dict:
+    return {vertex: 5 for vertex in map.vertices}
+
+
+def test_fire_spreading_to_guarded_region_is_fought():
+    names = [f"V{i:02d}" for i in range(12)]
+    map = Graph([(a, b, 1) for a, b in zip(names, names[1:])])
+    partition = Partition(map, 2)
+    other = 1 - partition.region_of(names[0])
+    post = max(partition.regions[other])
+
+    # the region on fire has no truck, the other one waits for the fire
+    with PartitionedSimulation(
+        map, names[0], [post], [post], water(map), regions=2, processes=False
+    ) as simulation:
+        simulation.run(150)
+        summary = simulation.summary()
+
+    assert summary["iterations"] > 0
+    assert summary["water"] > 0
+
+
+def test_single_region_matches_app():
+    map = generate_map(6)
+    posts, sources = ["A1", "F2"], ["C1"]
+
+    app = App(map, "J1", posts, sources, water(map), verbose=0)
+    app.run(150)
+
+    with PartitionedSimulation(
+        generate_map(6), "J1", posts, sources, water(map), processes=False
+    ) as simulation:
+        simulation.run(150)
+
+        assert simulation.summary() == app.summary()
+
+
+@pytest.mark.parametrize("regions", [2, 3, 4])
+def test_regions_match_app(monkeypatch, regions):
+    map = generate_map(7)
+    posts, sources = ["A1", "F2", "W2"], ["C1", "M2"]
+    app = App(map, "J1", posts, sources, water(map), verbose=0)
+    app.run(150)
+
+    # the map is split as if it were too large for one process
+    monkeypatch.setattr(
+        PartitionedSimulation, "REGION_SIZE", len(map.vertices) // regions
+    )
+    monkeypatch.setattr(os, "cpu_count", lambda: regions)
+
+    with PartitionedSimulation(
+        generate_map(7),
+        "J1",
+        posts,
+        sources,
+        water(map),
+        processes=regions == 2,
+    ) as simulation:
+        simulation.run(150)
+
+        assert len(simulation.partition) == regions
+        assert simulation.partition.cut() > 0
+        assert simulation.summary() == app.summary()
+        assert simulation.paths == app.paths
+
+
+def test_unreachable_fire_ends_early():
+    edges = [("A", "B", 1), ("B", "C", 1), ("X", "Y", 1)]
+    map = Graph(edges)
+
+    app = App(map, "A", ["X"], ["Y"], water(map), verbose=0)
+    app.run(150)
+
+    assert app.ended
+    assert app.summary()["iterations"] == 0
+
+    with PartitionedSimulation(
+        Graph(edges),
+        "A",
+        ["X"],
+        ["Y"],
+        water(map),
+        regions=2,
+        processes=False,
+    ) as simulation:
+        simulation.run(150)
+
+        assert simulation.iteration == 0
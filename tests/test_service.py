@@ -0,0 +1,155 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+import service.server
+from app import App
+from maps import generate_map
+from service import SimulationClient, SimulationService
+
+FIRE, POSTS, SOURCES = "A", ["P"], ["F"]
+# little water per vertex, so trucks do not refuel in long chains
+WATER = 5
+
+
+def post(address, body: dict) -> int:
+    """Sends a simulation request, returning the status of the response."""
+    connection = http.client.HTTPConnection(*address)
+    connection.request("POST", "/simulate", json.dumps(body))
+    status = connection.getresponse().status
+    connection.close()
+
+    return status
+
+
+@pytest.fixture
+def running():
+    with SimulationService(
+        {"grid": generate_map(4)}, workers=1, processes=False
+    ).start() as running:
+        yield running
+
+
+def test_simulate_matches_app(running):
+    map = generate_map(4)
+    water = {vertex: WATER for vertex in map.vertices}
+    app = App(map, FIRE, POSTS, SOURCES, water, verbose=0)
+    app.run(150)
+
+    with SimulationClient(running.address) as client:
+        result = client.simulate(
+            "grid", FIRE, POSTS, SOURCES, WATER, paths=True
+        )
+
+    assert {key: result[key] for key in app.summary()} == app.summary()
+    assert result["paths"] == json.loads(json.dumps(app.paths))
+
+
+def test_simulate_in_worker_process_over_unix_socket(tmp_path):
+    address = os.path.join(tmp_path, "service.sock")
+
+    with SimulationService(
+        {"grid": generate_map(4)}, address, workers=1
+    ).start() as running:
+        with SimulationClient(running.address) as client:
+            result = client.simulate("grid", FIRE, POSTS, SOURCES, WATER)
+
+            assert client.maps() == {"grid": 16}
+            assert result["iterations"] > 0
+
+
+def test_bad_field_is_rejected(running):
+    body = {"map": "grid", "fire_start_vertex": FIRE}
+
+    assert post(running.address, {**body, "firefighters": POSTS}) == 400
+
+    with SimulationClient(running.address) as client:
+        with pytest.raises(ValueError, match="not a valid time advance"):
+            client.simulate("grid", FIRE, POSTS, mode="hourly")
+
+
+def test_unknown_map_is_not_found(running):
+    body = {"map": "moon", "fire_start_vertex": FIRE}
+
+    assert post(running.address, {**body, "firefighters_position": []}) == 404
+
+    with SimulationClient(running.address) as client:
+        with pytest.raises(ValueError, match="'moon' is not a map"):
+            client.simulate("moon", FIRE, POSTS)
+
+
+def test_full_queue_is_rejected(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    simulate = service.server._simulate
+
+    def blocked(*args):
+        started.set()
+        release.wait(10)
+
+        return simulate(*args)
+
+    monkeypatch.setattr(service.server, "_simulate", blocked)
+    results = []
+
+    with SimulationService(
+        {"grid": generate_map(4)}, workers=1, queue_size=0, processes=False
+    ).start() as running:
+        client = SimulationClient(running.address)
+        thread = threading.Thread(
+            target=lambda: results.append(
+                client.simulate("grid", FIRE, POSTS, SOURCES, WATER)
+            )
+        )
+        thread.start()
+        assert started.wait(10)
+
+        body = {
+            "map": "grid",
+            "fire_start_vertex": FIRE,
+            "firefighters_position": POSTS,
+        }
+
+        assert post(running.address, body) == 503
+
+        with SimulationClient(running.address) as other:
+            with pytest.raises(RuntimeError, match="queue is full"):
+                other.simulate("grid", FIRE, POSTS, SOURCES, WATER)
+
+        release.set()
+        thread.join(10)
+        client.close()
+
+        assert results and results[0]["iterations"] > 0
+        assert running.health()["pending"] == 0
+
+
+def die(*args):
+    """Kills the worker process running the simulation."""
+    os._exit(1)
+
+
+def test_dead_worker_fails_its_request_and_is_replaced(monkeypatch):
+    simulate = service.server._simulate
+    monkeypatch.setattr(service.server, "_simulate", die)
+    body = {
+        "map": "grid",
+        "fire_start_vertex": FIRE,
+        "firefighters_position": POSTS,
+    }
+
+    with SimulationService(
+        {"grid": generate_map(4)}, workers=1
+    ).start() as running:
+        assert post(running.address, body) == 503
+
+        # the new workers are forked with the simulation restored
+        monkeypatch.setattr(service.server, "_simulate", simulate)
+
+        with SimulationClient(running.address) as client:
+            result = client.simulate("grid", FIRE, POSTS, SOURCES, WATER)
+
+        assert result["iterations"] > 0
+        assert running.health()["pending"] == 0